@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import urllib.parse
 import tkinter as tk
 import threading
@@ -11,6 +13,9 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
 from datetime import datetime
+from collections import Counter
+
+POPUP_MAX_IDS = 50  # failed IDs listed in the popup; the log file has all of them
 
 def open_url_with_selenium(url):
     try:
@@ -44,9 +49,13 @@ def open_url_with_selenium(url):
         image_extensions = ['.jpg', '.jpeg', '.png', '.gif']
         all_extensions = image_extensions + ['.zip', '.svg', '.mp4', '.webm']
 
-        summary_errors = {}
+        # Failures stream to a spool file and running counts instead of being kept in memory
+        summary_spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+        failed_count = 0
+        reason_counts = Counter()
+        popup_ids = []
 
-        with open(log_path, 'w', encoding='utf-8') as log_file:
+        with open(log_path, 'w', encoding='utf-8') as log_file, summary_spool:
             for i, row in enumerate(rows):
                 try:
                     cells = row.find_elements(By.TAG_NAME, 'td')
@@ -173,28 +182,34 @@ def open_url_with_selenium(url):
 
                     result = f"ID: {creative_id} - " + ", ".join(log_msgs)
                     log_file.write(result + '\n')
+                    log_file.flush()
                     if errors:
-                        summary_errors[creative_id] = errors
+                        failed_count += 1
+                        reason_counts.update(e.split(":")[0] for e in errors)
+                        summary_spool.write(f"ID: {creative_id}\n")
+                        for e in errors:
+                            summary_spool.write(f"  - {e}\n")
+                        summary_spool.write("\n")
+                        if len(popup_ids) < POPUP_MAX_IDS:
+                            popup_ids.append(creative_id)
 
                 except Exception as inner_e:
                     print("[WARN] Row error:", inner_e)
 
-            if summary_errors:
+            if failed_count:
                 log_file.write("\n\n=== SUMMARY OF FAILED CHECKS ===\n")
-                for cid, errs in summary_errors.items():
-                    log_file.write(f"ID: {cid}\n")
-                    for e in errs:
-                        log_file.write(f"  - {e}\n")
-                    log_file.write("\n")
-        
-                if summary_errors:
-                    # Build message string
-                    popup_message = ""
-                    for cid, errs in summary_errors.items():
-                        popup_message += f"ID: {cid}\n"
-                        for e in errs:
-                            popup_message += f"  - {e}\n"
-                        popup_message += "\n"
+                summary_spool.seek(0)
+                shutil.copyfileobj(summary_spool, log_file)
+
+                if failed_count:
+                    # Build message from the running counts (size is bounded, not per creative)
+                    popup_lines = [f"Rejected creatives: {failed_count}", ""]
+                    for reason, n in reason_counts.most_common(10):
+                        popup_lines.append(f"{n:5} × {reason}")
+                    popup_lines += ["", "IDs: " + ", ".join(popup_ids)]
+                    if failed_count > len(popup_ids):
+                        popup_lines.append(f"… and {failed_count - len(popup_ids)} more (see {log_path})")
+                    popup_message = "\n".join(popup_lines) + "\n"
 
                     # Create popup window
                     def show_popup():
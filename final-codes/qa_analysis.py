@@ -0,0 +1,400 @@
+"""
+Offline creative analysis: static clickTag (TC10) reading of HTML/JS bundles and the
+missing-asset resolver, memoized per file in a content-addressed AnalysisCache. Browser-free.
+"""
+import os
+import re
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+from qa_common import log, _data_dir
+
+# ---------- Analysis cache (content-addressed, per file) ----------
+# Static clickTag facts and asset references are pure functions of one file's text, so they
+# are memoized under the sha256 of that text: a library shipped in every size variant
+# (js/wFunction-2.5.0.js) is parsed once across creatives, processes and runs.
+USE_ANALYSIS_CACHE = os.getenv("FT_ANALYSIS_CACHE", "1").strip().lower() not in ("0", "false", "no")
+_ANALYSIS_VERSION = 2  # bump when _clicktag_facts() / asset_references() change their output
+
+class AnalysisCache:
+    """
+    <data dir>/analysis/v<N>/<kind>/<sha[:2]>/<sha>.json, one file per (kind, content).
+    Writes are atomic (temp file + replace), so parallel scan processes can share it;
+    hot entries are also kept in memory for the life of the process.
+    """
+    MEMORY_ENTRIES = 4096
+
+    def __init__(self, root=None, enabled=True):
+        self.root = Path(root) if root else _data_dir() / "analysis" / f"v{_ANALYSIS_VERSION}"
+        self.enabled = enabled
+        self._mem = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, name, text, compute, stats=None):
+        """compute(name, text), memoized by (kind, file type, sha256(text)); counts into stats."""
+        if stats is not None:
+            stats["files"] = stats.get("files", 0) + 1
+        if not self.enabled:
+            if stats is not None:
+                stats["parsed"] = stats.get("parsed", 0) + 1
+            return compute(name, text)
+        base = name.split("?", 1)[0].split("#", 1)[0].rsplit("/", 1)[-1]
+        ext = re.sub(r"\W", "", base.rsplit(".", 1)[-1].lower())[:8] if "." in base else "none"
+        digest = hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+        key = f"{kind}/{ext}/{digest}"
+        with self._lock:
+            value = self._mem.get(key)
+        if value is not None:
+            return value
+        path = self.root / kind / ext / digest[:2] / f"{digest}.json"
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            value = compute(name, text)
+            if stats is not None:
+                stats["parsed"] = stats.get("parsed", 0) + 1
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError:
+                pass
+        with self._lock:
+            if len(self._mem) >= self.MEMORY_ENTRIES:
+                self._mem.clear()
+            self._mem[key] = value
+        return value
+
+_analysis_caches = {}
+
+def _analysis_cache():
+    """Process-wide AnalysisCache for the current data dir (FT_ANALYSIS_CACHE=0 disables it)."""
+    root = _data_dir() / "analysis" / f"v{_ANALYSIS_VERSION}"
+    cache = _analysis_caches.get(root)
+    if cache is None or cache.enabled != USE_ANALYSIS_CACHE:
+        cache = _analysis_caches[root] = AnalysisCache(root, enabled=USE_ANALYSIS_CACHE)
+    return cache
+
+# ---------- Static clickTag analysis (HTML/JS/zip) ----------
+# Regex-level reading of a creative's HTML and JS: clickTag declarations, exit functions
+# (functions that window.open() their argument), and the anchors / calls / handlers that
+# reach a clickTag. "pass" and "fail" are confident; anything else is "ambiguous" and
+# left to the browser click-through.
+_STATIC_MAX_BYTES = 2 * 1024 * 1024  # per file; larger files are skipped
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_CT_DECL_RE = re.compile(r"""(?:\b(?:var|let|const)\s+|\bwindow\.|[{,]\s*)(clickTag\w*)\s*[:=]\s*(["'])(.*?)\2""", re.I)
+_CT_REF_RE = re.compile(r"\bclickTag\w*", re.I)
+_WINDOW_OPEN_RE = re.compile(r"\b(?:window\.)?open\s*\(\s*([^,)]*)", re.I)
+_FUNC_DEF_RE = re.compile(r"\bfunction\s+(\w+)\s*\(\s*(\w+)[^)]*\)\s*\{")
+_ANCHOR_RE = re.compile(r"""<a\b[^>]*?\bhref\s*=\s*(["'])(.*?)\1""", re.I | re.S)
+_ONCLICK_RE = re.compile(r"""\bonclick\s*=\s*(["'])(.*?)\1""", re.I | re.S)
+_SCRIPT_SRC_RE = re.compile(r"""<script\b[^>]*?\bsrc\s*=\s*(["'])(.*?)\1""", re.I | re.S)
+_EXIT_APIS = ("Enabler.exit", "EB.clickthrough", "ADTECH.click", "mraid.open", "Adform.getClickURL")
+
+def _function_body(text, brace_at):
+    """Text of the {...} block starting at brace_at (naive brace matching)."""
+    depth = 0
+    for i in range(brace_at, min(len(text), brace_at + 20000)):
+        c = text[i]
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return text[brace_at + 1:i]
+    return text[brace_at + 1:brace_at + 2000]
+
+def clicktag_sources(path):
+    """{relative name: text} of the HTML/JS files in a bundle dir, .zip, or single .html/.js file."""
+    import zipfile
+    path = Path(path)
+    wanted = (".html", ".htm", ".js")
+    sources = {}
+    if path.is_dir():
+        for f in sorted(path.rglob("*")):
+            if f.suffix.lower() in wanted and f.is_file() and f.stat().st_size <= _STATIC_MAX_BYTES:
+                sources[f.relative_to(path).as_posix()] = f.read_text(encoding="utf-8", errors="replace")
+    elif path.suffix.lower() == ".zip":
+        with zipfile.ZipFile(path) as z:
+            for info in z.infolist():
+                name = info.filename
+                if (name.lower().endswith(wanted) and not info.is_dir() and info.file_size <= _STATIC_MAX_BYTES
+                        and not name.startswith("__MACOSX/")):
+                    sources[name] = z.read(info).decode("utf-8", errors="replace")
+    elif path.is_file() and path.suffix.lower() in wanted:
+        sources[path.name] = path.read_text(encoding="utf-8", errors="replace")
+    return sources
+
+_CALL_RE = re.compile(r"(?=\b(\w+)\s*\(([^)]*)\))")  # overlapping, so nested calls are seen too
+
+def _clicktag_facts(name, text):
+    """Per-file part of the static TC10 analysis (JSON-able, cached by content)."""
+    is_html = name.lower().endswith((".html", ".htm"))
+    if is_html:
+        text = _HTML_COMMENT_RE.sub("", text)
+    facts = {"clicktags": [], "exit_functions": [], "refs": sorted({r.lower() for r in _CT_REF_RE.findall(text)}),
+             "opens": _WINDOW_OPEN_RE.findall(text),
+             "calls": [[fn, args] for fn, args in _CALL_RE.findall(text)
+                       if _CT_REF_RE.search(args) or "/clicktag" in args.lower()],
+             "apis": [api for api in _EXIT_APIS if api + "(" in text.replace(" (", "(")],
+             "anchors": [m.group(2) for m in _ANCHOR_RE.finditer(text)] if is_html else [],
+             "onclicks": [m.group(2) for m in _ONCLICK_RE.finditer(text)] if is_html else [],
+             "scripts": [m.group(2).strip() for m in _SCRIPT_SRC_RE.finditer(text)] if is_html else []}
+    for m in _CT_DECL_RE.finditer(text):
+        facts["clicktags"].append([m.group(1), m.group(3)])
+    for m in _FUNC_DEF_RE.finditer(text):
+        body = _function_body(text, m.end() - 1)
+        if any(a.strip() == m.group(2) for a in _WINDOW_OPEN_RE.findall(body)):
+            facts["exit_functions"].append(m.group(1))
+    return facts
+
+def _unread_scripts(facts):
+    """<script src> values of the HTML files that are not among the analyzed sources."""
+    import posixpath
+    names = [n.split("?", 1)[0].split("#", 1)[0] for n in facts]
+    unread = []
+    for html, f in facts.items():
+        for src in f.get("scripts", ()):
+            ref = src.split("?", 1)[0].split("#", 1)[0]
+            if not _REMOTE_REF_RE.match(ref):
+                ref = posixpath.normpath(posixpath.join(posixpath.dirname(html), ref)).lstrip("./")
+            if ref and not any(n == ref or n.endswith("/" + ref) for n in names):
+                unread.append(src)
+    return unread
+
+def analyze_clicktag_sources(sources, stats=None, complete=True):
+    """
+    Static TC10 over {name: text}. Returns {"verdict": pass|fail|ambiguous, "reason",
+    "clicktags": {name: url}, "exit_functions": [...], "exits": [{"kind", "target", "file"}],
+    "unread_scripts": [...]}. Per-file facts come from the analysis cache; only the
+    cross-file wiring is recomputed. "fail" needs every referenced script to have been
+    read (complete=False says the sources are known to be partial).
+    """
+    cache = _analysis_cache()
+    facts = {name: cache.get("clicktag", name, text, _clicktag_facts, stats) for name, text in sources.items()}
+    clicktags, exit_fns, exits = {}, set(), []
+    for f in facts.values():
+        for ct, url in f["clicktags"]:
+            clicktags.setdefault(ct, url)
+        exit_fns.update(f["exit_functions"])
+    declared = {k.lower() for k in clicktags}
+
+    def target_of(code):
+        """clickTag name (or /clicktag URL) an expression or handler leads to, else None."""
+        refs = [r for r in _CT_REF_RE.findall(code) if r.lower() in declared]
+        if refs:
+            return refs[0]
+        return "/clicktag" if "/clicktag" in code.lower() else None
+
+    opens = 0
+    for name, f in facts.items():
+        for arg in f["opens"]:
+            opens += 1
+            t = target_of(arg)
+            if t:
+                exits.append({"kind": "window.open", "target": t, "file": name})
+        for fn, args in f["calls"]:
+            t = target_of(args) if fn in exit_fns else None
+            if t:
+                exits.append({"kind": "exit_function", "target": t, "file": name, "function": fn})
+        for api in f["apis"]:
+            exits.append({"kind": "exit_api", "target": api, "file": name})
+        for href in f["anchors"]:
+            t = target_of(href)
+            if t:
+                exits.append({"kind": "anchor", "target": t, "file": name})
+        for handler in f["onclicks"]:
+            t = target_of(handler)
+            if not t and any(re.search(r"\b%s\s*\(" % re.escape(fn), handler) for fn in exit_fns):
+                t = "exit_function"
+            if t:
+                exits.append({"kind": "onclick", "target": t, "file": name})
+
+    unread = _unread_scripts(facts)
+    result = {"clicktags": clicktags, "exit_functions": sorted(exit_fns), "exits": exits, "unread_scripts": unread}
+    wired = sorted({e["target"] for e in exits})
+    if exits:
+        result["verdict"], result["reason"] = "pass", "exit wired to " + ", ".join(wired[:5])
+    elif not clicktags and not opens and not any(f["refs"] for f in facts.values()) \
+            and not any(f["anchors"] for f in facts.values()):
+        if unread or not complete:
+            result["verdict"] = "ambiguous"
+            result["reason"] = (f"no clickTag or exit in the code read; {len(unread)} script(s) not read"
+                                if unread else "no clickTag or exit in the code read; script fetch timed out")
+        else:
+            result["verdict"], result["reason"] = "fail", "no clickTag, exit or link in the bundle"
+    elif clicktags:
+        result["verdict"], result["reason"] = "ambiguous", "clickTag declared but no exit found statically"
+    else:
+        result["verdict"], result["reason"] = "ambiguous", "links or window.open without a clickTag"
+    return result
+
+def analyze_clicktags(path):
+    """analyze_clicktag_sources() for a bundle dir, .zip or file; adds "path", "files" and "parsed" (cache misses)."""
+    sources = clicktag_sources(path)
+    stats = {"files": 0, "parsed": 0}
+    result = analyze_clicktag_sources(sources, stats) if sources else {
+        "verdict": "ambiguous", "reason": "no HTML/JS files", "clicktags": {}, "exit_functions": [], "exits": [],
+        "unread_scripts": []}
+    result["path"] = str(path)
+    result["files"] = len(sources)
+    result["parsed"] = stats["parsed"]
+    return result
+
+# ---------- Missing-asset resolver (offline) ----------
+# Every src / href / url(...) / @import in a bundle's HTML and CSS, plus asset-looking
+# string literals in its scripts (preload lists), checked against the bundle's file list
+# before any browser work. Commented-out markup is ignored; remote, data: and javascript:
+# references and string-built URLs are not checked.
+_ASSET_ATTR_RE = re.compile(r"""\b(src|href|poster|data-src|srcset)\s*=\s*(["'])(.*?)\2""", re.I | re.S)
+_CSS_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]*?)\1\s*\)""", re.I)
+_CSS_IMPORT_RE = re.compile(r"""@import\s+(["'])(.*?)\1""", re.I)
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_SCRIPT_BLOCK_RE = re.compile(r"<script\b[^>]*>(.*?)</script>", re.I | re.S)
+_JS_ASSET_RE = re.compile(
+    r"""(["'])([^"'\s<>]+?\.(?:png|jpe?g|gif|svg|webp|mp4|webm|mp3|ogg|json|css|js|woff2?|ttf|otf))\1""", re.I)
+_JS_LINE_COMMENT_RE = re.compile(r"^\s*//.*$", re.M)
+_REMOTE_REF_RE = re.compile(r"^(?:[a-z][a-z0-9+.-]*:|//|#)", re.I)
+_BUILT_REF_RE = re.compile(r"\s\+|\+\s|\$\{|%%|\{\{|[<>]")
+
+def _bundle_listing(path):
+    """{relative path: text (HTML/CSS/JS) or None} for a bundle dir, .zip or single .html file."""
+    import zipfile
+    path = Path(path)
+    readable = (".html", ".htm", ".css", ".js")
+    files = {}
+    if path.suffix.lower() == ".zip" and path.is_file():
+        with zipfile.ZipFile(path) as z:
+            for info in z.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith("__MACOSX/"):
+                    continue
+                text = None
+                if name.lower().endswith(readable) and info.file_size <= _STATIC_MAX_BYTES:
+                    text = z.read(info).decode("utf-8", errors="replace")
+                files[name] = text
+        return files
+    if path.is_file():  # single .html creative: only the page itself (siblings are looked up on disk)
+        return {path.name: path.read_text(encoding="utf-8", errors="replace")}
+    for f in path.rglob("*"):
+        if f.is_file():
+            read = f.suffix.lower() in readable and f.stat().st_size <= _STATIC_MAX_BYTES
+            files[f.relative_to(path).as_posix()] = f.read_text(encoding="utf-8", errors="replace") if read else None
+    return files
+
+def _on_disk(root, rel):
+    """Exact-case bundle path for rel under root, the differently-cased match, or None."""
+    p = root / rel
+    try:
+        names = os.listdir(p.parent)
+    except OSError:
+        return None
+    if p.name in names:
+        return rel if p.is_file() else None
+    other = next((n for n in names if n.lower() == p.name.lower()), None)
+    return rel.rsplit("/", 1)[0] + "/" + other if other and "/" in rel else other
+
+def asset_references(name, text):
+    """[(kind, reference)] found in one HTML / CSS / JS file."""
+    lower = name.lower()
+    refs = []
+    if lower.endswith((".html", ".htm")):
+        text = _HTML_COMMENT_RE.sub("", text)
+        for m in _ASSET_ATTR_RE.finditer(text):
+            attr, value = m.group(1).lower(), m.group(3).strip()
+            if attr == "srcset":
+                refs += [("srcset", part.split()[0]) for part in value.split(",") if part.strip()]
+            else:
+                refs.append((attr, value))
+        scripts = [_JS_LINE_COMMENT_RE.sub("", _CSS_COMMENT_RE.sub("", s)) for s in _SCRIPT_BLOCK_RE.findall(text)]
+        refs += [("js", m.group(2)) for s in scripts for m in _JS_ASSET_RE.finditer(s)]
+        refs += [("url", m.group(2)) for m in _CSS_URL_RE.finditer(text)]
+    elif lower.endswith(".css"):
+        text = _CSS_COMMENT_RE.sub("", text)
+        refs += [("url", m.group(2)) for m in _CSS_URL_RE.finditer(text)]
+        refs += [("import", m.group(2)) for m in _CSS_IMPORT_RE.finditer(text)]
+    elif lower.endswith(".js"):
+        text = _JS_LINE_COMMENT_RE.sub("", _CSS_COMMENT_RE.sub("", text))
+        refs += [("js", m.group(2)) for m in _JS_ASSET_RE.finditer(text)]
+        refs += [("url", m.group(2)) for m in _CSS_URL_RE.finditer(text)]
+    return [(k, r) for k, r in refs if r and not _REMOTE_REF_RE.match(r) and not _BUILT_REF_RE.search(r)]
+
+def _resolve_asset(ref, from_name, doc_dir):
+    """Bundle-relative path of a reference ('' when it points outside the bundle)."""
+    import posixpath
+    from urllib.parse import unquote
+    ref = unquote(ref.split("#", 1)[0].split("?", 1)[0])
+    if ref.startswith("/"):
+        base, ref = "", ref.lstrip("/")
+    elif from_name.lower().endswith(".js"):
+        base = doc_dir  # script strings resolve against the document, not the script
+    else:
+        base = posixpath.dirname(from_name)
+    resolved = posixpath.normpath(posixpath.join(base, ref)) if ref else ""
+    return "" if resolved.startswith("..") or resolved == "." else resolved
+
+def find_missing_assets(path):
+    """
+    Offline asset check of one bundle (dir, .zip or .html file). Returns {"path", "files",
+    "references", "parsed" (sources not in the analysis cache), "missing": [{"ref", "from",
+    "kind", "resolved", "note"?}]}.
+    """
+    path = Path(path)
+    files = _bundle_listing(path)
+    by_lower = {}
+    for name in files:
+        by_lower.setdefault(name.lower(), name)
+    single = path.is_file() and path.suffix.lower() != ".zip"
+    docs = [n for n in files if n.lower().endswith((".html", ".htm")) and files[n] is not None]
+    index = next((n for n in docs if n.rsplit("/", 1)[-1].lower() == "index.html"), docs[0] if docs else "")
+    doc_dir = index.rsplit("/", 1)[0] if "/" in index else ""
+    cache, stats = _analysis_cache(), {"files": 0, "parsed": 0}
+    seen, missing = set(), []
+    for name in sorted(files):
+        if files[name] is None:
+            continue
+        for kind, ref in cache.get("assets", name, files[name], asset_references, stats):
+            resolved = _resolve_asset(ref, name, doc_dir)
+            if (resolved, name) in seen:
+                continue
+            seen.add((resolved, name))
+            if resolved and resolved in files:
+                continue
+            found = _on_disk(path.parent, resolved) if single and resolved else by_lower.get(resolved.lower())
+            if found == resolved and resolved:
+                continue
+            entry = {"ref": ref, "from": name, "kind": kind, "resolved": resolved}
+            if not resolved:
+                entry["note"] = "outside the bundle"
+            elif found:
+                entry["note"] = f"case differs: {found}"
+            missing.append(entry)
+    return {"path": str(path), "files": len(files), "references": len(seen), "parsed": stats["parsed"],
+            "missing": missing}
+
+def _asset_bundles(paths):
+    """Bundles under each path: the path itself, or its sub-dirs with index.html, .zip and .html files."""
+    bundles = []
+    for p in map(Path, paths):
+        if p.is_file() or (p / "index.html").is_file():
+            bundles.append(p)
+        elif p.is_dir():
+            bundles += [d for d in sorted(p.iterdir()) if d.is_dir() and (d / "index.html").is_file()]
+            bundles += sorted(f for f in p.iterdir() if f.is_file() and f.suffix.lower() in (".zip", ".html", ".htm"))
+    return bundles
+
+def scan_bundles(paths, workers=None):
+    """find_missing_assets() over every bundle in `paths`, in parallel processes; results in bundle order."""
+    from concurrent.futures import ProcessPoolExecutor
+    bundles = _asset_bundles(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(bundles)))
+    if workers > 1 and len(bundles) >= 4:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                return list(ex.map(find_missing_assets, bundles, chunksize=max(1, len(bundles) // (workers * 4))))
+        except (OSError, RuntimeError) as e:  # no process support (e.g. frozen app, sandbox)
+            log(f"⚠️ Parallel asset scan unavailable ({e}); scanning in-process.")
+    return [find_missing_assets(b) for b in bundles]
@@ -0,0 +1,488 @@
+"""
+Offline benchmarks for script_v4 (`--bench-grid`, `--bench-preview`): the real grid scan and
+TC10/TC11 preview flow against a local HTTP server, no platform login. Each run gets its own
+data dir (qa_common.DATA_DIR) and puts script_v4's run flags back when it is done.
+"""
+import re
+import json
+import time
+import queue
+import shutil
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse, quote
+
+import qa_common
+import script_v4 as qa
+from qa_common import log, _data_dir, RunTrace
+from qa_analysis import scan_bundles
+from qa_rules import DURATION_VALUES, ASPECT_RATIOS
+
+# ---------- Benchmarks (offline, synthetic creative-manager grid) ----------
+# A local HTTP server serves synthetic libraries behind a virtualized, React-grid-like
+# page (same classes the harvester reads as platform-dup.html), so a full scan can be
+# timed without the platform. Grid-only: the preview pipeline has its own benchmark.
+_BENCH_TYPES = (  # (grid type, extensions, share)
+    ("Alt Image", (".png", ".jpg", ".gif"), 0.35),
+    ("HTML_Standard", (".zip",), 0.22),
+    ("HTML_OnPage", (".zip",), 0.10),
+    ("HTML_Expand", (".zip",), 0.03),
+    ("Preroll", (".mp4",), 0.17),
+    ("Dynamic_Preroll", (".zip",), 0.07),
+    ("VastAudio", (".mp3",), 0.06),
+)
+_BENCH_SIZES = (("300x250", 0.30), ("728x90", 0.15), ("160x600", 0.10), ("300x600", 0.10), ("320x50", 0.15),
+                ("300x50", 0.05), ("320x100", 0.05), ("970x250", 0.05), ("1x1", 0.05))
+_BENCH_STATUSES = (("For QA", 0.45), ("Approved", 0.30), ("Draft", 0.10), ("Rejected", 0.10), ("Live", 0.05))
+_BENCH_BRANDS = ("Ozempic", "MikeAndTom", "Poolout", "HighPollen", "Acme", "Northwind", "Contoso", "Globex")
+_BENCH_COLUMNS = (("", None), ("Creative Name", "name"), ("ID", "id"), ("Status", "status"), ("Type", "type"),
+                  ("Placement Size", "placement_size"), ("Base File Size", "base_file_size"),
+                  ("File Name", "file_name"), ("Last Modified", "modified"))
+
+def synthetic_library(n, seed=7):
+    """n grid rows with platform-like type/size/status mixes and a few deliberate TC failures."""
+    import random
+    rnd = random.Random(f"{seed}:{n}")
+
+    def pick(weighted):
+        return rnd.choices([w[0] for w in weighted], [w[-1] for w in weighted])[0]
+
+    types = {t[0]: t[1] for t in _BENCH_TYPES}
+    rows = []
+    for i in range(n):
+        ctype = pick(_BENCH_TYPES)
+        ext = rnd.choice(types[ctype])
+        av = ctype in ("Preroll", "Dynamic_Preroll", "VastAudio")
+        size = "0x0" if av else pick(_BENCH_SIZES)
+        parts = [rnd.choice(_BENCH_BRANDS), f"Q{rnd.randint(1, 4)}", f"Flight{rnd.randint(1, 12)}"]
+        if av:
+            if rnd.random() < 0.9:
+                parts += [f"{rnd.choice(DURATION_VALUES)}s", rnd.choice(ASPECT_RATIOS)]
+        elif rnd.random() < 0.95:
+            parts.append(size)
+        name = "_".join(parts) + f"_v{rnd.randint(1, 5)}" + ext
+        if av:
+            kb = rnd.lognormvariate(9.0, 0.6)           # ~8 MB median
+        else:
+            kb = rnd.lognormvariate(4.8, 0.8)           # ~120 KB median, a few over 600 KB
+        rows.append({
+            "id": str(4000000 + i),
+            "name": name,
+            "status": pick(_BENCH_STATUSES),
+            "type": ctype,
+            "placement_size": size,
+            "base_file_size": f"{kb / 1024:.1f} MB" if kb >= 1024 else f"{kb:.1f} KB",
+            "file_name": name if rnd.random() > 0.03 else name.replace("_v", "_final_v"),
+            "modified": time.strftime("%Y-%m-%d %H:%M", time.gmtime(1.7e9 + rnd.randint(0, 30_000_000))),
+        })
+    return rows
+
+_BENCH_GRID_HTML = r"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Creative Library (synthetic)</title>
+<style>
+body { margin: 0; font: 13px sans-serif; }
+.react-grid-Header { display: flex; background: #eef; }
+.react-grid-HeaderCell, .react-grid-Cell { flex: 0 0 170px; box-sizing: border-box; padding: 8px 6px;
+  white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+.react-grid-HeaderCell:first-child, .react-grid-Cell:first-child { flex-basis: 40px; }
+div.ReactVirtualized__Grid { position: relative; height: calc(100vh - 40px); overflow: auto; }
+.ft-canvas { position: relative; width: 1400px; }
+div.react-grid-Row { position: absolute; left: 0; right: 0; height: 35px; display: flex; border-bottom: 1px solid #eee; }
+nav.react-contextmenu { display: none; position: fixed; top: 36px; left: 8px; background: #fff; border: 1px solid #ccc; }
+nav.react-contextmenu.is-open { display: block; }
+.react-contextmenu-item { padding: 6px 12px; cursor: pointer; }
+</style></head>
+<body>
+<!-- Toolbar and context menu sit at the platform's XPaths (XPATH_PREVIEWS_BTN_SPAN, XPATH_PREVIEW_CREATIVE_PRIVATE) -->
+<main><section>
+<div class="info-header"></div>
+<div><div><div></div><div><div></div><div></div><div class="button-side"><div><div>
+  <button id="previews"><span>Previews</span></button>
+</div></div></div></div></div></div>
+<div class="react-grid-Header" id="hdr"></div>
+<div class="ReactVirtualized__Grid" id="grid"><div class="ft-canvas" id="canvas"></div></div>
+</section></main>
+<div></div>
+<div><div></div><div></div><div><nav class="react-contextmenu" id="menu">
+  <div class="react-contextmenu-item disabled"><span>Download</span></div>
+  <div class="react-contextmenu-item" id="preview-item"><div><span>Preview Creative</span></div></div>
+</nav></div></div>
+<script>
+var COLS = __COLUMNS__, ROW_H = 35, PAGE = 200, OVERSCAN = 4, LAZY_MS = __LAZY_MS__;
+var grid = document.getElementById('grid'), canvas = document.getElementById('canvas');
+var rows = [], loaded = 0, loading = false, queued = false, mounted = {}, checked = {};
+COLS.forEach(function (c) {
+  var h = document.createElement('div'); h.className = 'react-grid-HeaderCell'; h.textContent = c[0];
+  document.getElementById('hdr').appendChild(h);
+});
+function cell(text, title) {
+  var c = document.createElement('div'); c.className = 'react-grid-Cell';
+  if (title) c.setAttribute('title', title);
+  c.textContent = text; return c;
+}
+function rowEl(i) {
+  var d = rows[i], r = document.createElement('div');
+  r.className = 'react-grid-Row'; r.style.top = (i * ROW_H) + 'px';
+  COLS.forEach(function (c) {
+    var key = c[1];
+    if (!key) {
+      var c0 = cell(''), cb = document.createElement('input'); cb.type = 'checkbox'; cb.checked = !!checked[d.id];
+      cb.addEventListener('click', function () { if (cb.checked) checked[d.id] = 1; else delete checked[d.id]; });
+      c0.appendChild(cb); r.appendChild(c0);
+    } else if (key === 'name') {
+      var cn = cell(''), s = document.createElement('span'), a = document.createElement('a');
+      s.className = 'name-overflow'; a.href = '/creative/' + d.id; a.textContent = d.name;
+      s.appendChild(a); cn.appendChild(s); r.appendChild(cn);
+    } else if (key === 'file_name') {
+      var full = d[key];
+      r.appendChild(cell(full.length > 24 ? full.slice(0, 21) + '...' : full, full));
+    } else {
+      r.appendChild(cell(d[key]));
+    }
+  });
+  return r;
+}
+function render() {
+  canvas.style.height = (loaded * ROW_H) + 'px';
+  var first = Math.max(0, Math.floor(grid.scrollTop / ROW_H) - OVERSCAN);
+  var last = Math.min(loaded, Math.ceil((grid.scrollTop + grid.clientHeight) / ROW_H) + OVERSCAN);
+  Object.keys(mounted).forEach(function (k) {
+    if (k < first || k >= last) { canvas.removeChild(mounted[k]); delete mounted[k]; }
+  });
+  for (var i = first; i < last; i++) {
+    if (!mounted[i]) { mounted[i] = rowEl(i); canvas.appendChild(mounted[i]); }
+  }
+  if (!loading && loaded < rows.length && grid.scrollTop + grid.clientHeight >= loaded * ROW_H - ROW_H) {
+    loading = true;   // next lazy page, like the platform's infinite scroll
+    setTimeout(function () { loaded = Math.min(rows.length, loaded + PAGE); loading = false; render(); }, LAZY_MS);
+  }
+}
+grid.addEventListener('scroll', function () {
+  if (queued) return;
+  queued = true;
+  requestAnimationFrame(function () { queued = false; render(); });
+});
+var menu = document.getElementById('menu');
+document.getElementById('previews').addEventListener('click', function () {
+  if (Object.keys(checked).length) menu.classList.add('is-open');
+});
+document.getElementById('preview-item').addEventListener('click', function () {
+  menu.classList.remove('is-open');
+  Object.keys(checked).forEach(function (id) { window.open('/preview/' + id, '_blank'); });
+});
+fetch(location.pathname.replace(/\/$/, '') + '/rows').then(function (r) { return r.json(); }).then(function (d) {
+  rows = d; loaded = Math.min(PAGE, rows.length); render();
+});
+</script>
+</body></html>
+"""
+
+class _LocalServer:
+    """Threaded HTTP server on 127.0.0.1 (random port); route(path) → (status, content type, bytes)."""
+    def __init__(self, route):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    status, ctype, body = route(urlparse(self.path).path)
+                except Exception as e:
+                    status, ctype, body = 500, "text/plain", str(e).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, name="bench-http", daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def _bench_grid_route(libraries, lazy_ms=150):
+    """Routes for /library/<n> (grid page), /library/<n>/rows (JSON) and /creative/<id>."""
+    cols = json.dumps([[title, key] for title, key in _BENCH_COLUMNS])
+    page = _BENCH_GRID_HTML.replace("__COLUMNS__", cols).replace("__LAZY_MS__", str(int(lazy_ms))).encode("utf-8")
+    payloads = {k: json.dumps(v).encode("utf-8") for k, v in libraries.items()}
+
+    def route(path):
+        parts = [p for p in path.split("/") if p]
+        if len(parts) >= 2 and parts[0] == "library" and parts[1] in payloads:
+            if len(parts) == 3 and parts[2] == "rows":
+                return 200, "application/json", payloads[parts[1]]
+            if len(parts) == 2:
+                return 200, "text/html; charset=utf-8", page
+        if len(parts) == 2 and parts[0] == "creative":
+            return 200, "text/html; charset=utf-8", f"<title>Creative {parts[1]}</title>".encode("utf-8")
+        return 404, "text/plain", b"not found"
+    return route
+
+@contextmanager
+def _count_webdriver_commands():
+    """Counter of WebDriver wire commands (by name) sent while the block runs."""
+    from selenium.webdriver.remote.webdriver import WebDriver as _RemoteWebDriver
+    counts = Counter()
+    original = _RemoteWebDriver.execute
+
+    def execute(self, driver_command, params=None):
+        counts[driver_command] += 1
+        return original(self, driver_command, params)
+
+    _RemoteWebDriver.execute = execute
+    try:
+        yield counts
+    finally:
+        _RemoteWebDriver.execute = original
+
+@contextmanager
+def _bench_run(data_dir=None, **flags):
+    """
+    script_v4 run flags (GRID_ONLY=True, …) and data dir for the duration of a benchmark,
+    restored afterwards. Yields the data dir; a throwaway one when data_dir is None.
+    """
+    import tempfile
+    saved = {k: getattr(qa, k) for k in flags}
+    saved_dir = qa_common.DATA_DIR
+    run_dir = Path(data_dir) if data_dir else Path(tempfile.mkdtemp(prefix="ft-bench-"))
+    run_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    try:
+        for k, v in flags.items():
+            setattr(qa, k, v)
+        qa_common.DATA_DIR = run_dir
+        yield run_dir
+    finally:
+        for k, v in saved.items():
+            setattr(qa, k, v)
+        qa_common.DATA_DIR = saved_dir
+        if not data_dir:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+def _latest_trace_steps(data_dir):
+    traces = sorted((Path(data_dir) / "reports").glob("trace_*.json"), key=lambda p: p.stat().st_mtime)
+    if not traces:
+        return {}
+    try:
+        return json.loads(traces[-1].read_text(encoding="utf-8")).get("otherData", {}).get("steps", {})
+    except Exception:
+        return {}
+
+def bench_grid(sizes=(100, 1000, 10000), seed=7, data_dir=None):
+    """
+    Full grid scans (harvest + TC1–TC9, no previews) of synthetic libraries served locally.
+    Per size: creatives/min, WebDriver commands per creative and peak Python memory.
+    Runs use data_dir as their data dir (default: a throwaway temp dir); the report is
+    written to the user's <data dir>/reports/bench_grid_*.json.
+    """
+    import tracemalloc
+    report_path = _data_dir() / "reports" / f"bench_grid_{time.strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    libraries = {str(n): synthetic_library(n, seed) for n in sizes}
+    server = _LocalServer(_bench_grid_route(libraries))
+    results = []
+    try:
+        with _bench_run(data_dir, GRID_ONLY=True, PROCESS_ALL=True, USE_VERDICT_CACHE=False, DELTA_MODE=False,
+                        TRACE_RUNS=True, RESULT_SINK=None) as run_dir:
+            qa._browser_pool.release(qa._browser_pool.acquire())  # browser launch stays out of the timings
+            for n in sizes:
+                records = []
+                qa.RESULT_SINK = records.append
+                log(f"🏁 Benchmark: {n} creatives…")
+                tracemalloc.start()
+                with _count_webdriver_commands() as counts:
+                    t0 = time.perf_counter()
+                    qa.selenium_login("bench", "bench", f"{server.url}/library/{n}")
+                    seconds = time.perf_counter() - t0
+                py_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                commands = sum(counts.values())
+                checked = sum(1 for r in records if r.get("result") == "checked")
+                steps = _latest_trace_steps(run_dir)
+                results.append({
+                    "creatives": n,
+                    "found": checked,
+                    "seconds": round(seconds, 3),
+                    "harvest_s": (steps.get("grid.harvest") or {}).get("total_s"),
+                    "creatives_per_min": round(checked / seconds * 60, 1) if seconds else None,
+                    "webdriver_commands": commands,
+                    "commands_per_creative": round(commands / max(1, n), 3),
+                    "top_commands": dict(counts.most_common(5)),
+                    "py_peak_mb": round(py_peak / 2 ** 20, 1),
+                })
+                if checked != n:
+                    log(f"⚠️ Benchmark scan found {checked} of {n} creatives.")
+    finally:
+        server.close()
+
+    log(f"{'Creatives':>10} {'found':>7} {'seconds':>9} {'harvest s':>10} {'per min':>9} {'cmds':>7} {'cmds/cr':>8} {'py MB':>7}")
+    for r in results:
+        log(f"{r['creatives']:>10} {r['found']:>7} {r['seconds']:>9.2f} {r['harvest_s'] or 0:>10.2f} "
+            f"{r['creatives_per_min'] or 0:>9.0f} {r['webdriver_commands']:>7} {r['commands_per_creative']:>8.3f} "
+            f"{r['py_peak_mb']:>7.1f}")
+    try:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps({"seed": seed, "results": results}, indent=2), encoding="utf-8")
+        log(f"📝 Benchmark report: {report_path}")
+    except Exception as e:
+        log(f"⚠️ Could not write benchmark report: {e}")
+    return results
+
+# Preview-pipeline benchmark: the real TC10/TC11 flow (_PreviewWorker → _run_preview_checks)
+# against the creative-preview/ corpus, served behind a fake preview page (iframe#ad) whose
+# clickTags are rewritten to a local /clicktag page, like the platform does.
+_PREVIEW_FIXTURE_EXPECT = {  # known-bad fixtures double as correctness checks
+    "Poolout_Revision1": {"TC11": "FAIL"},        # index.html references img/*, bundle has no img/
+    "web-console-error-test": {"TC10": "FAIL", "TC11": "FAIL"},  # ReferenceError, no exit
+}
+_CLICKTAG_VALUE_RE = re.compile(r"""(\bclickTag\d*\s*[:=]\s*)(["'])(.*?)\2""", re.IGNORECASE)
+_AD_SIZE_RE = re.compile(r"""name=["']ad\.size["']\s+content=["']width=\s*(\d+)\s*,\s*height=\s*(\d+)""", re.IGNORECASE)
+
+def _preview_corpus(corpus_dir=None):
+    """[{id, name, path (bundle dir or .html file), width, height}] for creative-preview/ (+ the console-error test page)."""
+    base = Path(corpus_dir) if corpus_dir else Path(__file__).resolve().parent.parent / "creative-preview"
+    items = [d for d in sorted(base.iterdir()) if (d / "index.html").is_file()]
+    items += sorted(base.glob("*.html"))
+    extra = base.parent / "web-console-error-test.html"
+    if extra.is_file():
+        items.append(extra)
+    corpus = []
+    for i, path in enumerate(items):
+        index = path / "index.html" if path.is_dir() else path
+        m = _AD_SIZE_RE.search(index.read_text(encoding="utf-8", errors="replace"))
+        corpus.append({"id": str(5000000 + i), "name": path.stem if path.is_file() else path.name, "path": path,
+                       "width": int(m.group(1)) if m else 300, "height": int(m.group(2)) if m else 250})
+    return corpus
+
+def _bench_preview_route(corpus):
+    """Grid page with the corpus as rows, /preview/<id> (iframe#ad), /lcrp/<id>/… (bundle files), /clicktag."""
+    import mimetypes
+    by_id = {c["id"]: c for c in corpus}
+    rows = [{"id": c["id"], "name": c["name"] + (".zip" if c["path"].is_dir() else ".html"), "status": "For QA",
+             "type": "HTML_Standard", "placement_size": f"{c['width']}x{c['height']}", "base_file_size": "0 KB",
+             "file_name": c["name"], "modified": ""} for c in corpus]
+    grid = _bench_grid_route({"preview": rows})
+
+    def route(path):
+        parts = [p for p in path.split("/") if p]
+        if len(parts) == 2 and parts[0] == "preview" and parts[1] in by_id:
+            c = by_id[parts[1]]
+            return 200, "text/html; charset=utf-8", (
+                f"<!doctype html><title>Preview {c['name']}</title><body style='margin:0'>"
+                f"<iframe id='ad' src='/lcrp/{c['id']}/index.html' width='{c['width']}' height='{c['height']}'"
+                f" frameborder='0' scrolling='no'></iframe></body>").encode("utf-8")
+        if len(parts) >= 3 and parts[0] == "lcrp" and parts[1] in by_id:
+            c = by_id[parts[1]]
+            rel = "/".join(parts[2:])
+            root_dir = c["path"] if c["path"].is_dir() else c["path"].parent
+            if rel == "index.html" and c["path"].is_file():
+                target = c["path"]
+            else:
+                target = (root_dir / rel).resolve()
+                if root_dir.resolve() not in target.parents:
+                    return 404, "text/plain", b"not found"
+            if not target.is_file():
+                return 404, "text/plain", b"not found"
+            body = target.read_bytes()
+            if target.suffix.lower() in (".html", ".htm"):
+                text = _CLICKTAG_VALUE_RE.sub(
+                    lambda m: f"{m.group(1)}{m.group(2)}/clicktag?url={quote(m.group(3), safe='')}{m.group(2)}",
+                    body.decode("utf-8", errors="replace"))
+                body = text.encode("utf-8")
+            return 200, mimetypes.guess_type(target.name)[0] or "application/octet-stream", body
+        if parts[:1] == ["clicktag"]:
+            return 200, "text/html; charset=utf-8", b"<title>ClickTag</title><h1>Standard Click Tag</h1>"
+        return grid(path)
+    return route
+
+def bench_previews(corpus_dir=None, repeat=3, workers=2, data_dir=None):
+    """
+    Runs TC10/TC11 for every corpus creative `repeat` times across `workers` browsers, with
+    data_dir as the workers' data dir (default: a throwaway temp dir).
+    Returns {"results": per-creative latency and verdicts, "steps": span stats, "mismatches": [...]}
+    and writes the user's <data dir>/reports/bench_preview_*.json.
+    """
+    corpus = _preview_corpus(corpus_dir)
+    assets = {c["id"]: r["missing"] for c, r in zip(corpus, scan_bundles([c["path"] for c in corpus]))}
+    for c in corpus:
+        if assets[c["id"]]:
+            log(f"🧩 {c['name']}: {len(assets[c['id']])} missing asset(s) (e.g. {assets[c['id']][0]['ref']}).")
+    report_path = _data_dir() / "reports" / f"bench_preview_{time.strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    col_index_map = {title.lower(): i for i, (title, _) in enumerate(_BENCH_COLUMNS) if title}
+    server = _LocalServer(_bench_preview_route(corpus))
+    jobs, results, pool = queue.Queue(), queue.Queue(), []
+    runs = {c["id"]: [] for c in corpus}  # id -> [(tc10, tc11, seconds)]
+    trace = qa_common._run_trace = RunTrace()
+    expected = len(corpus) * repeat
+    done, seconds = 0, 0.0
+    try:
+        with _bench_run(data_dir):
+            seq_ids = {}
+            for _ in range(repeat):
+                for row, c in enumerate(corpus):
+                    seq = len(seq_ids) + 1
+                    seq_ids[seq] = c["id"]
+                    rec = {"id": c["id"], "name": c["name"], "href": f"{server.url}/creative/{c['id']}",
+                           "top": row * 35}
+                    jobs.put((seq, rec, col_index_map))
+            log(f"🏁 Preview benchmark: {len(corpus)} creatives × {repeat} on {workers} browser(s)…")
+            t0 = time.perf_counter()
+            pool = qa._start_preview_workers(max(1, workers), jobs, results, "bench", "bench",
+                                             f"{server.url}/library/preview")
+            try:
+                while done < expected:
+                    try:
+                        n, tc10, tc11, details = results.get(timeout=1.0)
+                    except queue.Empty:
+                        if any(w.is_alive() for w in pool):
+                            continue
+                        log("⚠️ No preview workers left; benchmark stopped early.")
+                        break
+                    done += 1
+                    runs[seq_ids[n]].append((tc10, tc11, (details or {}).get("preview_s")))
+                seconds = time.perf_counter() - t0
+            finally:
+                qa._stop_preview_workers(pool, jobs)  # before the data dir goes away
+    finally:
+        qa_common._run_trace = None
+        server.close()
+
+    out, mismatches = [], []
+    for c in corpus:
+        r = runs[c["id"]]
+        lat = sorted(x[2] for x in r if x[2] is not None)
+        row = {"creative": c["name"], "runs": len(r),
+               "p50_s": lat[len(lat) // 2] if lat else None,
+               "p95_s": lat[min(len(lat) - 1, int(round(0.95 * (len(lat) - 1))))] if lat else None,
+               "TC10": dict(Counter(x[0] for x in r)), "TC11": dict(Counter(x[1] for x in r)),
+               "missing_assets": len(assets[c["id"]])}
+        for tc, want in _PREVIEW_FIXTURE_EXPECT.get(c["name"], {}).items():
+            bad = sum(1 for x in r if (x[0] if tc == "TC10" else x[1]) != want)
+            if bad or not r:
+                mismatches.append(f"{c['name']} {tc}: expected {want} in all {len(r)} run(s), {bad} differ")
+        out.append(row)
+
+    log(f"{'Creative':32} {'runs':>5} {'p50 s':>7} {'p95 s':>7}  TC10 / TC11")
+    for row in out:
+        log(f"{row['creative'][:32]:32} {row['runs']:>5} {row['p50_s'] or 0:>7.2f} {row['p95_s'] or 0:>7.2f}  "
+            f"{row['TC10']} / {row['TC11']}")
+    log(f"⏱️ {done} preview(s) in {seconds:.1f}s ({done / seconds * 60 if seconds else 0:.1f}/min).")
+    for line in trace.summary_lines():
+        log(line)
+    for m in mismatches:
+        log(f"❌ Fixture check: {m}")
+    report = {"repeat": repeat, "workers": workers, "previews": done, "seconds": round(seconds, 3),
+              "results": out, "steps": trace.step_stats(), "mismatches": mismatches}
+    try:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        log(f"📝 Benchmark report: {report_path}")
+    except Exception as e:
+        log(f"⚠️ Could not write benchmark report: {e}")
+    return report
@@ -0,0 +1,107 @@
+"""
+Shared plumbing for script_v4 and its browser-free modules: the console logger,
+the per-user data dir and per-step run tracing.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+_thread_state = threading.local()  # per-thread driver / log tag / span sums (preview workers)
+LOG_STREAM = None   # None => stdout; the CLI points this at stderr when results go to stdout
+DATA_DIR = None     # overrides FT_DATA_DIR for this process (benchmarks run in a scratch dir)
+
+# ------------------------------
+# Console logger (terminal only)
+# ------------------------------
+def log(message: str):
+    ts = time.strftime("%H:%M:%S")
+    tag = getattr(_thread_state, "tag", "")
+    print(f"[{ts}] {tag}{message}", file=LOG_STREAM or sys.stdout, flush=True)
+
+# ---------- Data dir ----------
+def _data_dir():
+    """Per-user state folder (DATA_DIR, else FT_DATA_DIR, else ~/.basefile-qa). Created on first use."""
+    d = Path(DATA_DIR or os.getenv("FT_DATA_DIR", "").strip() or (Path.home() / ".basefile-qa"))
+    d.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return d
+
+# ---------- Run tracing (per-step spans) ----------
+class RunTrace:
+    """
+    Per-step spans for one run. Each span becomes a Chrome trace "X" event on its thread's
+    track (grid browser, preview workers) and a sample for the per-step latency summary.
+    Spans closed while a creative is previewed are also summed into that creative's timings.
+    """
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.events = []
+        self.steps = {}   # step -> [seconds]
+        self._tids = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter(), args)
+
+    def _add(self, name, start, end, args):
+        th = threading.current_thread()
+        with self._lock:
+            tid = self._tids.get(th.ident)
+            if tid is None:
+                tid = self._tids[th.ident] = len(self._tids) + 1
+                self.events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                                    "args": {"name": th.name}})
+            ev = {"name": name, "cat": "step", "ph": "X", "pid": 1, "tid": tid,
+                  "ts": round((start - self.t0) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+            if args:
+                ev["args"] = args
+            self.events.append(ev)
+            self.steps.setdefault(name, []).append(end - start)
+        spans = getattr(_thread_state, "spans", None)
+        if spans is not None:
+            spans[name] = round(spans.get(name, 0.0) + end - start, 3)
+
+    def step_stats(self):
+        """{step: {count, total_s, p50_s, p95_s, max_s}}, slowest total first."""
+        with self._lock:
+            steps = {k: sorted(v) for k, v in self.steps.items()}
+        def pick(vals, q):
+            return vals[min(len(vals) - 1, int(round(q * (len(vals) - 1))))]
+
+        out = {}
+        for name, vals in sorted(steps.items(), key=lambda kv: -sum(kv[1])):
+            out[name] = {"count": len(vals), "total_s": round(sum(vals), 3), "p50_s": round(pick(vals, 0.5), 3),
+                         "p95_s": round(pick(vals, 0.95), 3), "max_s": round(vals[-1], 3)}
+        return out
+
+    def summary_lines(self):
+        lines = [f"{'Step':24} {'n':>6} {'total s':>9} {'p50 s':>8} {'p95 s':>8} {'max s':>8}"]
+        for name, st in self.step_stats().items():
+            lines.append(f"{name:24} {st['count']:>6} {st['total_s']:>9.2f} {st['p50_s']:>8.3f} "
+                         f"{st['p95_s']:>8.3f} {st['max_s']:>8.3f}")
+        return lines
+
+    def export(self, path):
+        """Chrome trace / Perfetto JSON (chrome://tracing, ui.perfetto.dev); step stats under otherData."""
+        with self._lock:
+            events = list(self.events)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"steps": self.step_stats()}}, f)
+        return path
+
+_run_trace = None  # RunTrace of the run in progress (shared by the preview workers)
+
+def _span(name, **args):
+    """Timing span for the current run (no-op when tracing is off)."""
+    trace = _run_trace
+    return trace.span(name, **args) if trace is not None else nullcontext()
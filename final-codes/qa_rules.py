@@ -0,0 +1,255 @@
+"""
+TC1–TC9 rule engine: grid records in a columnar CreativeBatch, evaluated in column passes.
+Browser-free; the grid harvester, exports and fixtures all produce the same records.
+"""
+from pathlib import Path
+
+from qa_common import _span
+
+# ---------- TC1–TC9 rule engine (browser-free, batch) ----------
+GRID_CASES = tuple(f"TC{i}" for i in range(1, 10))
+
+PLACEMENT_REQUIRED_TYPES = frozenset({"alt image", "html_onpage", "html_expand", "html_standard"})
+
+# TYPE ↔ EXTENSION mapping (supports dynamic_preroll zipped creatives)
+EXT_OK_MAP = {
+    "altimage": frozenset({".png", ".jpg", ".jpeg", ".gif"}),
+    "htmlonpage": frozenset({".zip"}),
+    "html_standard": frozenset({".zip"}),
+    "htmlstandard": frozenset({".zip"}),
+    "html_onpage": frozenset({".zip"}),
+    "preroll": frozenset({".mp4"}),
+    "dynamic_preroll": frozenset({".zip"}),   # zipped dynamic video
+    "vastaudio": frozenset({".mp3"}),
+}
+VALID_FORMATS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".mp3", ".mp4", ".zip"})
+VIDEO_AUDIO_TYPES = frozenset({"preroll", "dynamic_preroll", "vastaudio"})
+DURATION_VALUES = ("6", "10", "15", "20", "30", "60", "90", "120")
+ASPECT_RATIOS = ("16x9", "4x3", "1x1", "9x16")
+
+# Export column headers → CreativeBatch fields
+_EXPORT_HEADERS = {
+    "creative name": "names", "name": "names",
+    "id": "ids", "status": "statuses", "type": "types",
+    "placement size": "placement_sizes", "base file size": "base_file_sizes",
+    "file name": "file_names", "link": "hrefs", "url": "hrefs",
+    "last modified": "modified",
+}
+
+def _normalize_snapshot_row(raw):
+    """Apply the same fallbacks the per-cell reads used (missing column / short row)."""
+    def _get(key, missing):
+        v = raw.get(key)
+        return missing if v is None else str(v).strip()
+    rec = {
+        "id": _get("id", "[Missing]"),
+        "name": _get("name", "[Missing]"),
+        "href": (raw.get("href") or "").strip(),
+        "status": _get("status", "[Missing]"),
+        "type": _get("type", "[Missing]"),
+        "placement_size": _get("placement_size", "0x0").replace(" ", ""),
+        "base_file_size": raw.get("base_file_size"),
+        "file_name": raw.get("file_name"),
+        "top": raw.get("top"),
+        "modified": raw.get("modified"),
+    }
+    if rec["base_file_size"] is not None:
+        rec["base_file_size"] = str(rec["base_file_size"]).strip()
+    if rec["file_name"] is not None:
+        rec["file_name"] = str(rec["file_name"]).strip()
+    if rec["modified"] is not None:
+        rec["modified"] = str(rec["modified"]).strip()
+    return rec
+
+class CreativeBatch:
+    """
+    Columnar store of creative grid records (one list per field).
+    Missing values follow the grid fallbacks: "[Missing]" for id/name/status/type,
+    "0x0" for placement size, None for absent base-file-size / file-name columns.
+    """
+    __slots__ = ("ids", "names", "hrefs", "statuses", "types",
+                 "placement_sizes", "base_file_sizes", "file_names", "tops", "modified")
+
+    def __init__(self):
+        for f in self.__slots__:
+            setattr(self, f, [])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, rec):
+        self.ids.append(rec["id"])
+        self.names.append(rec["name"])
+        self.hrefs.append(rec.get("href") or "")
+        self.statuses.append(rec["status"])
+        self.types.append(rec["type"])
+        self.placement_sizes.append(rec["placement_size"])
+        self.base_file_sizes.append(rec.get("base_file_size"))
+        self.file_names.append(rec.get("file_name"))
+        self.tops.append(rec.get("top"))
+        self.modified.append(rec.get("modified"))
+
+    def record(self, i):
+        """Row view (dict) for the preview step and logging."""
+        return {
+            "id": self.ids[i], "name": self.names[i], "href": self.hrefs[i],
+            "status": self.statuses[i], "type": self.types[i],
+            "placement_size": self.placement_sizes[i],
+            "base_file_size": self.base_file_sizes[i], "file_name": self.file_names[i],
+            "top": self.tops[i], "modified": self.modified[i],
+        }
+
+    def to_columns(self):
+        """{field: [values]} (compact form for fixtures)."""
+        return {f: list(getattr(self, f)) for f in self.__slots__}
+
+    @classmethod
+    def from_columns(cls, columns):
+        batch = cls()
+        n = len(columns.get("ids") or [])
+        for f in cls.__slots__:
+            setattr(batch, f, list(columns.get(f) or [None] * n))
+        return batch
+
+    @classmethod
+    def from_records(cls, records):
+        batch = cls()
+        for rec in records:
+            batch.append(rec)
+        return batch
+
+    @classmethod
+    def from_export(cls, path):
+        """Load a library export (CSV with grid column headers)."""
+        import csv
+        batch = cls()
+        with Path(path).open("r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            fields = {}
+            for i, h in enumerate(header):
+                field = _EXPORT_HEADERS.get(h.strip().lower())
+                if field and field not in fields:
+                    fields[field] = i
+            for row in reader:
+                raw = {}
+                for field, i in fields.items():
+                    raw[field] = row[i] if i < len(row) else None
+                batch.append(_normalize_snapshot_row({
+                    "id": raw.get("ids"), "name": raw.get("names"), "href": raw.get("hrefs"),
+                    "status": raw.get("statuses"), "type": raw.get("types"),
+                    "placement_size": raw.get("placement_sizes"),
+                    "base_file_size": raw.get("base_file_sizes"),
+                    "file_name": raw.get("file_names"),
+                    "modified": raw.get("modified"),
+                }))
+        return batch
+
+def _size_kb(size_text):
+    """Base file size → KB. Returns None when a KB/MB value can't be parsed (TC5 FAIL)."""
+    t = size_text.strip().lower()
+    try:
+        if "mb" in t:
+            return float(t.replace("mb", "").strip()) * 1024
+        if "kb" in t:
+            return float(t.replace("kb", "").strip())
+    except ValueError:
+        return None
+    try:
+        return float(t)
+    except ValueError:
+        return 0.0
+
+def _name_ext(name_lower):
+    dot = name_lower.rfind(".")
+    ext = name_lower[dot:] if dot >= 0 else ""
+    return ext if ext in VALID_FORMATS else ""
+
+def evaluate_batch(batch):
+    """
+    Evaluate TC1–TC9 for a whole CreativeBatch in column passes.
+    Returns {"TC1": [...], …, "TC9": [...], "ext": [...], "ctype": [...], "is_for_qa": [...]}.
+    """
+    names = batch.names
+    n = len(names)
+    # Derived columns (type normalisation is memoised per distinct value)
+    ctype_of = {}
+    for t in set(batch.types):
+        ctype_of[t] = t.lower().replace(" ", "").replace("-", "_")
+    types_lower = [t.lower() for t in batch.types]
+    ctypes = [ctype_of[t] for t in batch.types]
+    names_lower = [nm.lower() for nm in names]
+    exts = [_name_ext(nl) for nl in names_lower]
+    statuses = [st.strip().lower() for st in batch.statuses]
+    is_for_qa = [("for qa" in st) or st == "qa" for st in statuses]
+    av = [ct in VIDEO_AUDIO_TYPES for ct in ctypes]
+
+    out = {"ext": exts, "ctype": ctypes, "is_for_qa": is_for_qa}
+
+    with _span("TC1"):
+        out["TC1"] = ["PASSED" if q else "FAIL" for q in is_for_qa]
+
+    with _span("TC2"):
+        out["TC2"] = [
+            ("PASSED" if ps in nm.replace(" ", "") else "FAIL")
+            if (ps != "0x0" and tl in PLACEMENT_REQUIRED_TYPES) else "PASSED"
+            for ps, tl, nm in zip(batch.placement_sizes, types_lower, names)
+        ]
+
+    with _span("TC3"):
+        out["TC3"] = ["PASSED" if e else "FAIL" for e in exts]
+
+    with _span("TC4"):
+        out["TC4"] = [
+            ("PASSED" if e in EXT_OK_MAP[ct] else "FAIL") if ct in EXT_OK_MAP else "N/A"
+            for e, ct in zip(exts, ctypes)
+        ]
+
+    with _span("TC5"):
+        size_cache = {}
+        tc5 = [None] * n
+        for i, (bfs, is_av) in enumerate(zip(batch.base_file_sizes, av)):
+            if bfs is None:
+                tc5[i] = "N/A"
+                continue
+            if bfs not in size_cache:
+                size_cache[bfs] = _size_kb(bfs)
+            kb = size_cache[bfs]
+            if kb is None:
+                tc5[i] = "FAIL"
+            elif is_av:
+                tc5[i] = "PASSED"
+            else:
+                tc5[i] = "PASSED" if kb <= 600 else "FAIL"
+        out["TC5"] = tc5
+
+    with _span("TC6"):
+        out["TC6"] = ["PASSED" if ps.lower() == "1x1" else "N/A" for ps in batch.placement_sizes]
+
+    # TC7 — creative name vs the row's own full "File Name" text (duplicate names are checked separately)
+    with _span("TC7"):
+        tc7 = [None] * n
+        for i, (nm, fn) in enumerate(zip(names, batch.file_names)):
+            expected = fn.strip().lower() if (fn is not None and nm and nm != "[Missing]") else ""
+            tc7[i] = "PASSED" if nm.strip().lower() == expected else "FAIL"
+        out["TC7"] = tc7
+
+    with _span("TC8"):
+        out["TC8"] = [
+            ("PASSED" if (any(d in nl for d in DURATION_VALUES) and any(r in nl for r in ASPECT_RATIOS)) else "FAIL")
+            if is_av else "N/A"
+            for nl, is_av in zip(names_lower, av)
+        ]
+
+    with _span("TC9"):
+        out["TC9"] = [
+            ("PASSED" if ct == "vastaudio" else "FAIL") if e == ".mp3" else "N/A"
+            for e, ct in zip(exts, ctypes)
+        ]
+    return out
+
+def _grid_cases_at(verdicts, i):
+    """(cases, info) for row i of an evaluate_batch() result."""
+    cases = {k: verdicts[k][i] for k in GRID_CASES}
+    info = {"ext": verdicts["ext"][i], "ctype": verdicts["ctype"][i], "is_for_qa": verdicts["is_for_qa"][i]}
+    return cases, info
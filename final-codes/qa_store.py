@@ -0,0 +1,339 @@
+"""
+On-disk state under the data dir: the cross-run verdict cache, the results store
+(with query_results) and the grid snapshots behind delta runs. Browser-free.
+"""
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from qa_common import log, _data_dir
+
+# ---------- Cross-run verdict cache ----------
+_FINGERPRINT_FIELDS = ("name", "file_name", "type", "placement_size", "base_file_size", "href", "modified")
+
+def _fingerprint(rec):
+    """Hash of the grid fields that define what a preview shows (status is not part of it)."""
+    raw = "\x1f".join("" if rec.get(f) is None else str(rec.get(f)) for f in _FINGERPRINT_FIELDS)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class VerdictCache:
+    """
+    SQLite store of the last TC1–TC11 verdicts per (host, creative ID) and grid fingerprint.
+    get() only returns entries whose fingerprint still matches, that are younger than
+    ttl seconds and whose TC10/TC11 both passed. Oldest rows are dropped past max_rows.
+    """
+    def __init__(self, path=None, ttl=7 * 86400, max_rows=200000):
+        self.path = Path(path) if path else _data_dir() / "verdicts.sqlite"
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._pending = []
+        self.hits = 0
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            " host TEXT NOT NULL, creative_id TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+            " cases TEXT NOT NULL, note TEXT, checked_at REAL NOT NULL,"
+            " PRIMARY KEY (host, creative_id))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS verdicts_checked_at ON verdicts (checked_at)")
+        self.evict()
+
+    def evict(self):
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM verdicts WHERE checked_at < ?", (time.time() - self.ttl,))
+            self.db.execute(
+                "DELETE FROM verdicts WHERE rowid IN (SELECT rowid FROM verdicts"
+                " ORDER BY checked_at DESC LIMIT -1 OFFSET ?)", (self.max_rows,)
+            )
+
+    def get(self, host, rec):
+        """(cases, checked_at) for an unchanged creative that passed TC10/TC11, else None."""
+        if rec.get("id") in (None, "", "[Missing]"):
+            return None
+        with self._lock:
+            row = self.db.execute(
+                "SELECT fingerprint, cases, checked_at FROM verdicts WHERE host = ? AND creative_id = ?",
+                (host, rec["id"]),
+            ).fetchone()
+        if not row or row[0] != _fingerprint(rec) or row[2] < time.time() - self.ttl:
+            return None
+        cases = json.loads(row[1])
+        if cases.get("TC10") != "PASSED" or cases.get("TC11") != "PASSED":
+            return None
+        self.hits += 1
+        return cases, row[2]
+
+    def put(self, host, rec, cases, note=None):
+        """Queue a fresh verdict; written in batches by flush()."""
+        if rec.get("id") in (None, "", "[Missing]"):
+            return
+        self._pending.append((host, rec["id"], _fingerprint(rec), json.dumps(cases), note, time.time()))
+        if len(self._pending) >= 200:
+            self.flush()
+
+    def flush(self):
+        with self._lock, self.db:
+            rows, self._pending = self._pending, []
+            self.db.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        try:
+            self.flush()
+            self.evict()
+        finally:
+            self.db.close()
+
+# ---------- Results store (JSONL segments + SQLite index) ----------
+_RESULT_TCS = tuple(f"TC{i}" for i in range(1, 12))
+
+class ResultsStore:
+    """
+    Append-only run results under <data dir>/results: every run writes one JSONL segment
+    (one record per creative) and indexes each line in index.sqlite (run, creative,
+    result, TC1–TC11, console error count, timings, segment offset) for query_results().
+    """
+    def __init__(self, root=None):
+        self.root = Path(root) if root else _data_dir() / "results"
+        (self.root / "segments").mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        tc_cols = ", ".join(f"{tc.lower()} TEXT" for tc in _RESULT_TCS)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, url TEXT, host TEXT,"
+                " mode TEXT, started_at REAL, finished_at REAL, total INTEGER, processed INTEGER,"
+                " failed INTEGER, harvest_s REAL, seconds REAL, segment TEXT)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results (run_id TEXT, seq INTEGER, host TEXT,"
+                " creative_id TEXT, name TEXT, status TEXT, result TEXT, ts REAL,"
+                f" {tc_cols}, console_errors INTEGER, preview_s REAL, segment TEXT, offset INTEGER)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_ts ON results (ts)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_creative ON results (creative_id, ts)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_run ON results (run_id, seq)")
+        self._lock = threading.Lock()
+        self._rows = []
+        self._seg = None
+        self.run_id = None
+
+    def begin_run(self, url, mode):
+        host = (urlparse(url).hostname or "").lower()
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+        self._segment = f"{self.run_id}.jsonl"
+        self._seg = (self.root / "segments" / self._segment).open("ab")
+        self._host, self._seq, self._started = host, 0, time.time()
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT INTO runs (run_id, url, host, mode, started_at, segment) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.run_id, url, host, mode, self._started, self._segment),
+            )
+        return self.run_id
+
+    def add(self, record):
+        """Append one record to the run's segment and queue its index row."""
+        if self._seg is None:
+            return
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        offset = self._seg.tell()
+        self._seg.write(line)
+        self._seg.flush()
+        self._seq += 1
+        cases = record.get("cases") or {}
+        self._rows.append((
+            self.run_id, self._seq, self._host, record.get("id"), record.get("name"),
+            record.get("status"), record.get("result"), time.time(),
+            *[cases.get(tc) for tc in _RESULT_TCS],
+            len(record.get("console_errors") or []), (record.get("timings") or {}).get("preview_s"),
+            self._segment, offset,
+        ))
+        if len(self._rows) >= 200:
+            self.flush()
+
+    def flush(self):
+        with self._lock, self.db:
+            rows, self._rows = self._rows, []
+            marks = ", ".join("?" * (12 + len(_RESULT_TCS)))
+            self.db.executemany(f"INSERT INTO results VALUES ({marks})", rows)
+
+    def end_run(self, total=None, processed=None, harvest_s=None):
+        if self._seg is None:
+            return
+        self.flush()
+        self._seg.close()
+        self._seg = None
+        now = time.time()
+        with self._lock, self.db:
+            failed = self.db.execute(
+                "SELECT COUNT(*) FROM results WHERE run_id = ? AND (result = 'error' OR "
+                + " OR ".join(f"{tc.lower()} = 'FAIL'" for tc in _RESULT_TCS) + ")",
+                (self.run_id,),
+            ).fetchone()[0]
+            self.db.execute(
+                "UPDATE runs SET finished_at = ?, total = ?, processed = ?, failed = ?, harvest_s = ?,"
+                " seconds = ? WHERE run_id = ?",
+                (now, total, processed, failed, harvest_s, round(now - self._started, 3), self.run_id),
+            )
+
+    def close(self):
+        try:
+            self.end_run()
+        finally:
+            self.db.close()
+
+def _parse_since(value):
+    """Epoch seconds from a number, 'YYYY-MM-DD[THH:MM]', or an age like '7d' / '12h' / '30m'."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    v = str(value).strip().lower()
+    units = {"d": 86400, "h": 3600, "m": 60, "w": 7 * 86400}
+    if v[-1:] in units and v[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(v[:-1]) * units[v[-1]]
+    for fmt in ("%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(v.upper() if "t" in v else v, fmt))
+        except ValueError:
+            pass
+    raise ValueError(f"Unrecognised time: {value!r}")
+
+def query_results(tc=None, verdict="FAIL", since=None, until=None, host=None, creative_id=None,
+                  run_id=None, result=None, latest_only=False, limit=1000, full=False, root=None):
+    """
+    Query the results store. E.g. query_results("TC5", since="7d") → creatives that failed
+    TC5 this week. Returns dicts (index columns; full=True loads each JSONL record instead).
+    latest_only keeps the newest row per (host, creative) first and then applies the
+    TC/verdict and result filters, so a creative that has since passed is not reported.
+    """
+    store = ResultsStore(root)
+    try:
+        scope, match, args = [], [], []
+        if since is not None:
+            scope.append("ts >= ?"); args.append(_parse_since(since))
+        if until is not None:
+            scope.append("ts < ?"); args.append(_parse_since(until))
+        for col, val in (("host", host), ("creative_id", creative_id), ("run_id", run_id)):
+            if val is not None:
+                scope.append(f"{col} = ?"); args.append(val)
+        if tc:
+            col = tc.strip().lower()
+            if col.upper() not in _RESULT_TCS:
+                raise ValueError(f"Unknown test case: {tc}")
+            if verdict is not None:
+                match.append(f"{col} = ?"); args.append(verdict)
+        if result is not None:
+            match.append("result = ?"); args.append(result)
+        if latest_only:
+            sql = ("SELECT *, ROW_NUMBER() OVER (PARTITION BY host, creative_id ORDER BY ts DESC) AS _rn"
+                   " FROM results" + (" WHERE " + " AND ".join(scope) if scope else ""))
+            sql = "SELECT * FROM (" + sql + ") WHERE " + " AND ".join(["_rn = 1"] + match)
+        else:
+            where = scope + match
+            sql = "SELECT * FROM results" + (" WHERE " + " AND ".join(where) if where else "")
+        sql += " ORDER BY ts DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        cur = store.db.execute(sql, args)
+        cols = [c[0] for c in cur.description]
+        rows = [dict(zip(cols, r)) for r in cur.fetchall()]
+        for r in rows:
+            r.pop("_rn", None)
+        if not full:
+            return rows
+        out = []
+        for r in rows:
+            try:
+                with (store.root / "segments" / r["segment"]).open("rb") as f:
+                    f.seek(r["offset"])
+                    out.append(json.loads(f.readline().decode("utf-8")))
+            except Exception:
+                out.append(r)
+        return out
+    finally:
+        store.db.close()
+
+# ---------- Delta runs (grid snapshot of the previous run) ----------
+_DELTA_FIELDS = ("status",) + _FINGERPRINT_FIELDS
+
+def _grid_snapshot_path(url):
+    key = hashlib.sha1(url.strip().encode("utf-8")).hexdigest()[:12]
+    return _data_dir() / "snapshots" / f"{(urlparse(url).hostname or 'default').lower()}_{key}.json"
+
+def _load_grid_snapshot(url):
+    """Records of the last completed run of this library, or None."""
+    try:
+        data = json.loads(_grid_snapshot_path(url).read_text(encoding="utf-8"))
+        return data.get("rows") or [], data.get("saved_at")
+    except Exception:
+        return None
+
+def _save_grid_snapshot(url, batch, skip_ids=()):
+    """Store this run's records; skip_ids (rows that errored) count as new next time."""
+    try:
+        path = _grid_snapshot_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows = []
+        for i in range(len(batch)):
+            rec = batch.record(i)
+            if rec["id"] in skip_ids:
+                continue
+            rec.pop("top", None)
+            rows.append(rec)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"url": url, "saved_at": time.time(), "rows": rows}), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception as e:
+        log(f"ℹ️ Could not store grid snapshot: {e}")
+
+def diff_snapshots(previous, batch):
+    """
+    Compare previous run's records with the current CreativeBatch (keyed by creative ID).
+    Returns {"added": set(ids), "changed": {id: [(field, old, new), …]}, "removed": [records]}.
+    """
+    before = {r.get("id"): r for r in previous if r.get("id") not in (None, "[Missing]")}
+    added, changed, seen = set(), {}, set()
+    for i in range(len(batch)):
+        rec = batch.record(i)
+        rid = rec["id"]
+        seen.add(rid)
+        old = before.get(rid)
+        if rid == "[Missing]" or old is None:
+            added.add(rid)
+            continue
+        diffs = [(f, old.get(f), rec.get(f)) for f in _DELTA_FIELDS if old.get(f) != rec.get(f)]
+        if diffs:
+            changed[rid] = diffs
+    removed = [r for rid, r in before.items() if rid not in seen]
+    return {"added": added, "changed": changed, "removed": removed}
+
+def _write_change_report(url, delta, since, outcomes):
+    """Text change report (added / changed / removed + verdicts) in <data dir>/reports."""
+    host = (urlparse(url).hostname or "default").lower()
+    path = _data_dir() / "reports" / f"delta_{host}_{time.strftime('%Y-%m-%d_%H-%M-%S')}.txt"
+    since_txt = time.strftime("%Y-%m-%d %H:%M", time.localtime(since)) if since else "?"
+    lines = [
+        f"Delta report for {url}",
+        f"Compared with run of {since_txt}",
+        f"Added: {len(delta['added'])}   Changed: {len(delta['changed'])}   Removed: {len(delta['removed'])}",
+        "",
+    ]
+    for rid, rec, cases in outcomes:
+        kind = "ADDED" if rid in delta["added"] else "CHANGED"
+        fails = [k for k, v in (cases or {}).items() if v == "FAIL"]
+        verdict = "skipped (not FOR QA)" if cases is None else ("FAIL " + ", ".join(fails) if fails else "PASSED")
+        lines.append(f"[{kind}] {rid}  {rec.get('name')}  →  {verdict}")
+        for field, old, new in delta["changed"].get(rid, []):
+            lines.append(f"      {field}: {old!r} → {new!r}")
+    for rec in delta["removed"]:
+        lines.append(f"[REMOVED] {rec.get('id')}  {rec.get('name')}")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        log(f"📝 Change report: {path}")
+    except Exception as e:
+        log(f"⚠️ Could not write change report: {e}")
+    return path
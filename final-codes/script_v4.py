@@ -3,15 +3,26 @@ import sys
 import shutil
 import platform
 import threading
+import queue
 import traceback
 import time
 import webbrowser
+import json
+import hashlib
+import gzip
+import atexit
+import urllib.request
+from collections import Counter
 from pathlib import Path
 
-import tkinter as tk
-from tkinter import messagebox
-from tkinter import scrolledtext
-from tkinter import font as tkfont
+try:
+    import tkinter as tk
+    from tkinter import messagebox
+    from tkinter import scrolledtext
+    from tkinter import font as tkfont
+    from tkinter import ttk
+except ImportError:  # headless CLI runs without Tk
+    tk = messagebox = scrolledtext = tkfont = ttk = None
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
@@ -25,18 +36,86 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException
 from urllib.parse import urlparse
 
-# Optional (used for OS-level zoom)
-import pyautogui
+# Optional (DevTools console capture; ships with Selenium as websocket-client)
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+# Browser-free parts (rule engine, on-disk stores, offline analysis) live next to this script
+import qa_common
+from qa_common import _thread_state, log, _data_dir, RunTrace, _span
+from qa_rules import CreativeBatch, evaluate_batch, _grid_cases_at, _normalize_snapshot_row
+from qa_store import (VerdictCache, ResultsStore, query_results, _RESULT_TCS,
+                      _load_grid_snapshot, _save_grid_snapshot, diff_snapshots, _write_change_report)
+from qa_analysis import analyze_clicktag_sources, analyze_clicktags, scan_bundles
 
 # --- Global Driver & Retry State ---
 driver = None
 _restart_attempts = 0
 _MAX_RESTARTS = 1  # prevent infinite restart loops
 
+# --- Preview worker pool (set at submit; 0/1 => serial previews in the grid browser) ---
+try:
+    PREVIEW_WORKERS = max(0, int(os.getenv("FT_PREVIEW_WORKERS", "0") or 0))
+except ValueError:
+    PREVIEW_WORKERS = 0
+
 # --- Processing mode (set at submit) ---
 PROCESS_ALL = False  # False => QA-only; True => check all
 SUMMARY_PREFIX = "For QA creatives processed: "
 
+# --- Headless / CLI (set by run_cli) ---
+HEADLESS = os.getenv("FT_HEADLESS", "").strip().lower() in ("1", "true", "yes")
+RESULT_SINK = None  # callable(record) fed one dict per creative, in grid order
+
+# --- Persistent sessions (cookies saved after login; optional dedicated Chrome profile) ---
+try:
+    SESSION_MAX_AGE = float(os.getenv("FT_SESSION_MAX_AGE_HOURS", "12") or 12) * 3600
+except ValueError:
+    SESSION_MAX_AGE = 12 * 3600
+CHROME_PROFILE_DIR = os.getenv("FT_CHROME_PROFILE", "").strip() or None
+
+# --- Cross-run verdict cache (TC10/TC11 reused for unchanged creatives) ---
+USE_VERDICT_CACHE = os.getenv("FT_VERDICT_CACHE", "1").strip().lower() not in ("0", "false", "no")
+try:
+    VERDICT_CACHE_TTL = float(os.getenv("FT_VERDICT_CACHE_TTL_DAYS", "7") or 7) * 86400
+    VERDICT_CACHE_MAX_ROWS = int(os.getenv("FT_VERDICT_CACHE_MAX_ROWS", "200000") or 200000)
+except ValueError:
+    VERDICT_CACHE_TTL, VERDICT_CACHE_MAX_ROWS = 7 * 86400, 200000
+
+# --- Delta runs (set at submit / by --delta) ---
+DELTA_MODE = False  # True => only rows added/changed since the last stored grid snapshot
+
+# --- Grid-only runs (set by --grid-only) ---
+GRID_ONLY = False   # True => TC1–TC9 from the grid only; no previews (TC10/TC11 SKIPPED)
+
+# --- Record & replay (set by --record) ---
+RECORD_PATH = None  # fixture file the next run is recorded to (grid + preview outcomes)
+
+# --- Warm browsers kept between runs (0 => quit after every run) ---
+KEEP_BROWSERS = os.getenv("FT_KEEP_BROWSERS", "1").strip().lower() not in ("0", "false", "no")
+try:
+    BROWSER_IDLE_SECONDS = float(os.getenv("FT_BROWSER_IDLE_MINUTES", "15") or 15) * 60
+except ValueError:
+    BROWSER_IDLE_SECONDS = 15 * 60
+
+# --- Readiness waits (timeouts adapt to the p95 of recent waits per step) ---
+try:
+    READY_TIMEOUT_MARGIN = float(os.getenv("FT_READY_TIMEOUT_MARGIN", "2") or 2)
+    READY_MIN_SAMPLES = int(os.getenv("FT_READY_MIN_SAMPLES", "20") or 20)
+except ValueError:
+    READY_TIMEOUT_MARGIN, READY_MIN_SAMPLES = 2.0, 20
+
+# --- Virtual time (0 = previews animate in real time; else fast-forward this many ms of the timeline) ---
+try:
+    VIRTUAL_TIME_MS = max(0, int(os.getenv("FT_VIRTUAL_TIME_MS", "0") or 0))
+except ValueError:
+    VIRTUAL_TIME_MS = 0
+
+# --- Run tracing (per-step spans → Chrome trace JSON in <data dir>/reports) ---
+TRACE_RUNS = os.getenv("FT_TRACE", "1").strip().lower() not in ("0", "false", "no")
+
 # --- GUI refs & fonts (set later) ---
 log_text = None
 root = None
@@ -46,6 +125,18 @@ MONO_FONT = ("Consolas", 10)
 summary_var = None
 check_all_var = None   # tk.BooleanVar
 clear_display_var = None  # tk.BooleanVar
+workers_var = None  # tk.IntVar (preview workers)
+use_cache_var = None  # tk.BooleanVar (verdict cache)
+
+# --- GUI log sink: writes are queued from any thread and drained by the UI in batches ---
+_gui_queue = queue.Queue()
+GUI_FLUSH_MS = 50        # drain interval (~20 updates/s)
+GUI_MAX_BATCH = 5000     # queue items applied per drain
+GUI_MAX_LINES = 20000    # Execution Report ring buffer (oldest lines are dropped)
+_link_hrefs = {}         # link text -> href for the shared "link" tag (UI thread only)
+results_table = None     # ResultsTable (set by build_gui)
+_table_queue = queue.Queue()
+delta_var = None  # tk.BooleanVar (delta run)
 
 # --- Credentials file (baseline; real lookup happens in read_credentials) ---
 try:
@@ -74,13 +165,6 @@ CASE_LABELS = {
 }
 LEFT_COL_WIDTH = max(len(s) for s in CASE_LABELS.values()) + 2  # for nice alignment in mono font
 
-# ------------------------------
-# Console logger (terminal only)
-# ------------------------------
-def log(message: str):
-    ts = time.strftime("%H:%M:%S")
-    print(f"[{ts}] {message}")
-
 # ------------------------------
 # Font detection (run after root)
 # ------------------------------
@@ -251,6 +335,9 @@ def gui_init_tags():
         log_text.tag_configure("label", font=(MONO_FONT[0], 10))
         log_text.tag_configure("name", foreground="#111827", font=(UI_FONT[0], 10))
         log_text.tag_configure("url", foreground="#0369a1", font=(MONO_FONT[0], 10), underline=True)
+        log_text.tag_bind("link", "<Button-1>", _open_link_at_click)
+        log_text.tag_bind("link", "<Enter>", lambda _e: log_text.configure(cursor="hand2"))
+        log_text.tag_bind("link", "<Leave>", lambda _e: log_text.configure(cursor=""))
 
         # Status chips
         log_text.tag_configure("chip_pass", foreground="#065f46", background="#ccfbf1",
@@ -265,27 +352,24 @@ def gui_init_tags():
         pass
 
 def _gui_write(text, *tags):
-    """Append text to GUI log on UI thread."""
-    def _do():
-        try:
-            log_text.configure(state="normal")
-            log_text.insert("end", text, tags)
-            log_text.see("end")
-            log_text.configure(state="disabled")
-        except Exception:
-            pass
-    try:
-        root.after(0, _do)
-    except Exception:
-        pass
+    """Queue text for the GUI log (any thread); the UI applies it in the next batch."""
+    if root is None:
+        return
+    _gui_queue.put((text, tags, None))
 
 def _clear_log():
-    try:
-        log_text.configure(state="normal")
-        log_text.delete("1.0", "end")
-        log_text.configure(state="disabled")
-    except Exception:
-        pass
+    """Queue a clear (report log and results table), ordered with writes already queued."""
+    if root is None:
+        return
+    _gui_queue.put((None, (), None))
+    _table_queue.put(None)
+
+def _table_add(record):
+    """Queue one result record for the Results table (any thread)."""
+    if root is None or record.get("result") not in ("checked", "skipped", "error", "removed"):
+        return
+    _table_queue.put({k: record.get(k) for k in
+                      ("id", "name", "status", "result", "cases", "note", "href", "console_errors", "url")})
 
 def _gui_write_chip(value: str):
     """Write a colored chip for PASSED/FAIL/N/A/SKIPPED."""
@@ -300,22 +384,64 @@ def _gui_write_chip(value: str):
         _gui_write("    N/A   ", "chip_na")
 
 def _gui_write_link(url_text: str, url_href: str):
-    """Insert a clickable link tag for the URL."""
-    tag = f"link-{int(time.time()*1000)}"
-    def _do():
-        try:
+    """Insert a clickable link (one shared "link" tag; the href is looked up by its text)."""
+    if root is None:
+        return
+    _gui_queue.put((url_text, ("link", "url"), url_href))
+
+def _open_link_at_click(_evt=None):
+    try:
+        start, end = log_text.tag_prevrange("link", "current + 1c")
+        text = log_text.get(start, end)
+        webbrowser.open(_link_hrefs.get(text, text))
+    except Exception:
+        pass
+
+def _gui_drain():
+    """UI thread: apply queued writes (and link hrefs) in one insert, keep the last GUI_MAX_LINES lines, reschedule."""
+    try:
+        chunks, cleared = [], False
+        for _ in range(GUI_MAX_BATCH):
+            try:
+                text, tags, href = _gui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if text is None:
+                chunks, cleared = [], True
+                continue
+            if href is not None:
+                if text not in _link_hrefs and len(_link_hrefs) >= GUI_MAX_LINES:
+                    _link_hrefs.pop(next(iter(_link_hrefs)))
+                _link_hrefs[text] = href
+            chunks += [text, tags]
+        if chunks or cleared:
             log_text.configure(state="normal")
-            log_text.insert("end", url_text, (tag, "url"))
+            if cleared:
+                log_text.delete("1.0", "end")
+            if chunks:
+                log_text.insert("end", *chunks)
+                lines = int(log_text.index("end-1c").split(".")[0])
+                if lines > GUI_MAX_LINES:
+                    log_text.delete("1.0", f"{lines - GUI_MAX_LINES + 1}.0")
+                log_text.see("end")
             log_text.configure(state="disabled")
-            def _open(_evt, u=url_href):
-                try:
-                    webbrowser.open(u)
-                except Exception:
-                    pass
-            log_text.tag_bind(tag, "<Button-1>", _open)
-        except Exception:
-            pass
-    root.after(0, _do)
+    except Exception:
+        pass
+    try:
+        batch = []
+        while len(batch) < GUI_MAX_BATCH:
+            try:
+                batch.append(_table_queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch and results_table is not None:
+            results_table.extend(batch)
+    except Exception:
+        pass
+    try:
+        root.after(GUI_FLUSH_MS, _gui_drain)
+    except Exception:
+        pass
 
 def gui_log_result(creative_id, creative_name, cases_dict, url, note=None):
     """Detailed block for processed creatives."""
@@ -375,7 +501,189 @@ def gui_log_skip(creative_id, creative_name, status_text, url=None):
         _gui_write("\n")
     _gui_write("┄" * 84 + "\n\n", "divider")
 
+# ---------- Results table (virtualized ttk.Treeview) ----------
+class ResultsTable:
+    """
+    One row per creative with TC columns, sortable headings, a text/failures filter and
+    a detail pane (double-click / Enter). The model is a plain list of records; only the
+    rows currently in view exist as Treeview items, so size doesn't slow scrolling.
+    """
+    COLUMNS = ("id", "name", "status", "result") + tuple(f"TC{i}" for i in range(1, 12))
+    WIDTHS = {"id": 80, "name": 280, "status": 80, "result": 70}
+    SHORT = {"PASSED": "✔", "FAIL": "✘", "SKIPPED": "skip", "N/A": "n/a"}
+
+    def __init__(self, parent):
+        self.rows = []        # model (records, arrival order)
+        self.view = []        # indices into rows after filter + sort
+        self.top = 0          # first visible position in view
+        self.page = 20        # rows that fit in the widget
+        self.sort_col, self.sort_desc = None, False
+        self.follow = True    # keep the newest rows in view while a run streams in
+
+        self.frame = tk.Frame(parent)
+        bar = tk.Frame(self.frame)
+        bar.pack(fill="x", pady=(0, 4))
+        tk.Label(bar, text="Filter:", font=UI_FONT).pack(side="left")
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *_: self.refilter())
+        tk.Entry(bar, textvariable=self.filter_var, width=30, font=UI_FONT).pack(side="left", padx=(4, 10))
+        self.fail_only_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(bar, text="Failures only", variable=self.fail_only_var, command=self.refilter,
+                       font=UI_FONT).pack(side="left")
+        self.count_var = tk.StringVar(value="0 rows")
+        tk.Label(bar, textvariable=self.count_var, font=UI_FONT, fg="#6b7280").pack(side="right")
+
+        body = tk.Frame(self.frame)
+        body.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(body, columns=self.COLUMNS, show="headings", selectmode="browse")
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col.title() if not col.startswith("TC") else col,
+                              command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=self.WIDTHS.get(col, 52), stretch=(col == "name"),
+                             anchor="w" if col in self.WIDTHS else "center")
+        self.tree.tag_configure("fail", background="#fee2e2")
+        self.tree.tag_configure("skipped", foreground="#6b7280")
+        self.tree.tag_configure("error", background="#fef3c7")
+        self.vsb = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.vsb.pack(side="right", fill="y")
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 * (e.delta // 120 or (1 if e.delta > 0 else -1)) * 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Double-1>", self._show_detail)
+        self.tree.bind("<Return>", self._show_detail)
+
+        self.detail = tk.Text(self.frame, height=9, state="disabled", wrap="word", font=MONO_FONT)
+        self.detail.pack(fill="x", pady=(4, 0))
+
+    # --- model ---
+    def _failed(self, rec):
+        return rec.get("result") == "error" or "FAIL" in (rec.get("cases") or {}).values()
+
+    def _match(self, rec):
+        if self.fail_only_var.get() and not self._failed(rec):
+            return False
+        q = self.filter_var.get().strip().lower()
+        return not q or q in (rec.get("name") or "").lower() or q in (rec.get("id") or "").lower() \
+            or q in (rec.get("status") or "").lower()
+
+    def _key(self, i):
+        rec = self.rows[i]
+        col = self.sort_col
+        if col.startswith("TC"):
+            return (rec.get("cases") or {}).get(col) or ""
+        v = rec.get(col) or ""
+        return (0, int(v), "") if v.isdigit() else (1, 0, v.lower())
+
+    def extend(self, records):
+        """Append records from the queue (None = clear) and refresh the visible window."""
+        for rec in records:
+            if rec is None:
+                self.rows, self.view, self.top = [], [], 0
+                self._set_detail("")
+                continue
+            self.rows.append(rec)
+            if self._match(rec):
+                self.view.append(len(self.rows) - 1)
+        if self.sort_col:
+            self.view.sort(key=self._key, reverse=self.sort_desc)
+        if self.follow:
+            self.top = max(0, len(self.view) - self.page)
+        self.render()
+
+    def refilter(self):
+        self.view = [i for i, rec in enumerate(self.rows) if self._match(rec)]
+        if self.sort_col:
+            self.view.sort(key=self._key, reverse=self.sort_desc)
+        self.top = 0
+        self.follow = False
+        self.render()
+
+    def sort_by(self, col):
+        self.sort_desc = (not self.sort_desc) if self.sort_col == col else False
+        self.sort_col = col
+        self.view.sort(key=self._key, reverse=self.sort_desc)
+        self.top = 0
+        self.follow = False
+        self.render()
+
+    # --- window ---
+    def _values(self, rec):
+        cases = rec.get("cases") or {}
+        tcs = [self.SHORT.get(cases.get(f"TC{i}"), cases.get(f"TC{i}") or "") for i in range(1, 12)]
+        return [rec.get("id") or "", rec.get("name") or "", rec.get("status") or "", rec.get("result") or ""] + tcs
+
+    def render(self):
+        n = len(self.view)
+        self.top = max(0, min(self.top, n - self.page))
+        self.tree.delete(*self.tree.get_children())
+        for pos in range(self.top, min(self.top + self.page, n)):
+            i = self.view[pos]
+            rec = self.rows[i]
+            tag = "error" if rec.get("result") == "error" else (
+                "fail" if self._failed(rec) else ("skipped" if rec.get("result") == "skipped" else ""))
+            self.tree.insert("", "end", iid=str(i), values=self._values(rec), tags=(tag,) if tag else ())
+        if n:
+            self.vsb.set(self.top / n, min(1.0, (self.top + self.page) / n))
+        else:
+            self.vsb.set(0.0, 1.0)
+        self.count_var.set(f"{n} of {len(self.rows)} rows")
+
+    def scroll(self, delta):
+        self.top += delta
+        self.follow = self.top + self.page >= len(self.view)
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.view))
+        elif args[0] == "scroll":
+            step = self.page if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.follow = self.top + self.page >= len(self.view)
+        self.render()
+
+    def _on_resize(self, event):
+        try:
+            rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except (TypeError, ValueError):
+            rowheight = 20
+        page = max(1, (event.height - rowheight - 4) // rowheight)
+        if page != self.page:
+            self.page = page
+            self.render()
+
+    # --- detail ---
+    def _set_detail(self, text):
+        self.detail.configure(state="normal")
+        self.detail.delete("1.0", "end")
+        self.detail.insert("end", text)
+        self.detail.configure(state="disabled")
+
+    def _show_detail(self, _evt=None):
+        sel = self.tree.selection()
+        if not sel:
+            return
+        rec = self.rows[int(sel[0])]
+        lines = [f"Creative ID: {rec.get('id')}   •   Name: {rec.get('name')}   •   Status: {rec.get('status')}"]
+        for i in range(1, 12):
+            key = f"TC{i}"
+            val = (rec.get("cases") or {}).get(key)
+            if val:
+                lines.append(f"  {CASE_LABELS.get(key, key):{LEFT_COL_WIDTH}} {val}")
+        if rec.get("href"):
+            lines.append(f"URL: {rec['href']}")
+        if rec.get("note"):
+            lines.append(f"Note: {rec['note']}")
+        for err in rec.get("console_errors") or []:
+            lines.append(f"  console: {err}")
+        self._set_detail("\n".join(lines))
+
 def focus_app_window():
+    if root is None:
+        return
     try:
         root.deiconify()
         root.lift()
@@ -424,17 +732,21 @@ def _apply_common_options(opts):
     opts.add_argument("--disable-notifications")
     opts.add_argument("--disable-infobars")
     opts.add_argument("--start-maximized")
+    if HEADLESS:
+        opts.add_argument("--headless=new")
+        opts.add_argument("--window-size=1920,1080")
+    if CHROME_PROFILE_DIR:
+        # A profile can only be open once: each preview worker gets its own copy
+        n = getattr(_thread_state, "worker", 0)
+        opts.add_argument(f"--user-data-dir={CHROME_PROFILE_DIR}{f'-w{n}' if n else ''}")
     return opts
 
-def start_driver():
-    """Start a Chrome session via Selenium Manager, fallback to Edge."""
-    global driver
-    if driver:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+def _current_driver():
+    """Driver for the calling thread (preview workers own one each), else the grid driver."""
+    return getattr(_thread_state, "driver", None) or driver
 
+def _new_driver():
+    """Launch a Chrome session via Selenium Manager, fallback to Edge. Returns the driver."""
     _strip_webdrivers_from_path()
     system_name = platform.system()
     log(f"🔍 Detected OS: {system_name}")
@@ -451,11 +763,11 @@ def start_driver():
             log("⚠️ Chrome binary not found in common locations/ PATH.")
 
     try:
-        driver = webdriver.Chrome(service=ChromeService(), options=chrome_options)
-        driver.set_page_load_timeout(30)
-        driver.implicitly_wait(10)
+        drv = webdriver.Chrome(service=ChromeService(), options=chrome_options)
+        drv.set_page_load_timeout(30)
+        drv.implicitly_wait(10)
         log("✅ Chrome started successfully.")
-        return
+        return drv
     except Exception as e:
         log(f"❌ Chrome failed to start via Selenium Manager: {e}")
 
@@ -464,133 +776,485 @@ def start_driver():
         from selenium.webdriver.edge.service import Service as EdgeService
         edge_options = _apply_common_options(EdgeOptions())
         edge_options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        driver = webdriver.Edge(service=EdgeService(), options=edge_options)
-        driver.set_page_load_timeout(30)
-        driver.implicitly_wait(10)
+        drv = webdriver.Edge(service=EdgeService(), options=edge_options)
+        drv.set_page_load_timeout(30)
+        drv.implicitly_wait(10)
         log("✅ Microsoft Edge started successfully (fallback).")
-        return
+        return drv
     except Exception as e2:
         log(f"❌ Edge fallback failed: {e2}")
 
     raise RuntimeError("Unable to start a WebDriver session.")
 
+class _BrowserPool:
+    """
+    Warm browser sessions kept between runs. acquire() hands out a healthy idle browser
+    (or launches one), release() cleans it up and parks it; idle ones are quit after
+    BROWSER_IDLE_SECONDS by a daemon timer, even when no further run starts.
+    Browsers are matched on launch options (headless / profile).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = []  # (key, drv, parked_at)
+        self._timer = None
+
+    @staticmethod
+    def _key():
+        n = getattr(_thread_state, "worker", 0) if CHROME_PROFILE_DIR else 0
+        return (HEADLESS, CHROME_PROFILE_DIR, n)
+
+    @staticmethod
+    def _healthy(drv):
+        try:
+            handles = drv.window_handles
+            if not handles:
+                return False
+            drv.switch_to.window(handles[0])
+            return drv.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(drv):
+        _drop_console_capture(drv)
+        try:
+            drv.quit()
+        except Exception:
+            pass
+
+    def _evict_stale(self):
+        now = time.time()
+        with self._lock:
+            stale = [e for e in self._idle if now - e[2] > BROWSER_IDLE_SECONDS]
+            self._idle = [e for e in self._idle if e not in stale]
+        for _, drv, _ in stale:
+            self._quit(drv)
+        if stale:
+            log(f"🔚 Closed {len(stale)} idle browser(s).")
+        self._schedule_eviction()
+
+    def _schedule_eviction(self):
+        """(Re)arm the idle timer for the oldest parked browser; nothing to do when none is parked."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._idle:
+                return
+            due = min(e[2] for e in self._idle) + BROWSER_IDLE_SECONDS - time.time()
+            self._timer = threading.Timer(max(1.0, due + 1.0), self._evict_stale)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def acquire(self):
+        """A ready browser: a warm one if any passes the health check, else a new one."""
+        self._evict_stale()
+        key = self._key()
+        while True:
+            with self._lock:
+                i = next((i for i, e in enumerate(self._idle) if e[0] == key), None)
+                entry = self._idle.pop(i) if i is not None else None
+            if entry is None:
+                return _new_driver()
+            drv = entry[1]
+            if self._healthy(drv):
+                log("♨️ Reusing a warm browser.")
+                return drv
+            log("ℹ️ Warm browser did not respond; discarding it.")
+            self._quit(drv)
+
+    def release(self, drv):
+        """Park a browser for the next run (one tab, blank page, no zoom) or quit it."""
+        if drv is None:
+            return
+        if not KEEP_BROWSERS or not self._healthy(drv):
+            self._quit(drv)
+            return
+        try:
+            handles = drv.window_handles
+            for h in handles[1:]:
+                drv.switch_to.window(h)
+                drv.close()
+            drv.switch_to.window(handles[0])
+            try:
+                drv.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+            except Exception:
+                pass
+            drv.get("about:blank")
+        except Exception:
+            self._quit(drv)
+            return
+        with self._lock:
+            self._idle.append((self._key(), drv, time.time()))
+        self._evict_stale()
+
+    def discard(self, drv):
+        if drv is not None:
+            self._quit(drv)
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for _, drv, _ in idle:
+            self._quit(drv)
+
+_browser_pool = _BrowserPool()
+atexit.register(_browser_pool.shutdown)
+
+def start_driver(fresh=False):
+    """Get the grid browser session (sets global `driver`). fresh=True never reuses one."""
+    global driver
+    if driver:
+        if fresh:
+            _browser_pool.discard(driver)
+        else:
+            _browser_pool.release(driver)
+        driver = None
+    if fresh:
+        driver = _new_driver()
+    else:
+        driver = _browser_pool.acquire()
+
 def restart_driver(username, password, url):
     global _restart_attempts
     if _restart_attempts >= _MAX_RESTARTS:
         raise RuntimeError("Reached maximum restart attempts, aborting.")
     _restart_attempts += 1
     log(f"♻️ Restarting browser… (attempt #{_restart_attempts})")
-    start_driver()
+    start_driver(fresh=True)
     return selenium_login(username, password, url, skip_restart=True)
 
 # ---- Auto-close helper ----
 def close_browser():
+    """End of run: park the grid browser for the next run (or quit it if KEEP_BROWSERS is off)."""
     global driver
     try:
         if driver:
-            driver.quit()
-            log("🔚 Browser closed.")
+            _browser_pool.release(driver)
+            log("♨️ Browser kept warm for the next run." if KEEP_BROWSERS else "🔚 Browser closed.")
     except Exception as e:
         log(f"ℹ️ Could not close browser cleanly: {e}")
     finally:
         driver = None
 
+# ---------- Persistent sessions ----------
+_SESSION_COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+def _session_path(url, username):
+    host = (urlparse(url).hostname or "default").lower()
+    user = hashlib.sha1((username or "").strip().lower().encode("utf-8")).hexdigest()[:12]
+    return _data_dir() / "sessions" / f"{host}_{user}.json"
+
+def _save_session(drv, url, username):
+    """Store the browser's cookies (all domains, incl. SSO) after a successful login."""
+    try:
+        try:
+            cookies = drv.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        except Exception:
+            cookies = [dict(c, expires=c.get("expiry")) for c in drv.get_cookies()]
+        keep = []
+        for c in cookies:
+            c = {k: c[k] for k in _SESSION_COOKIE_FIELDS if c.get(k) is not None}
+            if c.get("expires", 0) <= 0:
+                c.pop("expires", None)  # session cookie
+            keep.append(c)
+        path = _session_path(url, username)
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        # Owner-only from the moment it exists; the cookies are a live login
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"saved_at": time.time(), "cookies": keep}))
+        os.replace(tmp, path)
+        log(f"💾 Session saved ({len(keep)} cookies).")
+    except Exception as e:
+        log(f"ℹ️ Could not save session: {e}")
+
+def _load_session(url, username):
+    """Saved cookies that are still usable, or None."""
+    path = _session_path(url, username)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    now = time.time()
+    if now - float(data.get("saved_at", 0)) > SESSION_MAX_AGE:
+        log("ℹ️ Saved session is too old; logging in again.")
+        return None
+    cookies = [c for c in data.get("cookies") or [] if c.get("expires") is None or c["expires"] > now]
+    return cookies or None
+
+def _forget_session(url, username):
+    try:
+        _session_path(url, username).unlink()
+    except Exception:
+        pass
+
+def _restore_session(drv, url, username):
+    """Load saved cookies into the browser before navigating. Returns True if any were set."""
+    cookies = _load_session(url, username)
+    if not cookies:
+        return False
+    try:
+        drv.execute_cdp_cmd("Network.enable", {})
+        drv.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        return True
+    except Exception:
+        pass
+    try:
+        # No DevTools: cookies can only be added for the site that is open
+        parsed = urlparse(url)
+        drv.get(f"{parsed.scheme}://{parsed.netloc}/")
+        host = (parsed.hostname or "").lower()
+        added = 0
+        for c in cookies:
+            if host.endswith((c.get("domain") or host).lstrip(".")):
+                c = dict(c)
+                if "expires" in c:
+                    c["expiry"] = int(c.pop("expires"))
+                try:
+                    drv.add_cookie(c)
+                    added += 1
+                except Exception:
+                    pass
+        return added > 0
+    except Exception as e:
+        log(f"ℹ️ Could not restore session: {e}")
+        return False
+
+_GRID_OR_LOGIN_JS = (
+    "if (document.querySelector('.react-grid-Row')) return 'grid';"
+    "if (document.querySelector('[name=\"username\"]')) return 'login';"
+    "return null;"
+)
+
+def _await_grid_or_login(drv, timeout):
+    """'grid' (session accepted), 'login' (form shown) or None on timeout."""
+    try:
+        return WebDriverWait(drv, timeout, poll_frequency=0.2).until(
+            lambda d: d.execute_script(_GRID_OR_LOGIN_JS)
+        )
+    except TimeoutException:
+        return None
+
 # ---------- UX / Zoom Helpers ----------
-def reset_zoom():
-    """Restore browser zoom to 100% (OS-level)."""
+# Page scale is applied per tab inside the browser (no keystrokes, no focused window):
+# DevTools device-metrics emulation widens the CSS viewport by 1/scale and scales the
+# result back down, which is what browser zoom does. CSS zoom is the fallback.
+_ZOOM_CSS_JS = "document.documentElement.style.zoom = arguments[0];"
+
+def _set_page_zoom(percent):
+    """Zoom the current tab to `percent` %. Returns True on success."""
+    drv = _current_driver()
+    scale = max(1, int(percent)) / 100.0
     try:
-        if platform.system() == "Darwin":
-            pyautogui.hotkey("command", "0")
-        else:
-            pyautogui.hotkey("ctrl", "0")
-        time.sleep(0.15)
+        drv.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+        if scale != 1.0:
+            w, h = drv.execute_script("return [window.innerWidth, window.innerHeight];")
+            drv.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                "width": int(w / scale), "height": int(h / scale),
+                "deviceScaleFactor": 0, "mobile": False, "scale": scale,
+            })
+        return True
+    except Exception:
+        pass
+    try:
+        drv.execute_script(_ZOOM_CSS_JS, "" if scale == 1.0 else str(scale))
+        return True
+    except Exception:
+        return False
+
+def reset_zoom():
+    """Restore the current tab to 100%."""
+    if _set_page_zoom(100):
         log("🔄 Browser zoom reset to 100%")
-    except Exception as e:
-        log(f"⚠️ Could not reset zoom: {e}")
+    else:
+        log("⚠️ Could not reset zoom.")
 
 def zoom_to(percent=80):
-    """
-    Quick preset zoom using OS-level shortcuts.
-    Always resets to 100 first, then applies the required '-' presses.
-    Supported percents: 100, 90, 80, 67, 50.
-    """
-    presets = {100: 0, 90: 1, 80: 2, 67: 3, 50: 4}
-    try:
-        reset_zoom()
-        n_down = presets.get(int(percent), 0)
-        if n_down:
-            for _ in range(n_down):
-                if platform.system() == "Darwin":
-                    pyautogui.hotkey("command", "-")
-                else:
-                    pyautogui.hotkey("ctrl", "-")
-                time.sleep(0.08)
+    """Set the current tab's page scale to `percent` % (any value, e.g. 80)."""
+    if _set_page_zoom(percent):
         log(f"🔍 Preview zoom set to ~{percent}%")
-    except Exception as e:
-        log(f"⚠️ Could not set zoom to {percent}%: {e}")
+    else:
+        log(f"⚠️ Could not set zoom to {percent}%.")
 
 def real_chrome_zoom_out():
     """Zoom out aggressively for grid view (~25%)."""
+    drv = _current_driver()
     try:
-        pyautogui.FAILSAFE = False
-        try:
-            driver.maximize_window()
-        except Exception:
-            pass
-        time.sleep(0.3)
-        for _ in range(8):  # ~25%
-            if platform.system() == "Darwin":
-                pyautogui.hotkey("command", "-")
-            else:
-                pyautogui.hotkey("ctrl", "-")
-            time.sleep(0.08)
+        drv.maximize_window()
+    except Exception:
+        pass
+    if _set_page_zoom(25):
         log("🔍 Browser zoomed out for grid view (~25%)")
+    else:
+        log("⚠️ Could not zoom out browser.")
+
+# ---------- Run tracing (trace file + step summary) ----------
+def _finish_trace(trace, url, run_id=None):
+    """Write the run's trace file and log/show the per-step latency summary."""
+    if trace is None or not trace.steps:
+        return None
+    host = (urlparse(url).hostname or "default").lower()
+    path = _data_dir() / "reports" / f"trace_{host}_{run_id or time.strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    try:
+        trace.export(path)
+        log(f"⏱️ Trace written to {path} (open in ui.perfetto.dev or chrome://tracing)")
     except Exception as e:
-        log(f"⚠️ Could not zoom out browser: {e}")
+        log(f"⚠️ Could not write trace: {e}")
+    lines = trace.summary_lines()
+    for line in lines:
+        log(line)
+    _gui_write("Step latency\n", "header")
+    _gui_write("\n".join(lines) + "\n\n", "dim")
+    return path
+
+# ---------- Readiness (adaptive wait timeouts) ----------
+class _StepTimings:
+    """
+    Recent wait durations per step (preview tab, preview load, network idle, click-through…),
+    kept in <data dir>/timings.json. Once a step has READY_MIN_SAMPLES samples its timeout is
+    p95 × READY_TIMEOUT_MARGIN, clamped to [floor, ceiling]; until then the fixed default applies.
+    Waits that time out are recorded at the timeout, so a slowing site widens its own budget
+    (except outcome-dependent steps such as the click-through; see _timed_wait).
+    """
+    KEEP = 200
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            self.samples = {k: [float(x) for x in v][-self.KEEP:]
+                            for k, v in json.loads(path.read_text(encoding="utf-8")).items()}
+        except Exception:
+            self.samples = {}
+
+    def record(self, step, seconds):
+        with self._lock:
+            vals = self.samples.setdefault(step, [])
+            vals.append(round(seconds, 3))
+            del vals[:-self.KEEP]
+            self._dirty = True
+
+    def percentile(self, step, q=95):
+        with self._lock:
+            vals = sorted(self.samples.get(step) or ())
+        if not vals:
+            return None
+        return vals[min(len(vals) - 1, int(round(q / 100.0 * (len(vals) - 1))))]
+
+    def timeout(self, step, default, floor=1.0, ceiling=None):
+        with self._lock:
+            n = len(self.samples.get(step) or ())
+        if n < READY_MIN_SAMPLES:
+            return default
+        ceiling = ceiling or default * 2
+        return max(floor, min(ceiling, self.percentile(step) * READY_TIMEOUT_MARGIN))
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self.samples)
+            self._dirty = False
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+_step_timings = None
+_step_timings_lock = threading.Lock()
+
+def _timings():
+    global _step_timings
+    with _step_timings_lock:
+        if _step_timings is None:
+            _step_timings = _StepTimings(_data_dir() / "timings.json")
+        return _step_timings
+
+def _timed_wait(step, default, wait, floor=1.0, ceiling=None, record_timeouts=True):
+    """
+    Run wait(timeout) with the step's adaptive timeout; records how long it took. Returns wait's result.
+    record_timeouts=False is for steps whose timeout is a legitimate outcome (no click-through is a
+    TC10 FAIL, not a slow site): only successful waits then shape the step's budget.
+    """
+    timings = _timings()
+    timeout = timings.timeout(step, default, floor, ceiling)
+    t0 = time.perf_counter()
+    try:
+        ok = wait(timeout)
+    except TimeoutException:
+        ok = None
+    if ok or record_timeouts:
+        timings.record(step, time.perf_counter() - t0 if ok else timeout)
+    return ok
+
+def _wait_until(drv, timeout, condition, poll=0.1):
+    """WebDriverWait as a wait(timeout) callable: condition's value, or None on timeout."""
+    try:
+        return WebDriverWait(drv, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        return None
+
+def _ready_state_complete(d):
+    return d.execute_script("return document.readyState") == "complete"
+
+def _wait_page_ready(drv, capture, step, default, events=("load",), ceiling=None):
+    """Wait for the current tab's load (or network idle) via lifecycle events, else document.readyState."""
+    page = _current_page_target(drv) if capture is not None else None
+    if page:
+        return _timed_wait(step, default, lambda t: capture.wait_lifecycle(page, events, t), ceiling=ceiling)
+    return _timed_wait(step, default, lambda t: _wait_until(drv, t, _ready_state_complete), ceiling=ceiling)
 
 # ---------- Helpers for grid/checkbox & Previews ----------
 def _scroll_into_view(el):
+    # 'instant' scrolls synchronously, so the element is in place when this returns
+    drv = _current_driver()
     try:
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
-        time.sleep(0.05)
+        drv.execute_script("arguments[0].scrollIntoView({block:'center', behavior:'instant'});", el)
     except Exception:
         pass
 
 def _click_checkbox_in_row(row):
+    drv = _current_driver()
     try:
         cb = row.find_element(By.CSS_SELECTOR, "input[type='checkbox']")
         _scroll_into_view(cb)
-        driver.execute_script("arguments[0].click();", cb)
+        drv.execute_script("arguments[0].click();", cb)
         return True
     except Exception:
         pass
     try:
         toggle = row.find_element(By.CSS_SELECTOR, "label, [role='checkbox'], .checkbox, .check")
         _scroll_into_view(toggle)
-        driver.execute_script("arguments[0].click();", toggle)
+        drv.execute_script("arguments[0].click();", toggle)
         return True
     except Exception:
         pass
     try:
         first_cell = row.find_elements(By.CSS_SELECTOR, ".react-grid-Cell")[0]
         _scroll_into_view(first_cell)
-        driver.execute_script("arguments[0].click();", first_cell)
+        drv.execute_script("arguments[0].click();", first_cell)
         return True
     except Exception:
         pass
     return False
 
 def _safe_click(el):
+    drv = _current_driver()
     try:
         _scroll_into_view(el)
     except Exception:
         pass
     try:
-        ActionChains(driver).move_to_element(el).pause(0.05).click(el).perform()
+        ActionChains(drv).move_to_element(el).click(el).perform()
         return True
     except Exception:
         try:
-            driver.execute_script("arguments[0].click();", el)
+            drv.execute_script("arguments[0].click();", el)
             return True
         except Exception:
             try:
@@ -599,8 +1263,9 @@ def _safe_click(el):
             except Exception:
                 return False
 
-def _open_preview_for_selected():
-    handles_before = set(driver.window_handles)
+def _open_preview_for_selected(capture=None):
+    drv = _current_driver()
+    handles_before = set(drv.window_handles)
     preview_btn_locators = [
         (By.XPATH, XPATH_PREVIEWS_BTN_SPAN + "/ancestor::button[1]"),
         (By.XPATH, "(//button[.//span[normalize-space()='Previews']])[1]"),
@@ -619,7 +1284,7 @@ def _open_preview_for_selected():
         btn = None
         for by, sel in preview_btn_locators:
             try:
-                btn = WebDriverWait(driver, 6).until(EC.element_to_be_clickable((by, sel)))
+                btn = WebDriverWait(drv, 6).until(EC.element_to_be_clickable((by, sel)))
                 break
             except Exception:
                 continue
@@ -627,18 +1292,17 @@ def _open_preview_for_selected():
             continue
         if _safe_click(btn):
             try:
-                WebDriverWait(driver, 6).until(EC.visibility_of_element_located((By.XPATH, menu_container_xpath)))
+                WebDriverWait(drv, 6).until(EC.visibility_of_element_located((By.XPATH, menu_container_xpath)))
                 previews_clicked = True
                 break
             except Exception:
-                time.sleep(0.2)
                 continue
     if not previews_clicked:
         raise TimeoutException("Could not open 'Previews' menu.")
     item = None
     for by, sel in menu_item_locators:
         try:
-            item = WebDriverWait(driver, 6).until(EC.element_to_be_clickable((by, sel)))
+            item = WebDriverWait(drv, 6).until(EC.element_to_be_clickable((by, sel)))
             break
         except Exception:
             continue
@@ -646,21 +1310,42 @@ def _open_preview_for_selected():
         raise TimeoutException("Menu item 'Preview Creative' not found/clickable.")
     if not _safe_click(item):
         raise TimeoutException("Failed to click 'Preview Creative'.")
-    WebDriverWait(driver, 15).until(lambda d: len(d.window_handles) > len(handles_before))
-    preview_handle = [h for h in driver.window_handles if h not in handles_before][-1]
-    driver.switch_to.window(preview_handle)
-    WebDriverWait(driver, 20).until(lambda d: d.execute_script("return document.readyState") == "complete")
-    log(f"🆕 Preview tab opened. Title: {driver.title!r}, URL: {driver.current_url}")
+    preview_handle = _wait_new_tab(drv, capture, handles_before, "preview_tab", 15)
+    if not preview_handle:
+        raise TimeoutException("Preview tab did not open.")
+    drv.switch_to.window(preview_handle)
+    if not _wait_page_ready(drv, capture, "preview_load", 20):
+        raise TimeoutException("Preview tab did not finish loading.")
+    # The ad keeps fetching assets after 'load'; settle on network idle before reading/clicking
+    if capture is not None:
+        # (ads that keep polling never go idle, so this budget never grows past the default)
+        _wait_page_ready(drv, capture, "preview_idle", 8, events=("networkIdle", "networkAlmostIdle"), ceiling=8)
+    log(f"🆕 Preview tab opened. Title: {drv.title!r}, URL: {drv.current_url}")
     return preview_handle
 
+def _wait_new_tab(drv, capture, handles_before, step, default):
+    """Handle of a tab opened after handles_before (DevTools target event, else window_handles), or None."""
+    def new_handle(d):
+        fresh = [h for h in d.window_handles if h not in handles_before]
+        return fresh[-1] if fresh else None
+
+    if capture is not None:
+        # chromedriver window handles are the DevTools target ids
+        target = _timed_wait(step, default, lambda t: capture.wait_new_page(handles_before, t))
+        if target:
+            return target if target in drv.window_handles else _wait_until(drv, 5, new_handle)
+        return None
+    return _timed_wait(step, default, lambda t: _wait_until(drv, t, new_handle))
+
 def _get_largest_iframe():
-    iframes = driver.find_elements(By.TAG_NAME, "iframe")
+    drv = _current_driver()
+    iframes = drv.find_elements(By.TAG_NAME, "iframe")
     if not iframes:
         return None
     largest, largest_area = None, -1
     for f in iframes:
         try:
-            rect = driver.execute_script(
+            rect = drv.execute_script(
                 "var r=arguments[0].getBoundingClientRect(); return {w:r.width,h:r.height};", f
             )
             area = float(rect.get("w", 0)) * float(rect.get("h", 0))
@@ -673,15 +1358,17 @@ def _get_largest_iframe():
 
 def _find_global_click_anchor():
     """Try to find a /clicktag anchor anywhere in the top document."""
+    drv = _current_driver()
     try:
-        return driver.find_element(By.CSS_SELECTOR, "a[href*='/clicktag']")
+        return drv.find_element(By.CSS_SELECTOR, "a[href*='/clicktag']")
     except Exception:
         return None
 
 # ---------- Click-tag helpers (kept for non-skipped cases) ----------
 def _detect_clicktag_success():
+    drv = _current_driver()
     try:
-        url = (driver.current_url or "").lower()
+        url = (drv.current_url or "").lower()
     except Exception:
         url = ""
     if "/clicktag" in url:
@@ -690,34 +1377,36 @@ def _detect_clicktag_success():
           "or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'dynamic click tag') "
           "or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'multiple click tag')]")
     try:
-        WebDriverWait(driver, 4).until(EC.presence_of_element_located((By.XPATH, xp)))
+        WebDriverWait(drv, 4).until(EC.presence_of_element_located((By.XPATH, xp)))
         return True
     except Exception:
         return False
 
-def _click_creative_in_preview():
+def _click_creative_in_preview(capture=None):
     """
     Original click-through routine (kept for non-skipped cases).
     Returns (detected_clicktag: bool, click_tab_handle or None).
     """
-    handles_before = set(driver.window_handles)
+    drv = _current_driver()
+    handles_before = set(drv.window_handles)
+    preview_page = _current_page_target(drv) if capture is not None else None
 
     clicked_somewhere = False
     switched_to_iframe = False
 
     # 1) Try iframe#ad first
     try:
-        frame = WebDriverWait(driver, 4).until(
+        frame = WebDriverWait(drv, 4).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "iframe#ad"))
         )
-        driver.switch_to.frame(frame)
+        drv.switch_to.frame(frame)
         switched_to_iframe = True
         try:
-            anchor = WebDriverWait(driver, 3).until(
+            anchor = WebDriverWait(drv, 3).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/clicktag']"))
             )
         except TimeoutException:
-            anchors = driver.find_elements(By.CSS_SELECTOR, "a[target='_blank'], a[href]")
+            anchors = drv.find_elements(By.CSS_SELECTOR, "a[target='_blank'], a[href]")
             anchor = anchors[0] if anchors else None
         if anchor:
             try:
@@ -725,11 +1414,11 @@ def _click_creative_in_preview():
             except Exception:
                 pass
             try:
-                ActionChains(driver).move_to_element(anchor).pause(0.05).click(anchor).perform()
+                ActionChains(drv).move_to_element(anchor).click(anchor).perform()
                 clicked_somewhere = True
             except Exception:
                 try:
-                    driver.execute_script("arguments[0].click();", anchor)
+                    drv.execute_script("arguments[0].click();", anchor)
                     clicked_somewhere = True
                 except Exception:
                     pass
@@ -737,7 +1426,7 @@ def _click_creative_in_preview():
         pass
     finally:
         if switched_to_iframe:
-            driver.switch_to.default_content()
+            drv.switch_to.default_content()
 
     # 2) If not yet opened, try a global /clicktag anchor
     if not clicked_somewhere:
@@ -748,50 +1437,478 @@ def _click_creative_in_preview():
             except Exception:
                 pass
             try:
-                ActionChains(driver).move_to_element(a).pause(0.05).click(a).perform()
+                ActionChains(drv).move_to_element(a).click(a).perform()
                 clicked_somewhere = True
             except Exception:
                 try:
-                    driver.execute_script("arguments[0].click();", a)
+                    drv.execute_script("arguments[0].click();", a)
                     clicked_somewhere = True
                 except Exception:
                     pass
 
-    # Wait up to 12s for new tab OR same-tab /clicktag
+    # Wait for a new tab OR a same-tab /clicktag navigation (event-driven with DevTools)
+    def opened_or_navigated(t):
+        if preview_page:
+            return capture.wait_click_through(preview_page, handles_before, t)
+        def seen(d):
+            return len(d.window_handles) > len(handles_before) or "/clicktag" in (d.current_url or "").lower()
+        return _wait_until(drv, t, seen, poll=0.1)
+
     click_handle = None
-    deadline = time.time() + 12.0
-    while time.time() < deadline:
-        try:
-            if len(driver.window_handles) > len(handles_before): break
-            if "/clicktag" in (driver.current_url or "").lower(): break
-        except Exception:
-            pass
-        time.sleep(0.25)
+    if clicked_somewhere:
+        _timed_wait("click_through", 12, opened_or_navigated, ceiling=12, record_timeouts=False)
 
-    new_handles = [h for h in driver.window_handles if h not in handles_before]
+    new_handles = [h for h in drv.window_handles if h not in handles_before]
     if new_handles:
         click_handle = new_handles[-1]
-        driver.switch_to.window(click_handle)
+        drv.switch_to.window(click_handle)
         try:
-            WebDriverWait(driver, 8).until(lambda d: d.execute_script("return document.readyState") == "complete")
+            _wait_page_ready(drv, capture, "click_load", 8)
         except Exception:
             pass
 
     detected = _detect_clicktag_success()
     log(f"{'✅' if detected else '❌'} ClickTag page {'detected' if detected else 'not detected'}."
-        f" Title={driver.title!r}, URL={driver.current_url}")
+        f" Title={drv.title!r}, URL={drv.current_url}")
     return detected, click_handle
 
+# ---------- Static clickTag pre-pass (live preview) ----------
+# The analysis itself is browser-free (qa_analysis); this reads the open preview's sources.
+STATIC_CLICKTAG = os.getenv("FT_STATIC_CLICKTAG", "1").strip().lower() not in ("0", "false", "no")
+
+# Collected inside iframe#ad: the live document plus same-origin external scripts.
+# Cross-origin and failed scripts are simply absent (analyze_clicktag_sources reports them
+# as unread); timedOut marks sources cut short by the 3 s limit.
+_AD_SOURCES_JS = r"""
+var done = arguments[arguments.length - 1];
+var out = {sources: {'index.html': document.documentElement.outerHTML}, timedOut: false};
+var srcs = Array.prototype.map.call(document.querySelectorAll('script[src]'), function (s) { return s.src; })
+  .filter(function (u) { try { return new URL(u).origin === location.origin; } catch (e) { return false; } });
+var timer = setTimeout(function () { out.timedOut = true; done(out); }, 3000);
+Promise.all(srcs.map(function (u) {
+  return fetch(u).then(function (r) { return r.text(); }).then(function (t) { out.sources[u] = t; }).catch(function () {});
+})).then(function () { clearTimeout(timer); done(out); });
+"""
+
+def _static_clicktag_verdict():
+    """Static pre-pass on the open preview's iframe#ad: analysis dict, or None when it can't be read."""
+    drv = _current_driver()
+    frames = drv.find_elements(By.CSS_SELECTOR, "iframe#ad")
+    if not frames:
+        return None
+    try:
+        drv.switch_to.frame(frames[0])
+        drv.set_script_timeout(10)
+        collected = drv.execute_async_script(_AD_SOURCES_JS) or {}
+    except Exception:
+        return None
+    finally:
+        drv.switch_to.default_content()
+    result = analyze_clicktag_sources(collected.get("sources") or {}, complete=not collected.get("timedOut"))
+    log(f"🔎 Static clickTag: {result['verdict']} ({result['reason']})")
+    return result
+
 # ---------- Console errors ----------
-def _check_preview_console_errors():
+_CONSOLE_IGNORE_SUBSTRINGS = [
+    "/crm/v1/user", "/int/v1/ui/creative-libraries", "grafana/faro-web-sdk",
+    "Problem Starting up Pendo", "DEPRECATED_ENDPOINT", "SharedImageManager::ProduceMemory",
+]
+
+class ConsoleCapture:
+    """
+    Browser-wide DevTools listener for one driver (TC11).
+
+    Auto-attaches to every tab and out-of-process iframe while it is still paused
+    (waitForDebuggerOnStart), enables Runtime/Log/Network/Page on it and only then lets
+    it run, so nothing a creative logs is missed. Runtime.exceptionThrown,
+    Runtime.consoleAPICalled(error), Log.entryAdded and Network.loadingFailed are
+    recorded with the tab (page target) and frame they came from.
+
+    The same session feeds the readiness waits: page lifecycle events (load,
+    networkAlmostIdle, networkIdle…), main-frame navigations and newly opened tabs,
+    and drives virtual time (fast_forward) for a tab and its iframes.
+    """
+
+    def __init__(self, drv):
+        self.drv = drv
+        self.ws = None
+        self.events = []           # {"page", "frame", "level", "kind", "text", "url"}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._next_id = 0
+        self._session_target = {}  # sessionId -> targetId (page id, or frame id for OOPIFs)
+        self._session_page = {}    # sessionId -> page targetId
+        self._ctx_frame = {}       # (sessionId, executionContextId) -> frameId
+        self._req_frame = {}       # (sessionId, requestId) -> (frameId, url), until the request settles
+        self._req_errors = {}      # same, for 4xx/5xx/failed requests until their Log entry (bounded)
+        self._frame_parent = {}    # frameId -> parent frameId
+        self._session_frames = {}  # sessionId -> frameIds attached in it (pruned on detach)
+        self._cond = threading.Condition(self._lock)
+        self._lifecycle = {}       # page targetId -> lifecycle event names of the current load
+        self._page_url = {}        # page targetId -> main-frame URL
+        self._pages = []           # page targetIds in the order they were attached
+        self._awaiting = set()     # command ids whose replies call() is waiting for
+        self._replies = {}         # command id -> reply message
+        self._budget_expired = set()  # sessionIds whose virtual-time budget ran out
+
+    @staticmethod
+    def _browser_ws_url(drv):
+        caps = drv.capabilities or {}
+        opts = caps.get("goog:chromeOptions") or caps.get("ms:edgeOptions") or {}
+        addr = opts.get("debuggerAddress")
+        if not addr:
+            return None
+        with urllib.request.urlopen(f"http://{addr}/json/version", timeout=5) as r:
+            return json.loads(r.read().decode("utf-8")).get("webSocketDebuggerUrl")
+
+    def start(self):
+        if websocket is None:
+            return False
+        url = self._browser_ws_url(self.drv)
+        if not url:
+            return False
+        self.ws = websocket.create_connection(url, timeout=10, suppress_origin=True)
+        self.ws.settimeout(None)
+        threading.Thread(target=self._reader, name="console-capture", daemon=True).start()
+        self._send("Target.setAutoAttach",
+                   {"autoAttach": True, "waitForDebuggerOnStart": True, "flatten": True})
+        return True
+
+    def close(self):
+        try:
+            if self.ws:
+                self.ws.close()
+        except Exception:
+            pass
+        self.ws = None
+
+    def _send(self, method, params=None, session_id=None, awaited=False):
+        with self._send_lock:
+            self._next_id += 1
+            msg = {"id": self._next_id, "method": method, "params": params or {}}
+            if session_id:
+                msg["sessionId"] = session_id
+            if awaited:
+                with self._lock:
+                    self._awaiting.add(self._next_id)
+            self.ws.send(json.dumps(msg))
+            return self._next_id
+
+    def call(self, method, params=None, session_id=None, timeout=5):
+        """Send a command and wait for its reply ({"result"} or {"error"}); None on timeout."""
+        msg_id = self._send(method, params, session_id, awaited=True)
+        try:
+            if not self.wait_for(lambda: msg_id in self._replies, timeout):
+                return None
+            with self._lock:
+                return self._replies.pop(msg_id)
+        finally:
+            with self._lock:
+                self._awaiting.discard(msg_id)
+                self._replies.pop(msg_id, None)
+
+    def _reader(self):
+        while self.ws:
+            try:
+                msg = json.loads(self.ws.recv())
+            except Exception:
+                break
+            with self._cond:
+                if msg.get("id") in self._awaiting:
+                    self._replies[msg["id"]] = msg
+                    self._cond.notify_all()
+                    continue
+            method = msg.get("method")
+            if method:
+                try:
+                    self._on_event(method, msg.get("params") or {}, msg.get("sessionId"))
+                except Exception:
+                    pass
+        if self.ws is not None:
+            # Connection lost (not close()): nobody would resume tabs paused for this
+            # session, so drop it; closing the socket releases them
+            log("⚠️ DevTools console capture lost; it will be restarted for the next preview.")
+            _drop_console_capture(self.drv, self)
+
+    def _frame_for(self, sid, frame=None):
+        return frame or self._session_target.get(sid)
+
+    def _record(self, sid, frame, level, kind, text, url=""):
+        page = self._session_page.get(sid)
+        if not page:
+            return
+        with self._lock:
+            self.events.append({"page": page, "frame": self._frame_for(sid, frame),
+                                "level": level, "kind": kind, "text": text, "url": url or ""})
+
+    def _on_event(self, method, p, sid):
+        if method == "Target.attachedToTarget":
+            child = p["sessionId"]
+            info = p.get("targetInfo") or {}
+            if info.get("type") in ("page", "iframe"):
+                self._session_target[child] = info.get("targetId")
+                self._session_page[child] = (self._session_page.get(sid) if info.get("type") == "iframe" and sid
+                                             else info.get("targetId"))
+                for m in ("Runtime.enable", "Log.enable", "Network.enable", "Page.enable"):
+                    self._send(m, session_id=child)
+                if info.get("type") == "page":
+                    self._send("Page.setLifecycleEventsEnabled", {"enabled": True}, session_id=child)
+                    with self._cond:
+                        self._page_url[info.get("targetId")] = info.get("url") or ""
+                        self._pages.append(info.get("targetId"))
+                        self._cond.notify_all()
+                self._send("Target.setAutoAttach",
+                           {"autoAttach": True, "waitForDebuggerOnStart": True, "flatten": True},
+                           session_id=child)
+            if p.get("waitingForDebugger"):
+                self._send("Runtime.runIfWaitingForDebugger", session_id=child)
+        elif method == "Target.detachedFromTarget":
+            # Tab/frame gone (previews are read before their tabs are closed)
+            child = p.get("sessionId")
+            target = self._session_target.pop(child, None)
+            page = self._session_page.pop(child, None)
+            self._drop_session(child)
+            if target and target == page:
+                self.forget(page)
+                with self._cond:
+                    self._lifecycle.pop(page, None)
+                    self._page_url.pop(page, None)
+                    self._pages = [t for t in self._pages if t != page]
+                    self._cond.notify_all()
+        elif method == "Page.lifecycleEvent":
+            page = self._session_page.get(sid)
+            if page and p.get("frameId") == page:
+                with self._cond:
+                    if p.get("name") == "init":
+                        self._lifecycle[page] = set()
+                    self._lifecycle.setdefault(page, set()).add(p.get("name"))
+                    self._cond.notify_all()
+        elif method == "Emulation.virtualTimeBudgetExpired":
+            with self._cond:
+                self._budget_expired.add(sid)
+                self._cond.notify_all()
+        elif method == "Page.frameNavigated":
+            frame = p.get("frame") or {}
+            page = self._session_page.get(sid)
+            if page and not frame.get("parentId") and frame.get("id") == page:
+                with self._cond:
+                    self._page_url[page] = frame.get("url") or ""
+                    self._cond.notify_all()
+        elif method == "Runtime.executionContextCreated":
+            ctx = p.get("context") or {}
+            frame = (ctx.get("auxData") or {}).get("frameId")
+            if frame:
+                self._ctx_frame[(sid, ctx.get("id"))] = frame
+        elif method == "Runtime.executionContextDestroyed":
+            self._ctx_frame.pop((sid, p.get("executionContextId")), None)
+        elif method == "Runtime.executionContextsCleared":
+            for key in [k for k in self._ctx_frame if k[0] == sid]:
+                self._ctx_frame.pop(key, None)
+        elif method == "Page.frameAttached":
+            if p.get("parentFrameId"):
+                self._frame_parent[p["frameId"]] = p["parentFrameId"]
+                self._session_frames.setdefault(sid, set()).add(p["frameId"])
+        elif method == "Network.requestWillBeSent":
+            self._req_frame[(sid, p.get("requestId"))] = (p.get("frameId"), (p.get("request") or {}).get("url", ""))
+        elif method == "Network.responseReceived":
+            if ((p.get("response") or {}).get("status") or 0) >= 400:
+                self._keep_request(sid, p.get("requestId"))
+        elif method == "Network.loadingFinished":
+            self._req_frame.pop((sid, p.get("requestId")), None)
+        elif method == "Runtime.exceptionThrown":
+            d = p.get("exceptionDetails") or {}
+            text = ((d.get("exception") or {}).get("description") or d.get("text") or "").strip()
+            self._record(sid, self._ctx_frame.get((sid, d.get("executionContextId"))),
+                         "SEVERE", "exception", text, d.get("url"))
+        elif method == "Runtime.consoleAPICalled":
+            if p.get("type") != "error":
+                return
+            parts = []
+            for a in p.get("args") or []:
+                parts.append(str(a.get("value", a.get("description", ""))))
+            self._record(sid, self._ctx_frame.get((sid, p.get("executionContextId"))),
+                         "SEVERE", "console", " ".join(parts))
+        elif method == "Log.entryAdded":
+            e = p.get("entry") or {}
+            if e.get("level") != "error":
+                return
+            key = (sid, e.get("networkRequestId"))
+            frame, _ = self._req_errors.pop(key, None) or self._req_frame.get(key) or (None, "")
+            text = f"{e.get('url')} - {e.get('text')}" if e.get("url") else (e.get("text") or "")
+            self._record(sid, frame, "SEVERE", "log", text, e.get("url"))
+        elif method == "Network.loadingFailed":
+            key = (sid, p.get("requestId"))
+            if p.get("canceled"):
+                self._req_frame.pop(key, None)
+                return
+            self._keep_request(sid, p.get("requestId"))
+            frame, url = self._req_errors.get(key) or (None, "")
+            self._record(sid, frame, "SEVERE", "network",
+                         f"{url} - {p.get('errorText') or p.get('blockedReason') or 'failed'}", url)
+
+    _REQ_ERRORS_KEEP = 1000
+
+    def _keep_request(self, sid, request_id):
+        """Move a 4xx/5xx/failed request to _req_errors, where its console Log entry finds its frame."""
+        key = (sid, request_id)
+        if key in self._req_frame:
+            self._req_errors[key] = self._req_frame.pop(key)
+            while len(self._req_errors) > self._REQ_ERRORS_KEEP:
+                self._req_errors.pop(next(iter(self._req_errors)))
+
+    def _drop_session(self, sid):
+        """Forget the per-session maps of a detached tab or iframe."""
+        for d in (self._ctx_frame, self._req_frame, self._req_errors):
+            for key in [k for k in d if k[0] == sid]:
+                d.pop(key, None)
+        for frame in self._session_frames.pop(sid, ()):
+            self._frame_parent.pop(frame, None)
+        with self._lock:
+            self._budget_expired.discard(sid)
+
+    def _within(self, frame, root):
+        seen = set()
+        while frame and frame not in seen:
+            if frame == root:
+                return True
+            seen.add(frame)
+            frame = self._frame_parent.get(frame)
+        return False
+
+    def errors_for(self, page, frame_root=None):
+        """Errors recorded for a tab, optionally only from frame_root and its sub-frames."""
+        with self._lock:
+            evs = [e for e in self.events if e["page"] == page]
+        return [e for e in evs if frame_root is None or self._within(e["frame"], frame_root)]
+
+    def forget(self, page):
+        with self._lock:
+            self.events = [e for e in self.events if e["page"] != page]
+
+    def clear(self):
+        """Drop every recorded event (the grid tab's own errors are never read)."""
+        with self._lock:
+            self.events = []
+
+    # --- readiness ---
+    def wait_for(self, predicate, timeout):
+        """Block until predicate() (checked on every DevTools event) is truthy; returns its value."""
+        with self._cond:
+            return self._cond.wait_for(predicate, timeout)
+
+    def wait_lifecycle(self, page, names, timeout):
+        """True once the tab's current (non-blank) load has fired any of the lifecycle events in names."""
+        def reached():
+            return (self._page_url.get(page, "") not in ("", "about:blank")
+                    and any(n in self._lifecycle.get(page, ()) for n in names))
+        return bool(self.wait_for(reached, timeout))
+
+    def _new_page(self, known):
+        return next((t for t in self._pages if t not in known), None)
+
+    def wait_new_page(self, known, timeout):
+        """targetId of the first tab opened that is not in known, or None."""
+        return self.wait_for(lambda: self._new_page(known), timeout)
+
+    def wait_click_through(self, page, known, timeout):
+        """True once a new tab opens or the tab navigates to a /clicktag URL."""
+        return bool(self.wait_for(
+            lambda: self._new_page(known) or "/clicktag" in self._page_url.get(page, "").lower(), timeout))
+
+    def page_url(self, page):
+        with self._lock:
+            return self._page_url.get(page, "")
+
+    # --- virtual time ---
+    def fast_forward(self, page, budget_ms, timeout=None):
+        """
+        Run the tab (and its out-of-process iframes) on virtual time for budget_ms: timers
+        and animation frames fire as fast as the page can run them, pausing while network
+        fetches are pending. With a timeout, waits for every session's budget to expire
+        (virtual time then stays paused at the end state). Returns the number of sessions.
+        """
+        with self._lock:
+            sessions = [s for s, pg in self._session_page.items() if pg == page]
+        started = []
+        for sid in sessions:
+            with self._lock:
+                self._budget_expired.discard(sid)
+            reply = self.call("Emulation.setVirtualTimePolicy",
+                              {"policy": "pauseIfNetworkFetchesPending", "budget": budget_ms,
+                               "maxVirtualTimeTaskStarvationCount": 100}, sid)
+            if reply and "error" not in reply:
+                started.append(sid)
+        if started and timeout is not None:
+            done = self.wait_for(lambda: all(s in self._budget_expired or s not in self._session_page
+                                             for s in started), timeout)
+            if not done:
+                return 0
+        return len(started)
+
+_console_captures = {}
+_console_captures_lock = threading.Lock()
+
+def _console_capture_for(drv):
+    """Started ConsoleCapture for this driver, or None (falls back to get_log polling)."""
+    key = getattr(drv, "session_id", None) or id(drv)
+    with _console_captures_lock:
+        if key in _console_captures:
+            return _console_captures[key]
+        cap = ConsoleCapture(drv)
+        try:
+            if not cap.start():
+                cap = None
+        except Exception as e:
+            log(f"ℹ️ DevTools console capture unavailable, using get_log: {e}")
+            cap = None
+        _console_captures[key] = cap
+        return cap
+
+def _drop_console_capture(drv, cap=None):
+    """Close drv's capture (or cap, leaving the registry alone if it already holds a newer one)."""
+    key = getattr(drv, "session_id", None) or id(drv)
+    with _console_captures_lock:
+        if cap is None or _console_captures.get(key) is cap:
+            cap = _console_captures.pop(key, None) or cap
+    if cap:
+        cap.close()
+
+def _current_page_target(drv):
+    try:
+        return drv.execute_cdp_cmd("Target.getTargetInfo", {})["targetInfo"]["targetId"]
+    except Exception:
+        return None
+
+def _ad_frame_id(drv):
+    """DevTools frame id of iframe#ad in the current tab, or None."""
+    try:
+        root_id = drv.execute_cdp_cmd("DOM.getDocument", {"depth": 0})["root"]["nodeId"]
+        node_id = drv.execute_cdp_cmd("DOM.querySelector", {"nodeId": root_id, "selector": "iframe#ad"})["nodeId"]
+        if not node_id:
+            return None
+        return drv.execute_cdp_cmd("DOM.describeNode", {"nodeId": node_id})["node"].get("frameId")
+    except Exception:
+        return None
+
+def _check_preview_console_errors(capture=None, ad=None):
     """
     Read browser console logs in the Preview tab and flag only relevant errors.
-    If iframe#ad exists, filter by its origin. Otherwise fall back to the current page origin.
+    With a ConsoleCapture, errors are taken from the iframe#ad frame tree (or the whole
+    tab when there is no ad iframe); ad=(page, frame) pins both to what they were when
+    the preview opened. Otherwise the legacy get_log path filters by the iframe#ad
+    origin, falling back to the current page origin.
     """
+    drv = _current_driver()
+    if capture is not None:
+        page, frame_root = ad or (_current_page_target(drv), _ad_frame_id(drv))
+        if page:
+            entries = [f"[{e['level']}] {e['text']}" for e in capture.errors_for(page, frame_root)]
+            return _console_verdict(_keep_console_entries(entries))
+
     allowed_patterns = []
     # Try iframe first
     try:
-        frame = WebDriverWait(driver, 3).until(
+        frame = WebDriverWait(drv, 3).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "iframe#ad"))
         )
         src = (frame.get_attribute("src") or "").strip()
@@ -801,153 +1918,829 @@ def _check_preview_console_errors():
     except Exception:
         # Fallback: use current URL origin
         try:
-            u = urlparse(driver.current_url)
+            u = urlparse(drv.current_url)
             if u.netloc:
                 allowed_patterns = [u.netloc]
         except Exception:
             pass
 
-    ignore_substrings = [
-        "/crm/v1/user", "/int/v1/ui/creative-libraries", "grafana/faro-web-sdk",
-        "Problem Starting up Pendo", "DEPRECATED_ENDPOINT", "SharedImageManager::ProduceMemory",
-    ]
     try:
-        _ = driver.get_log('browser')
+        _ = drv.get_log('browser')
     except Exception:
         pass
     time.sleep(0.15)
-    errors = []
+    entries = []
     try:
-        logs = driver.get_log('browser')
+        logs = drv.get_log('browser')
         for entry in logs:
             lvl = (entry.get('level') or '').upper()
             msg = entry.get('message') or ''
             if lvl not in ('SEVERE', 'ERROR'):
                 continue
-            if any(s in msg for s in ignore_substrings):
-                continue
             if allowed_patterns and not any(p in msg for p in allowed_patterns):
                 continue
-            errors.append(f"[{lvl}] {msg}")
+            entries.append(f"[{lvl}] {msg}")
     except Exception as e:
         log(f"ℹ️ Console logs not available: {e}")
+    return _console_verdict(_keep_console_entries(entries))
+
+def _keep_console_entries(entries):
+    """Leave the creative's raw console entries in the preview details (recorded fixtures replay them)."""
+    details = getattr(_thread_state, "preview_details", None)
+    if details is not None:
+        details["console_raw"] = list(entries)
+    return entries
+
+def _console_verdict(entries):
+    """TC11 rule: (has_errors, errors) for "[LEVEL] message" entries, minus known platform noise."""
+    errors = [e for e in entries if not any(s in e for s in _CONSOLE_IGNORE_SUBSTRINGS)]
     return (len(errors) > 0), errors
 
-# ---------- Helpers used ONLY for TC7 (keyboard search + robust cell read) ----------
-def _row_by_creative_name(name: str):
-    """Find the row element by exact visible name/title after a keyboard search."""
+# ---------- Virtual time (fast-forward animated previews) ----------
+_VIRTUAL_TIME_PROBE_MS = 5000  # virtual time granted to click handlers after the fast-forward
+
+def _fast_forward_preview(capture, budget_ms=None):
+    """
+    Fast-forwards the preview tab through budget_ms of its animation timeline, so the
+    click-through and the console read see the creative's end state. True when every
+    frame reached the end of the budget.
+    """
+    budget_ms = budget_ms or VIRTUAL_TIME_MS
+    page = _current_page_target(_current_driver()) if capture is not None else None
+    if not page:
+        log("ℹ️ Fast-forward needs the DevTools capture; preview runs in real time.")
+        return False
+    t0 = time.perf_counter()
+    frames = _timed_wait("preview_ff", 10, lambda t: capture.fast_forward(page, budget_ms, t), floor=2.0)
+    if frames:
+        log(f"⏩ Fast-forwarded {budget_ms / 1000:g}s of animation in {time.perf_counter() - t0:.2f}s"
+            f" ({frames} frame target(s)).")
+    else:
+        log("⚠️ Virtual-time fast-forward did not finish; checks run on the current state.")
+    return bool(frames)
+
+def _resume_preview_time(capture):
+    """Lets timers run again (bounded) after a fast-forward, e.g. for setTimeout-based exits."""
+    page = _current_page_target(_current_driver())
+    if page:
+        capture.fast_forward(page, _VIRTUAL_TIME_PROBE_MS)
+
+# ---------- Grid harvester (MutationObserver, one pass) ----------
+# A MutationObserver on the virtualized grid marks every row React renders or
+# updates. Each step drains those rows as plain JSON (keyed by creative ID, so a
+# row is only sent once), scrolls one viewport and returns as soon as the grid's
+# mutations have settled — no fixed sleeps. Cells are resolved through the header map.
+_GRID_ROW_READER_JS = r"""
+function ftText(el) { return el ? (el.innerText || el.textContent || '').trim() : ''; }
+function ftFull(el) {
+  if (!el) return '';
+  var t = (el.getAttribute('title') || '').trim();
+  if (!t) { var inner = el.querySelector('[title]'); if (inner) t = (inner.getAttribute('title') || '').trim(); }
+  var x = ftText(el);
+  return (t && t.length >= x.length) ? t : x;
+}
+function ftReadRow(r, colMap, sc) {
+  var cells = r.querySelectorAll('.react-grid-Cell');
+  var val = function (key, reader) {
+    if (!(key in colMap)) return null;
+    var k = colMap[key];
+    return (k === undefined || k === null || k >= cells.length) ? undefined : reader(cells[k]);
+  };
+  var a = r.querySelector('span.name-overflow a');
+  return {
+    id: val('id', ftText),
+    name: a ? ftText(a) : null,
+    href: a ? (a.getAttribute('href') ? a.href : '') : '',
+    status: val('status', ftText),
+    type: val('type', ftText),
+    placement_size: val('placement size', ftText),
+    base_file_size: val('base file size', ftText),
+    file_name: val('file name', ftFull),
+    modified: val('last modified', ftText),
+    top: sc ? r.getBoundingClientRect().top - sc.getBoundingClientRect().top + sc.scrollTop : null
+  };
+}
+"""
+
+_GRID_HARVEST_START_JS = r"""
+var colMap = arguments[0] || {};
+var sc = document.querySelector('div.ReactVirtualized__Grid');
+var old = window.__ftHarvest;
+if (old && old.observer) old.observer.disconnect();
+var h = window.__ftHarvest = {colMap: colMap, dirty: new Set(), sent: {}, mutations: 0, observer: null};
+function mark(node) {
+  var el = node && (node.nodeType === 1 ? node : node.parentElement);
+  if (!el) return;
+  var r = el.closest ? el.closest('div.react-grid-Row') : null;
+  if (r) { h.dirty.add(r); return; }
+  if (el.querySelectorAll) el.querySelectorAll('div.react-grid-Row').forEach(function (x) { h.dirty.add(x); });
+}
+h.observer = new MutationObserver(function (list) {
+  for (var i = 0; i < list.length; i++) {
+    mark(list[i].target);
+    list[i].addedNodes.forEach(mark);
+  }
+  h.mutations += list.length;
+});
+h.observer.observe(sc || document.body, {childList: true, subtree: true, characterData: true});
+document.querySelectorAll('div.react-grid-Row').forEach(function (r) { h.dirty.add(r); });
+if (sc) { sc.scrollTop = 0; sc.scrollLeft = sc.scrollWidth; }
+return !!sc;
+"""
+
+# Drain the rows seen so far, scroll one viewport, wait for the grid to settle, drain again.
+# arguments: [idleMs] — how long to wait for lazy-loaded rows once the bottom is reached.
+_GRID_HARVEST_STEP_JS = _GRID_ROW_READER_JS + r"""
+var idleMs = arguments[0] || 1500;
+var done = arguments[arguments.length - 1];
+var h = window.__ftHarvest;
+var sc = document.querySelector('div.ReactVirtualized__Grid');
+if (!h) { done({rows: [], atEnd: true, lost: true}); return; }
+function drain() {
+  var out = [];
+  h.dirty.forEach(function (r) {
+    if (!r.isConnected) return;
+    var rec = ftReadRow(r, h.colMap, sc);
+    var key = (rec.id || '') || rec.href || (rec.name + '@' + rec.top);
+    if (h.sent[key]) return;
+    h.sent[key] = 1;
+    out.push(rec);
+  });
+  h.dirty.clear();
+  out.sort(function (a, b) { return (a.top || 0) - (b.top || 0); });
+  return out;
+}
+var rows = drain();
+if (!sc) { done({rows: rows, atEnd: true}); return; }
+var before = sc.scrollTop, height = sc.scrollHeight;
+var bottom = before + sc.clientHeight >= height - 1;
+if (!bottom) { sc.scrollTop = Math.min(before + sc.clientHeight * 0.9, height); }
+var start = h.mutations, t0 = performance.now();
+var limit = bottom ? idleMs : Math.min(idleMs, 1000);
+function finish() {
+  var more = drain();
+  var grew = sc.scrollHeight > height;
+  done({rows: rows.concat(more), atEnd: (bottom && !grew) || (!bottom && sc.scrollTop === before)});
+}
+(function settle() {
+  var seen = h.mutations;
+  requestAnimationFrame(function () {
+    var quiet = h.mutations !== start && h.mutations === seen;
+    // Mid-grid: done once the new viewport has rendered. At the bottom: wait for more rows.
+    if (quiet && (!bottom || sc.scrollHeight > height)) { finish(); return; }
+    if (performance.now() - t0 > limit) { finish(); return; }
+    settle();
+  });
+})();
+"""
+
+# Scroll to the bottom until the grid stops growing (lazy-loaded pages), then reveal all
+# columns. Waits on mutations instead of sleeping. arguments: [idleMs]
+_GRID_LOAD_ALL_JS = r"""
+var idleMs = arguments[0] || 1500;
+var done = arguments[arguments.length - 1];
+var sc = document.querySelector('div.ReactVirtualized__Grid');
+if (!sc) { done(false); return; }
+var mutations = 0;
+var obs = new MutationObserver(function (list) { mutations += list.length; });
+obs.observe(sc, {childList: true, subtree: true});
+(function step() {
+  var height = sc.scrollHeight, start = mutations, t0 = performance.now();
+  sc.scrollTop = height;
+  (function settle() {
+    var seen = mutations;
+    requestAnimationFrame(function () {
+      var quiet = mutations !== start && mutations === seen;
+      if (quiet && sc.scrollHeight > height) { step(); return; }
+      if (performance.now() - t0 > idleMs) {
+        obs.disconnect();
+        sc.scrollLeft = sc.scrollWidth;
+        requestAnimationFrame(function () { requestAnimationFrame(function () { done(true); }); });
+        return;
+      }
+      settle();
+    });
+  })();
+})();
+"""
+
+_GRID_HARVEST_STOP_JS = r"""
+var h = window.__ftHarvest;
+if (h && h.observer) h.observer.disconnect();
+window.__ftHarvest = null;
+"""
+
+# Brings the row for a snapshot record into view and returns its element.
+_GRID_ROW_FOR_JS = r"""
+var id = arguments[0], href = arguments[1], top = arguments[2], idCol = arguments[3];
+var done = arguments[arguments.length - 1];
+var sc = document.querySelector('div.ReactVirtualized__Grid');
+function find() {
+  var rows = document.querySelectorAll('div.react-grid-Row');
+  for (var i = 0; i < rows.length; i++) {
+    var a = rows[i].querySelector('span.name-overflow a');
+    if (href && a && a.href === href) return rows[i];
+    if (id && idCol !== null) {
+      var c = rows[i].querySelectorAll('.react-grid-Cell')[idCol];
+      if (c && (c.innerText || c.textContent || '').trim() === id) return rows[i];
+    }
+  }
+  return null;
+}
+var row = find();
+if (row || !sc || top === null) { done(row); return; }
+sc.scrollTop = Math.max(0, top - sc.clientHeight / 2);
+requestAnimationFrame(function () { requestAnimationFrame(function () { done(find()); }); });
+"""
+
+def _snapshot_key(raw):
+    rid = (raw.get("id") or "").strip()
+    return rid or (raw.get("href") or "") or f"{raw.get('name')}@{raw.get('top')}"
+
+def _harvest_grid(col_index_map, idle_ms=1500):
+    """
+    Read the whole grid into memory in one pass, driven by DOM mutations.
+    Rows are de-duplicated by creative ID and returned in grid order as a CreativeBatch.
+    """
+    drv = _current_driver()
+    drv.set_script_timeout(30)
+    if not drv.execute_script(_GRID_HARVEST_START_JS, col_index_map):
+        log("⚠️ Grid scroller not found; harvesting rendered rows only.")
+    seen, records, steps = set(), [], 0
+    try:
+        while True:
+            res = drv.execute_async_script(_GRID_HARVEST_STEP_JS, idle_ms) or {}
+            steps += 1
+            if res.get("lost"):
+                log("⚠️ Grid harvester was reset by a page reload; stopping early.")
+            for raw in res.get("rows") or []:
+                key = _snapshot_key(raw)
+                if key in seen:
+                    continue
+                seen.add(key)
+                records.append(_normalize_snapshot_row(raw))
+            if res.get("atEnd"):
+                break
+    finally:
+        try:
+            drv.execute_script(_GRID_HARVEST_STOP_JS)
+        except Exception:
+            pass
+    # Row heights are fixed, so grid order is the rows' offset in the scroller
+    records.sort(key=lambda r: r["top"] if r.get("top") is not None else float("inf"))
+    batch = CreativeBatch.from_records(records)
+    log(f"📸 Grid harvest: {len(batch)} rows in {steps} step(s).")
+    return batch
+
+def _row_element_for(rec, col_index_map):
+    """Locate (and scroll to) the live row element for a snapshot record."""
+    drv = _current_driver()
+    id_col = col_index_map.get("id")
+    rid = rec["id"] if rec["id"] != "[Missing]" else ""
     try:
-        anchors = driver.find_elements(By.CSS_SELECTOR, "span.name-overflow a")
-        for a in anchors:
-            t = (a.text or "").strip()
-            ti = (a.get_attribute("title") or "").strip()
-            if t == name or ti == name:
-                return a.find_element(By.XPATH, "./ancestor::div[contains(@class,'react-grid-Row')]")
+        return drv.execute_async_script(_GRID_ROW_FOR_JS, rid, rec["href"], rec.get("top"), id_col)
     except Exception:
-        pass
-    return None
+        return None
 
-def _get_full_text_from_cell(cell):
-    """Prefer @title (full text) when present; otherwise cell.text."""
+# ---------- Verdict cache & results store (opened per run) ----------
+def _open_verdict_cache():
+    if not USE_VERDICT_CACHE:
+        return None
     try:
-        if cell is None:
-            return ""
-        title = (cell.get_attribute("title") or "").strip()
-        txt = (cell.text or "").strip()
-        return title if title and len(title) >= len(txt) else txt
-    except Exception:
-        return ""
+        return VerdictCache(ttl=VERDICT_CACHE_TTL, max_rows=VERDICT_CACHE_MAX_ROWS)
+    except Exception as e:
+        log(f"ℹ️ Verdict cache unavailable: {e}")
+        return None
 
-def _cmdf_search(text: str):
-    """Open browser find box, type text, close."""
+def _open_results_store():
     try:
-        if platform.system() == "Darwin":
-            pyautogui.hotkey("command", "f")
-        else:
-            pyautogui.hotkey("ctrl", "f")
-        time.sleep(0.08)
-        pyautogui.typewrite(text)
-        time.sleep(0.25)
-        pyautogui.press("esc")
+        return ResultsStore()
     except Exception as e:
-        log(f"⚠️ Keyboard find failed: {e}")
+        log(f"ℹ️ Results store unavailable: {e}")
+        return None
 
-# ---------- Main Selenium Flow ----------
-def selenium_login(username, password, url, skip_restart=False):
-    """Navigate, login, scan grid, run checks."""
-    global driver, SUMMARY_PREFIX
+# ---------- Running summary (constant memory) ----------
+class RunningSummary:
+    """
+    Run totals built from each record as it is published: result counts, verdict counts
+    per TC and the most common failure reasons. No per-creative data is kept, and the
+    reason table is trimmed to its most frequent entries once it passes max_reasons.
+    """
+    def __init__(self, max_reasons=200):
+        self.max_reasons = max_reasons
+        self.results = Counter()
+        self.by_tc = {tc: Counter() for tc in _RESULT_TCS}
+        self.reasons = Counter()
+        self.failed_creatives = 0
+
+    def _reason(self, text):
+        self.reasons[text[:120]] += 1
+        if len(self.reasons) > self.max_reasons:
+            self.reasons = Counter(dict(self.reasons.most_common(self.max_reasons // 2)))
+
+    def add(self, record):
+        self.results[record.get("result")] += 1
+        cases = record.get("cases") or {}
+        failed = record.get("result") == "error"
+        for tc, verdict in cases.items():
+            if tc in self.by_tc:
+                self.by_tc[tc][verdict] += 1
+            if verdict == "FAIL":
+                failed = True
+                label = CASE_LABELS.get(tc, tc).split("] ", 1)[-1]
+                self._reason(f"{tc}: {label}")
+        for err in record.get("console_errors") or []:
+            self._reason(f"TC11 console: {err}")
+        if record.get("result") == "error":
+            self._reason(f"Error: {(record.get('note') or '').splitlines()[0] if record.get('note') else 'unknown'}")
+        if failed:
+            self.failed_creatives += 1
+
+    def lines(self, top=10):
+        out = ["Results: " + ", ".join(f"{k} {v}" for k, v in sorted(self.results.items(), key=lambda kv: str(kv[0])))
+               + f" • creatives with a FAIL: {self.failed_creatives}"]
+        for tc in _RESULT_TCS:
+            c = self.by_tc[tc]
+            if c:
+                out.append(f"  {tc:5} " + "  ".join(f"{v}: {n}" for v, n in c.most_common()))
+        if self.reasons:
+            out.append("Top failure reasons:")
+            out.extend(f"  {n:6} × {r}" for r, n in self.reasons.most_common(top))
+        return out
+
+# ---------- Record & replay (offline fixtures) ----------
+_FIXTURE_FORMAT = "basefile-qa-fixture"
+_REPLAY = None  # (fixture, CreativeBatch) while replay_fixture() runs selenium_login
+
+class RunRecorder:
+    """
+    Grid snapshot (columnar), header map and per-row preview outcomes of one run —
+    raw console entries and the clicktag result — saved as a gzip'd JSON fixture.
+    Replay re-applies the TC10/TC11 rules to them, so filter changes can be checked offline.
+    """
+    def __init__(self, url, mode):
+        self.data = {"format": _FIXTURE_FORMAT, "version": 1, "url": url, "mode": mode,
+                     "recorded_at": time.time(), "col_index_map": {}, "grid": {}, "previews": {}}
+
+    def grid(self, col_index_map, batch):
+        self.data["col_index_map"] = dict(col_index_map)
+        self.data["grid"] = batch.to_columns()
+
+    def preview(self, idx, cases, details):
+        """Outcome of a live preview for grid row idx (1-based)."""
+        if details is None:
+            return
+        self.data["previews"][str(idx)] = {
+            "tc10": cases.get("TC10"), "tc11": cases.get("TC11"),
+            "clicktag": details.get("clicktag"), "console": details.get("console_raw"),
+            "preview_s": details.get("preview_s"),
+        }
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+        return path
+
+def load_fixture(path):
+    """(fixture dict, CreativeBatch) from a RunRecorder file."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != _FIXTURE_FORMAT:
+        raise ValueError(f"{path} is not a recorded run fixture")
+    return data, CreativeBatch.from_columns(data.get("grid") or {})
+
+def _replay_preview(fixture, idx):
+    """(tc10, tc11, details) for row idx from recorded outcomes, through the same TC10/TC11 rules."""
+    p = fixture["previews"].get(str(idx))
+    if p is None:
+        return "-", "-", {"console_errors": [], "preview_s": None}
+    tc10 = p.get("tc10") or "-"
+    if p.get("clicktag") is not None:
+        tc10 = "PASSED" if p["clicktag"] else "FAIL"
+    tc11, errors = p.get("tc11") or "-", []
+    if p.get("console") is not None:
+        has_errors, errors = _console_verdict(p["console"])
+        tc11 = "FAIL" if has_errors else "PASSED"
+    return tc10, tc11, {"console_errors": errors, "preview_s": p.get("preview_s")}
+
+def replay_fixture(path, process_all=None):
+    """
+    Re-run a recorded run through selenium_login with no browser: TC1–TC9 on the recorded grid,
+    TC10/TC11 from the recorded outcomes. Results go to RESULT_SINK / the results store as usual.
+    process_all overrides the recorded mode (QA-only vs all).
+    """
+    global _REPLAY, PROCESS_ALL, USE_VERDICT_CACHE, DELTA_MODE, GRID_ONLY, RECORD_PATH
+    fixture, batch = load_fixture(path)
+    saved = (PROCESS_ALL, USE_VERDICT_CACHE, DELTA_MODE, GRID_ONLY, RECORD_PATH)
+    PROCESS_ALL = (fixture.get("mode") == "all") if process_all is None else bool(process_all)
+    USE_VERDICT_CACHE, DELTA_MODE, GRID_ONLY, RECORD_PATH = False, False, False, None
+    _REPLAY = (fixture, batch)
+    recorded = time.strftime("%Y-%m-%d %H:%M", time.localtime(fixture.get("recorded_at") or 0))
+    log(f"⏪ Replaying {len(batch)} rows recorded {recorded} from {fixture.get('url')}")
+    t0 = time.perf_counter()
     try:
-        if not skip_restart:
-            start_driver()
-        log(f"🌐 Navigating to URL: {url}")
-        driver.get(url)
+        selenium_login("", "", fixture.get("url") or "", skip_restart=True)
+    finally:
+        _REPLAY = None
+        PROCESS_ALL, USE_VERDICT_CACHE, DELTA_MODE, GRID_ONLY, RECORD_PATH = saved
+    log(f"⏪ Replay finished in {time.perf_counter() - t0:.2f}s.")
 
-        qa_only = not PROCESS_ALL
-        processed_count = 0
-        expected_total = 0
+# ---------- Main Selenium Flow ----------
+def _login_and_load_grid(username, password, url, load_all=True):
+    """
+    Navigate and login with the current thread's driver. With load_all, scroll until every
+    lazy-loaded row exists (preview workers); the grid browser's harvester does that itself.
+    """
+    drv = _current_driver()
+    restored = _restore_session(drv, url, username)
+    log(f"🌐 Navigating to URL: {url}")
+    with _span("navigate"):
+        drv.get(url)
 
-        # --- Login ---
-        try:
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.NAME, "username"))
-            ).send_keys(username)
-            driver.find_element(By.NAME, "password").send_keys(password)
-            driver.find_element(By.NAME, "password").send_keys(Keys.RETURN)
-            log(f"🔐 Login attempted for user: {username}")
-
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".react-grid-Row"))
-            )
+    # --- Login (skipped when the saved session / profile is still valid) ---
+    try:
+        with _span("login"):
+            state = _await_grid_or_login(drv, 20 if restored or CHROME_PROFILE_DIR else 15)
+            if state == "grid":
+                log("🔓 Session still valid; skipped the login form.")
+            else:
+                if restored:
+                    log("ℹ️ Saved session was rejected; using the login form.")
+                    _forget_session(url, username)
+                WebDriverWait(drv, 15).until(
+                    EC.presence_of_element_located((By.NAME, "username"))
+                ).send_keys(username)
+                drv.find_element(By.NAME, "password").send_keys(password)
+                drv.find_element(By.NAME, "password").send_keys(Keys.RETURN)
+                log(f"🔐 Login attempted for user: {username}")
+
+                WebDriverWait(drv, 20).until(
+                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".react-grid-Row"))
+                )
+                _save_session(drv, url, username)
 
-            # >>> Zoom out ONCE so grid shows many columns (stay zoomed-out for all grid checks)
+        # >>> Zoom out ONCE so grid shows many columns (stay zoomed-out for all grid checks)
+        with _span("zoom.grid"):
             real_chrome_zoom_out()
 
-            # Load all rows/columns
-            try:
-                scrollable_div = WebDriverWait(driver, 10).until(
+        # Load all rows/columns
+        try:
+            with _span("grid.load"):
+                WebDriverWait(drv, 10).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "div.ReactVirtualized__Grid"))
                 )
-                last_height = driver.execute_script("return arguments[0].scrollHeight", scrollable_div)
-                while True:
-                    driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
-                    time.sleep(0.4)
-                    new_height = driver.execute_script("return arguments[0].scrollHeight", scrollable_div)
-                    if new_height == last_height:
-                        break
-                    last_height = new_height
-                driver.execute_script("arguments[0].scrollLeft = arguments[0].scrollWidth", scrollable_div)
-                time.sleep(0.4)
-                log("📜 All rows loaded and columns revealed.")
-            except Exception as e:
-                log(f"⚠️ Could not complete scrolling: {e}")
-
+                if load_all:
+                    drv.set_script_timeout(120)
+                    drv.execute_async_script(_GRID_LOAD_ALL_JS, 1500)
+                    log("📜 All rows loaded and columns revealed.")
         except Exception as e:
-            log(f"⚠️ Login or initial load failed: {e}")
+            log(f"⚠️ Could not complete scrolling: {e}")
+
+    except Exception as e:
+        log(f"⚠️ Login or initial load failed: {e}")
 
-        # Detect headers
-        header_cells = driver.find_elements(By.CSS_SELECTOR, ".react-grid-HeaderCell")
-        col_index_map = {}
-        for i, header in enumerate(header_cells):
-            col_name = header.text.strip().lower()
-            if col_name:
-                col_index_map[col_name] = i
-        log(f"📊 Detected columns: {col_index_map}")
+def _log_tc11(has_errors, errs):
+    if has_errors:
+        log("❌ TC11 console errors detected:")
+        for e in errs[:10]:
+            log("    " + e[:500])
+    else:
+        log("✅ TC11: No console errors detected in Preview.")
+    return "FAIL" if has_errors else "PASSED"
 
-        # Fetch rows and compute expected count based on mode
-        rows = driver.find_elements(By.CSS_SELECTOR, "div.react-grid-Row")
+def _run_preview_checks(rec, col_index_map):
+    """
+    TC10/TC11 for one creative: select its row, open the preview, read console errors,
+    click through, then close the tabs and unselect the row. Returns (tc10, tc11);
+    console errors and timing are left in _thread_state.preview_details.
+    """
+    try:
+        with _span("preview", id=rec.get("id")):
+            return _run_preview_steps(rec, col_index_map)
+    finally:
+        _thread_state.spans = None
+
+def _run_preview_steps(rec, col_index_map):
+    drv = _current_driver()
+    started = time.perf_counter()
+    details = _thread_state.preview_details = {"console_errors": [], "preview_s": None, "spans": {}}
+    _thread_state.spans = details["spans"]
+    # Default TC10/11 values
+    tc10_status = "-"
+    tc11_status = "-"
+
+    # Select row, open preview (zoom is per tab, so the grid stays zoomed-out)
+    with _span("preview.select_row"):
+        row = _row_element_for(rec, col_index_map)
+        clicked_row = bool(row) and _click_checkbox_in_row(row)
+    if not clicked_row:
+        return tc10_status, tc11_status
+
+    root_handle = drv.current_window_handle
+    preview_handle = None
+    click_handle = None
+    # DevTools capture must be listening before the preview tab exists
+    capture = _console_capture_for(drv)
+    try:
+        with _span("preview.open"):
+            preview_handle = _open_preview_for_selected(capture)
+
+        # Preview tab zoom
+        with _span("preview.zoom"):
+            zoom_to(80)  # make the ad comfortably clickable/visible
+        # Pin the tab and ad frame before clicking: a click-through may navigate this tab away
+        ad = (_current_page_target(drv), _ad_frame_id(drv)) if capture is not None else None
+
+        # TC11 (legacy get_log path): console errors must be read before clicking
+        if capture is None:
+            with _span("TC11.console"):
+                has_errors, details["console_errors"] = _check_preview_console_errors()
+            tc11_status = _log_tc11(has_errors, details["console_errors"])
+
+        # TC10: static pre-pass on the ad's HTML/JS; only ambiguous creatives are clicked through
+        static = None
+        if STATIC_CLICKTAG:
+            with _span("TC10.static"):
+                static = _static_clicktag_verdict()
+        # Fast-forward the animation so the click-through and console read see the end state
+        if VIRTUAL_TIME_MS:
+            with _span("preview.fast_forward", budget_ms=VIRTUAL_TIME_MS):
+                details["virtual_time_ms"] = VIRTUAL_TIME_MS if _fast_forward_preview(capture) else 0
+        if static and static["verdict"] in ("pass", "fail"):
+            detected = static["verdict"] == "pass"
+            details["clicktag_static"] = static["reason"]
+        else:
+            if details.get("virtual_time_ms"):
+                _resume_preview_time(capture)
+            with _span("TC10.clicktag"):
+                detected, click_handle = _click_creative_in_preview(capture)
+        details["clicktag"] = bool(detected)
+        tc10_status = "PASSED" if detected else "FAIL"
+        log(f"TC10 ClickTag: {tc10_status}")
+
+        # TC11 (DevTools capture): read last, so errors thrown late or on click are included
+        if capture is not None:
+            with _span("TC11.console"):
+                if drv.current_window_handle != preview_handle:
+                    drv.switch_to.window(preview_handle)
+                has_errors, details["console_errors"] = _check_preview_console_errors(capture, ad)
+            tc11_status = _log_tc11(has_errors, details["console_errors"])
 
-        def status_of(row):
+    except Exception as e:
+        log(f"⚠️ TC10/11 preview flow error: {e}")
+    finally:
+        # close tabs & restore
+        with _span("preview.cleanup"):
+            try:
+                if click_handle and click_handle in drv.window_handles:
+                    drv.switch_to.window(click_handle); drv.close()
+            except Exception:
+                pass
             try:
-                cells = row.find_elements(By.CSS_SELECTOR, ".react-grid-Cell")
-                return cells[col_index_map.get("status", 0)].text.strip()
+                if preview_handle and preview_handle in drv.window_handles:
+                    drv.switch_to.window(preview_handle); drv.close()
             except Exception:
-                return ""
+                pass
+            try:
+                if root_handle in drv.window_handles:
+                    drv.switch_to.window(root_handle)
+            except Exception:
+                pass
+            if capture is not None:
+                capture.clear()  # the preview was read; grid-tab events would only pile up
+            try:
+                _click_checkbox_in_row(_row_element_for(rec, col_index_map) or row)
+                log("☑️ Row unchecked.")
+            except Exception as ue:
+                log(f"⚠️ Could not uncheck row: {ue}")
+        details["preview_s"] = round(time.perf_counter() - started, 3)
+    return tc10_status, tc11_status
+
+# ---------- Preview worker pool (TC10/TC11) ----------
+class _PreviewWorker(threading.Thread):
+    """
+    Independent browser + login that consumes preview jobs (seq, rec, col_index_map)
+    and posts (seq, tc10, tc11, details). A worker whose browser dies puts its job back and exits.
+    """
+    def __init__(self, n, jobs, results, username, password, url):
+        super().__init__(name=f"preview-worker-{n}", daemon=True)
+        self.n = n
+        self.jobs = jobs
+        self.results = results
+        self.username = username
+        self.password = password
+        self.url = url
+
+    def run(self):
+        _thread_state.tag = f"[w{self.n}] "
+        _thread_state.worker = self.n
+        drv, broken = None, False
+        try:
+            drv = _browser_pool.acquire()
+            _thread_state.driver = drv
+            _login_and_load_grid(self.username, self.password, self.url)
+            log("🧵 Preview worker ready.")
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                seq, rec, col_index_map = job
+                _thread_state.preview_details = None
+                try:
+                    tc10, tc11 = _run_preview_checks(rec, col_index_map)
+                    if (tc10, tc11) == ("-", "-"):
+                        _ = drv.window_handles  # browser still alive?
+                except WebDriverException as e:
+                    log(f"❌ Preview worker browser failed: {e}")
+                    self.jobs.put(job)
+                    broken = True
+                    break
+                except Exception as e:
+                    log(f"⚠️ Preview failed for {rec.get('id')}: {e}")
+                    tc10, tc11 = "-", "-"
+                self.results.put((seq, tc10, tc11, _thread_state.preview_details))
+        except Exception as e:
+            log(f"⚠️ Preview worker could not start: {e}")
+            broken = True
+        finally:
+            _thread_state.driver = None
+            if broken:
+                _browser_pool.discard(drv)
+            else:
+                _browser_pool.release(drv)
+
+def _start_preview_workers(n, jobs, results, username, password, url):
+    workers = [_PreviewWorker(i + 1, jobs, results, username, password, url) for i in range(n)]
+    for w in workers:
+        w.start()
+    log(f"🧵 Started {n} preview workers.")
+    return workers
+
+def _stop_preview_workers(workers, jobs):
+    for _ in workers:
+        jobs.put(None)
+    for w in workers:
+        w.join(timeout=30)
+    workers.clear()
+
+def _merge_preview_results(pending, results, jobs, workers, collect, flush, run_here):
+    """
+    Feeds worker results (seq, tc10, tc11, details) to collect() until nothing is pending.
+    If every worker has died, the remaining jobs run here via run_here(rec) -> (tc10, tc11, details).
+    """
+    while pending:
+        try:
+            collect(*results.get(timeout=1.0))
+        except queue.Empty:
+            if any(w.is_alive() for w in workers):
+                continue
+            log("⚠️ No preview workers left; finishing previews in the grid browser.")
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None or job[0] not in pending:
+                    continue
+                seq, rec, _ = job
+                collect(seq, *run_here(rec))
+                flush()
+            # Results posted between the timeout and the drain
+            while True:
+                try:
+                    collect(*results.get_nowait())
+                except queue.Empty:
+                    break
+            for seq in list(pending):
+                collect(seq, "-", "-")
+        flush()
+
+def _result_record(url, result, rec=None, cases=None, note=None, details=None, run_id=None):
+    """Plain dict for RESULT_SINK and the results store (one per creative, or one per failed run)."""
+    rec = rec or {}
+    details = details or {}
+    return {
+        "run_id": run_id,
+        "url": url,
+        "id": rec.get("id"),
+        "name": rec.get("name"),
+        "status": rec.get("status"),
+        "href": rec.get("href") or None,
+        "result": result,  # checked | skipped | error | removed (delta runs)
+        "cases": dict(cases) if cases else {},
+        "note": note,
+        "console_errors": list(details.get("console_errors") or [])[:20],
+        "timings": {k: v for k, v in details.items() if k.endswith("_s") and v is not None},
+        "spans": dict(details.get("spans") or {}),
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def _emit_result(record):
+    if RESULT_SINK is None:
+        return
+    try:
+        RESULT_SINK(record)
+    except Exception as e:
+        log(f"⚠️ Result sink failed: {e}")
 
+def selenium_login(username, password, url, skip_restart=False):
+    """Navigate, login, scan grid, run checks."""
+    global SUMMARY_PREFIX, driver
+    workers, jobs, results = [], queue.Queue(), queue.Queue()
+    trace = qa_common._run_trace = RunTrace() if TRACE_RUNS else None
+    replay = _REPLAY
+    live_previews = replay is None and not GRID_ONLY
+    cache, host = _open_verdict_cache(), (urlparse(url).hostname or "").lower()
+    store = _open_results_store()
+    mode = "replay" if replay else ("delta" if DELTA_MODE else ("all" if PROCESS_ALL else "qa"))
+    run_id = store.begin_run(url, mode) if store else None
+    recorder = RunRecorder(url, "all" if PROCESS_ALL else "qa") if RECORD_PATH and replay is None else None
+    run_stats = {}
+    summary = RunningSummary()
+
+    def publish(result, rec=None, cases=None, note=None, details=None):
+        record = _result_record(url, result, rec, cases, note, details, run_id)
+        summary.add(record)
+        _table_add(record)
+        _emit_result(record)
+        if store:
+            try:
+                store.add(record)
+            except Exception as e:
+                log(f"⚠️ Could not store result: {e}")
+
+    try:
+        if not skip_restart:
+            with _span("browser.start"):
+                start_driver()
+
+        # Preview workers log in while the grid browser loads and scans
+        # (delta runs start them once the number of changed rows is known)
+        if PREVIEW_WORKERS > 1 and not DELTA_MODE and live_previews:
+            workers = _start_preview_workers(PREVIEW_WORKERS, jobs, results, username, password, url)
+
+        qa_only = not PROCESS_ALL
+        processed_count = 0
+        expected_total = 0
+
+        if replay is not None:
+            # Recorded header map and grid snapshot instead of the live grid
+            col_index_map, snapshot = dict(replay[0].get("col_index_map") or {}), replay[1]
+            log(f"📊 Recorded columns: {col_index_map}")
+        else:
+            _login_and_load_grid(username, password, url, load_all=False)
+
+            # Detect headers (single round-trip)
+            with _span("grid.headers"):
+                header_texts = driver.execute_script(
+                    "return Array.prototype.map.call(document.querySelectorAll('.react-grid-HeaderCell'),"
+                    " function(h){ return (h.innerText || h.textContent || ''); });"
+                ) or []
+            col_index_map = {}
+            for i, header_text in enumerate(header_texts):
+                col_name = (header_text or "").strip().lower()
+                if col_name:
+                    col_index_map[col_name] = i
+            log(f"📊 Detected columns: {col_index_map}")
+
+            # Snapshot the whole grid and compute expected count based on mode
+            t0 = time.perf_counter()
+            with _span("grid.harvest"):
+                snapshot = _harvest_grid(col_index_map)
+            run_stats["harvest_s"] = round(time.perf_counter() - t0, 3)
+            if recorder:
+                recorder.grid(col_index_map, snapshot)
+        run_stats["total"] = len(snapshot)
+        with _span("evaluate", rows=len(snapshot)):
+            verdicts = evaluate_batch(snapshot)
+
+        # Delta run: only rows added or changed since the stored snapshot
+        delta, since, in_scope = None, None, None
+        if DELTA_MODE:
+            stored = _load_grid_snapshot(url)
+            if stored is None:
+                log("ℹ️ No previous snapshot for this library; running on every row.")
+            else:
+                delta = diff_snapshots(stored[0], snapshot)
+                since = stored[1]
+                in_scope = delta["added"] | set(delta["changed"])
+                log(f"🔀 Delta: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+                    f"{len(delta['removed'])} removed.")
+            if PREVIEW_WORKERS > 1 and live_previews:
+                n = PREVIEW_WORKERS if in_scope is None else min(PREVIEW_WORKERS, len(in_scope))
+                if n > 1:
+                    workers = _start_preview_workers(n, jobs, results, username, password, url)
+
+        statuses = snapshot.statuses
+        if in_scope is not None:
+            statuses = [st for rid, st in zip(snapshot.ids, statuses) if rid in in_scope]
         if qa_only:
-            expected_total = sum(1 for r in rows if "qa" in status_of(r).lower())
+            expected_total = sum(1 for st in statuses if "qa" in st.lower())
             SUMMARY_PREFIX = "For QA creatives processed: "
         else:
-            expected_total = len(rows)
+            expected_total = len(statuses)
             SUMMARY_PREFIX = "Creatives processed: "
         _set_summary(processed_count, expected_total)
 
@@ -956,263 +2749,158 @@ def selenium_login(username, password, url, skip_restart=False):
         log(f"{'Creative Name':50} {'ID':10} {'Status':12} {'TC1':8} {'TC2':20} {'TC3':15} {'TC4':20} {'TC5':20} {'TC6':15} {'TC7':30} {'TC8':30} {'TC9':20} {'TC10':10} {'TC11':10}")
         log("-" * 290)
 
-        # Iterate through all rows; auto-scroll the virtualized grid as needed
-        idx = 0
-        while True:
-            rows = driver.find_elements(By.CSS_SELECTOR, "div.react-grid-Row")
-            if idx >= len(rows):
-                # Try to nudge the virtualized list to load more rows
-                try:
-                    sc = driver.find_element(By.CSS_SELECTOR, "div.ReactVirtualized__Grid")
-                    driver.execute_script(
-                        "arguments[0].scrollTop = Math.min(arguments[0].scrollTop + (arguments[0].clientHeight*0.9), arguments[0].scrollHeight);",
-                        sc
-                    )
-                    time.sleep(0.35)
-                    rows = driver.find_elements(By.CSS_SELECTOR, "div.react-grid-Row")
-                    if idx >= len(rows):
-                        break
-                except Exception:
-                    break
-
-            row = rows[idx]
-            idx += 1
-
+        # Rows are reported strictly in grid order; previews may finish out of order
+        pending = {}    # idx -> (rec, cases, note) waiting for TC10/TC11 from a worker
+        finished = {}   # idx -> entry ready to report
+        reused = set()  # idx whose TC10/TC11 came from the verdict cache
+        outcomes = []   # (id, rec, cases|None) for the delta change report
+        errored = set()  # ids left out of the stored snapshot (row errors, failed previews) so the next delta retries them
+        next_idx = 1
+
+        def flush():
+            nonlocal next_idx, processed_count
+            while next_idx in finished:
+                entry = finished.pop(next_idx)
+                if entry[0] == "unchanged":
+                    pass
+                elif entry[0] == "skip":
+                    rec = entry[1]
+                    gui_log_skip(rec["id"], rec["name"], rec["status"], rec["href"] or None)
+                    publish("skipped", rec)
+                    if delta is not None:
+                        outcomes.append((rec["id"], rec, None))
+                elif entry[0] == "error":
+                    log(f"{'[Missing]':100} {'[Missing]':15} {'[Error]':20} {'FAIL':15} {'Could not extract':25} {'FAIL':20} {'FAIL':20} {'FAIL':25} {'FAIL':30} {'FAIL':30} {'FAIL':30} {'FAIL':30} {'-':10} {'-':10}")
+                    log(f"⚠️ Row {next_idx} failed: {entry[1]}")
+                    publish("error", entry[2], note=str(entry[1]))
+                    if entry[2]:
+                        errored.add(entry[2]["id"])
+                else:
+                    _, rec, cases, note, details = entry
+                    # processed count (either all rows, or only QA rows)
+                    processed_count += 1
+                    run_stats["processed"] = processed_count
+                    _set_summary(processed_count, expected_total)
+
+                    # Console row
+                    log(f"{rec['name']:50} {rec['id']:10} {rec['status']:12} {cases['TC1']:8} {cases['TC2']:20} {cases['TC3']:15} {cases['TC4']:20} {cases['TC5']:20} {cases['TC6']:15} {cases['TC7']:30} {cases['TC8']:30} {cases['TC9']:20} {cases['TC10']:10} {cases['TC11']:10}")
+
+                    # GUI full row
+                    gui_log_result(rec["id"], rec["name"], cases, rec["href"] or "", note=note)
+                    publish("checked", rec, cases, note, details)
+                    if recorder:
+                        recorder.preview(next_idx, cases, details)
+                    if cache and next_idx not in reused and not GRID_ONLY:
+                        cache.put(host, rec, cases, note)
+                    if delta is not None:
+                        outcomes.append((rec["id"], rec, cases))
+                next_idx += 1
+
+        def collect(seq, tc10, tc11, details=None):
+            rec, cases, note = pending.pop(seq)
+            cases["TC10"] = tc10
+            cases["TC11"] = tc11
+            if "-" in (tc10, tc11):
+                errored.add(rec["id"])
+            finished[seq] = ("result", rec, cases, note, details)
+
+        # Iterate through the in-memory snapshot; the live grid is only touched for previews
+        for idx in range(1, len(snapshot) + 1):
+            rec = None
             try:
-                cells = row.find_elements(By.CSS_SELECTOR, ".react-grid-Cell")
-
-                # Name + URL
-                creative_url = ""
-                try:
-                    name_el = row.find_element(By.CSS_SELECTOR, "span.name-overflow a")
-                    creative_name = name_el.text.strip()
-                    creative_url = (name_el.get_attribute("href") or "").strip()
-                except Exception:
-                    creative_name = "[Missing]"
-
-                # ID
-                creative_id = cells[col_index_map.get("id", 0)].text.strip() if "id" in col_index_map else "[Missing]"
-
-                # Status
-                status_text = cells[col_index_map.get("status", 0)].text.strip() if "status" in col_index_map else "[Missing]"
-                is_for_qa = "for qa" in status_text.lower() or status_text.strip().lower() == "qa"
+                if in_scope is not None and snapshot.ids[idx - 1] not in in_scope:
+                    finished[idx] = ("unchanged",)
+                    continue
+                rec = snapshot.record(idx - 1)
+                cases, info = _grid_cases_at(verdicts, idx - 1)
+                ext, ctype = info["ext"], info["ctype"]
+                creative_lower = rec["name"].lower()
 
                 # If QA-only mode and not FOR QA → skip with compact note
-                if qa_only and not is_for_qa:
-                    gui_log_skip(creative_id, creative_name, status_text, creative_url or None)
+                if qa_only and not info["is_for_qa"]:
+                    finished[idx] = ("skip", rec)
                     continue
 
-                # Placement Size
-                if "placement size" in col_index_map:
-                    ps_col_idx = col_index_map["placement size"]
-                    placement_size = cells[ps_col_idx].text.strip().replace(" ", "") if ps_col_idx < len(cells) else "0x0"
-                else:
-                    placement_size = "0x0"
-
-                # Type
-                if "type" in col_index_map:
-                    type_col_idx = col_index_map["type"]
-                    creative_type = cells[type_col_idx].text.strip() if type_col_idx < len(cells) else "[Missing]"
-                else:
-                    creative_type = "[Missing]"
-
-                # --- TEST CASES ---
-                test_case_1 = "PASSED" if is_for_qa else "FAIL"
-
-                placement_required_types = ["alt image", "html_onpage", "html_expand", "html_standard"]
-                if placement_size != "0x0" and creative_type.lower() in placement_required_types:
-                    test_case_2 = "PASSED" if placement_size in creative_name.replace(" ", "") else "FAIL"
-                else:
-                    test_case_2 = "PASSED"
-
-                # TYPE ↔ EXTENSION mapping (supports dynamic_preroll zipped creatives)
-                creative_lower = creative_name.lower()
-                ctype = creative_type.lower().replace(" ", "").replace("-", "_")
-
-                ext_ok_map = {
-                    "altimage": {".png", ".jpg", ".jpeg", ".gif"},
-                    "htmlonpage": {".zip"},
-                    "html_standard": {".zip"},
-                    "htmlstandard": {".zip"},
-                    "html_onpage": {".zip"},
-                    "preroll": {".mp4"},
-                    "dynamic_preroll": {".zip"},   # zipped dynamic video
-                    "vastaudio": {".mp3"},
-                }
-                # pick extension
-                ext = ""
-                for e in (".mp4", ".mp3", ".zip", ".png", ".jpg", ".jpeg", ".gif"):
-                    if creative_lower.endswith(e):
-                        ext = e
-                        break
-                if ctype in ext_ok_map:
-                    test_case_4 = "PASSED" if ext in ext_ok_map[ctype] else "FAIL"
-                else:
-                    test_case_4 = "N/A"
-
-                # --- TEST CASE #3 (suffix) ---
-                valid_formats = [".jpg", ".jpeg", ".png", ".gif", ".mp3", ".mp4", ".zip"]
-                test_case_3 = "PASSED" if any(creative_lower.endswith(fmt) for fmt in valid_formats) else "FAIL"
-
-                # --- TEST CASE #5 ---
-                try:
-                    if "base file size" in col_index_map:
-                        bfs_col_idx = col_index_map["base file size"]
-                        size_text = cells[bfs_col_idx].text.strip().lower()
-                        size_kb = 0.0
-                        if "mb" in size_text:
-                            size_kb = float(size_text.replace("mb", "").strip()) * 1024
-                        elif "kb" in size_text:
-                            size_kb = float(size_text.replace("kb", "").strip())
-                        else:
-                            try:
-                                size_kb = float(size_text)
-                            except Exception:
-                                size_kb = 0.0
-                        if ctype in ["preroll", "dynamic_preroll", "vastaudio"]:
-                            test_case_5 = "PASSED"
-                        else:
-                            test_case_5 = "PASSED" if size_kb <= 600 else "FAIL"
-                    else:
-                        test_case_5 = "N/A"
-                except Exception:
-                    test_case_5 = "FAIL"
-
-                test_case_6 = "PASSED" if placement_size.lower() == "1x1" else "N/A"
-
-                # --- TEST CASE #7 — keyboard search while zoomed-out, then read "File Name" from same row
-                try:
-                    file_name_col = ""
-                    if "file name" in col_index_map and creative_name and creative_name != "[Missing]":
-                        _cmdf_search(creative_name)         # bring row into view at current (zoomed-out) grid
-                        r2 = _row_by_creative_name(creative_name) or row
-                        cells2 = r2.find_elements(By.CSS_SELECTOR, ".react-grid-Cell")
-                        idx_file = col_index_map["file name"]
-                        file_cell = cells2[idx_file] if idx_file < len(cells2) else None
-                        file_name_col = _get_full_text_from_cell(file_cell)
-                    test_case_7 = "PASSED" if creative_name.strip().lower() == (file_name_col.strip().lower()) else "FAIL"
-                except Exception:
-                    test_case_7 = "FAIL"
-
-                if ctype in ["preroll", "dynamic_preroll", "vastaudio"]:
-                    duration_values = ["6", "10", "15", "20", "30", "60", "90", "120"]
-                    aspect_ratios = ["16x9", "4x3", "1x1", "9x16"]
-                    has_duration = any(dur in creative_lower for dur in duration_values)
-                    has_ratio = any(ratio in creative_lower for ratio in aspect_ratios)
-                    test_case_8 = "PASSED" if (has_duration and has_ratio) else "FAIL"
-                else:
-                    test_case_8 = "N/A"
-
-                if creative_lower.endswith(".mp3"):
-                    test_case_9 = "PASSED" if ctype == "vastaudio" else "FAIL"
-                else:
-                    test_case_9 = "N/A"
-
                 # --- Decide preview/click behavior ---
                 # Skip opening preview entirely if: ZIP + (dynamic_preroll/html_onpage/preroll)
                 skip_preview = (ext in {".zip", ".mp4"} and ctype in {"dynamic_preroll", "html_onpage", "htmlonpage", "preroll"})
-                note = None
-
-                if skip_preview:
-                    tc10_status = "SKIPPED"
-                    tc11_status = "SKIPPED"
+                note, details = None, None
+                hit = cache.get(host, rec) if cache and not skip_preview else None
+
+                if hit:
+                    cases["TC10"], cases["TC11"] = hit[0]["TC10"], hit[0]["TC11"]
+                    note = f"TC10/TC11 reused from {time.strftime('%Y-%m-%d %H:%M', time.localtime(hit[1]))} (creative unchanged)."
+                    reused.add(idx)
+                elif GRID_ONLY:
+                    cases["TC10"] = "SKIPPED"
+                    cases["TC11"] = "SKIPPED"
+                    note = "Grid-only run: preview & ClickTag checks not run."
+                elif skip_preview:
+                    cases["TC10"] = "SKIPPED"
+                    cases["TC11"] = "SKIPPED"
                     note = "Preview & ClickTag checks skipped for ZIP + (dynamic_preroll/html_onpage/preroll). Please verify manually."
                     # IMPORTANT: stay zoomed-out for grid; do NOT reset to 100 here
                 elif creative_lower.endswith(".mp3"):
-                    tc10_status = "-"
-                    tc11_status = "N/A"
+                    cases["TC10"] = "-"
+                    cases["TC11"] = "N/A"
                     # stay zoomed-out for grid
+                elif replay is not None:
+                    cases["TC10"], cases["TC11"], details = _replay_preview(replay[0], idx)
+                elif workers:
+                    pending[idx] = (rec, cases, note)
+                    jobs.put((idx, rec, col_index_map))
+                    continue
                 else:
-                    # Default TC10/11 values
-                    tc10_status = "-"
-                    tc11_status = "-"
-
-                    # Select row, open preview, temporarily zoom-in, then restore grid zoom
-                    clicked_row = _click_checkbox_in_row(row)
-                    if clicked_row:
-                        root_handle = driver.current_window_handle
-                        preview_handle = None
-                        click_handle = None
-                        try:
-                            preview_handle = _open_preview_for_selected()
-                            try:
-                                last_checked_url = driver.current_url
-                            except Exception:
-                                last_checked_url = creative_url or ""
-
-                            # TEMP: preview zoom-in
-                            zoom_to(80)  # make the ad comfortably clickable/visible
-
-                            # TC11: Console errors (always check)
-                            has_errors, errs = _check_preview_console_errors()
-                            tc11_status = "FAIL" if has_errors else "PASSED"
-                            if has_errors:
-                                log("❌ TC11 console errors detected:")
-                                for e in errs[:10]:
-                                    log("    " + e[:500])
-                            else:
-                                log("✅ TC11: No console errors detected in Preview.")
-
-                            # TC10: ClickTag
-                            detected, click_handle = _click_creative_in_preview()
-                            tc10_status = "PASSED" if detected else "FAIL"
-                            log(f"TC10 ClickTag: {tc10_status}")
-
-                        except Exception as e:
-                            log(f"⚠️ TC10/11 preview flow error: {e}")
-                        finally:
-                            # close tabs & restore
-                            try:
-                                if click_handle and click_handle in driver.window_handles:
-                                    driver.switch_to.window(click_handle); driver.close()
-                            except Exception:
-                                pass
-                            try:
-                                if preview_handle and preview_handle in driver.window_handles:
-                                    driver.switch_to.window(preview_handle); driver.close()
-                            except Exception:
-                                pass
-                            try:
-                                if root_handle in driver.window_handles:
-                                    driver.switch_to.window(root_handle)
-                            except Exception:
-                                pass
-                            try:
-                                _click_checkbox_in_row(row)
-                                log("☑️ Row unchecked.")
-                            except Exception as ue:
-                                log(f"⚠️ Could not uncheck row: {ue}")
-                            # Return to grid zoom (stay zoomed-out for rest of checks)
-                            real_chrome_zoom_out()
-
-                # processed count (either all rows, or only QA rows)
-                processed_count += 1
-                _set_summary(processed_count, expected_total)
-
-                # Console row
-                last_checked_url = creative_url or ""
-                log(f"{creative_name:50} {creative_id:10} {status_text:12} {test_case_1:8} {test_case_2:20} {test_case_3:15} {test_case_4:20} {test_case_5:20} {test_case_6:15} {test_case_7:30} {test_case_8:30} {test_case_9:20} {tc10_status:10} {tc11_status:10}")
-
-                # GUI full row
-                cases = {
-                    "TC1":  test_case_1, "TC2":  test_case_2, "TC3":  test_case_3,
-                    "TC4":  test_case_4, "TC5":  test_case_5, "TC6":  test_case_6,
-                    "TC7":  test_case_7, "TC8":  test_case_8, "TC9":  test_case_9,
-                    "TC10": tc10_status, "TC11": tc11_status,
-                }
-                gui_log_result(creative_id, creative_name, cases, last_checked_url, note=note)
+                    cases["TC10"], cases["TC11"] = _run_preview_checks(rec, col_index_map)
+                    details = getattr(_thread_state, "preview_details", None)
+                    if "-" in (cases["TC10"], cases["TC11"]):
+                        errored.add(rec["id"])
 
+                finished[idx] = ("result", rec, cases, note, details)
+            except Exception as e:
+                finished[idx] = ("error", e, rec)
+            finally:
+                flush()
+
+        # Merge worker results back in row order; take over if every worker has died
+        _merge_preview_results(
+            pending, results, jobs, workers, collect, flush,
+            lambda rec: (*_run_preview_checks(rec, col_index_map), getattr(_thread_state, "preview_details", None)))
+
+        if cache and cache.hits:
+            log(f"🗃️ Verdict cache: {cache.hits} unchanged creative(s) not re-previewed.")
+        if delta is not None:
+            _write_change_report(url, delta, since, outcomes)
+            for rec in delta["removed"]:
+                publish("removed", rec)
+            _gui_write(f"🔀 Delta: {len(delta['added'])} added • {len(delta['changed'])} changed • "
+                       f"{len(delta['removed'])} removed since last run.\n\n", "dim")
+        if replay is None:
+            _save_grid_snapshot(url, snapshot, errored)
+        if recorder:
+            try:
+                log(f"📼 Run recorded to {recorder.save(RECORD_PATH)}")
             except Exception as e:
-                log(f"{'[Missing]':100} {'[Missing]':15} {'[Error]':20} {'FAIL':15} {'Could not extract':25} {'FAIL':20} {'FAIL':20} {'FAIL':25} {'FAIL':30} {'FAIL':30} {'FAIL':30} {'FAIL':30} {'-':10} {'-':10}")
-                log(f"⚠️ Row {idx} failed: {e}")
+                log(f"⚠️ Could not write run recording: {e}")
+
+        # Run summary from the running aggregates
+        summary_lines = summary.lines()
+        for line in summary_lines:
+            log(line)
+        _gui_write("Run summary\n", "header")
+        _gui_write("\n".join(summary_lines) + "\n\n", "dim")
 
         # Done → return zoom to 100 once, then close browser
-        reset_zoom()
-        log(f"🎉 Finished. {SUMMARY_PREFIX}{processed_count}/{expected_total}. Closing browser…")
-        close_browser()
+        if replay is not None:
+            log(f"🎉 Finished. {SUMMARY_PREFIX}{processed_count}/{expected_total}.")
+        else:
+            reset_zoom()
+            log(f"🎉 Finished. {SUMMARY_PREFIX}{processed_count}/{expected_total}. Closing browser…")
+            close_browser()
 
     except WebDriverException as e:
         log(f"❌ Selenium issue: {e}. Restarting browser…")
+        _stop_preview_workers(workers, jobs)
         restart_driver(username, password, url)
     except Exception:
         log("❌ Error during login or scanning:")
@@ -1220,13 +2908,33 @@ def selenium_login(username, password, url, skip_restart=False):
             log(traceback.format_exc())
         except Exception:
             pass
+        publish("error", note=traceback.format_exc(limit=1).strip())
         try:
             if driver:
                 reset_zoom()
-                driver.quit()
+                _browser_pool.discard(driver)
+                driver = None
         except Exception:
             pass
     finally:
+        _stop_preview_workers(workers, jobs)
+        if cache:
+            try:
+                cache.close()
+            except Exception as e:
+                log(f"ℹ️ Could not save verdict cache: {e}")
+        if store:
+            try:
+                store.end_run(**run_stats)
+                store.close()
+            except Exception as e:
+                log(f"ℹ️ Could not finish results store: {e}")
+        try:
+            _timings().save()
+        except Exception as e:
+            log(f"ℹ️ Could not save wait timings: {e}")
+        qa_common._run_trace = None
+        _finish_trace(trace, url, run_id)
         try:
             root.after(0, focus_app_window)
         except Exception:
@@ -1234,6 +2942,8 @@ def selenium_login(username, password, url, skip_restart=False):
 
 # --- summary label updater (thread-safe) ---
 def _set_summary(processed: int, expected: int):
+    if root is None:
+        return
     try:
         root.after(0, lambda: summary_var.set(f"{SUMMARY_PREFIX}{processed} / {expected}"))
     except Exception:
@@ -1241,11 +2951,17 @@ def _set_summary(processed: int, expected: int):
 
 # ---------- GUI ----------
 def submit():
-    global PROCESS_ALL, SUMMARY_PREFIX
+    global PROCESS_ALL, SUMMARY_PREFIX, PREVIEW_WORKERS, USE_VERDICT_CACHE, DELTA_MODE
     username = entry_username.get().strip()
     password = entry_password.get().strip()
     url = entry_url.get().strip()
     PROCESS_ALL = bool(check_all_var.get())
+    USE_VERDICT_CACHE = bool(use_cache_var.get())
+    DELTA_MODE = bool(delta_var.get())
+    try:
+        PREVIEW_WORKERS = max(1, int(workers_var.get()))
+    except Exception:
+        PREVIEW_WORKERS = 1
     SUMMARY_PREFIX = "Creatives processed: " if PROCESS_ALL else "For QA creatives processed: "
 
     if not username or not password or not url:
@@ -1264,73 +2980,310 @@ def submit():
     t.start()
 
 # --- GUI Setup ---
-root = tk.Tk()
-root.title("Basefile QA - East Coast")
-root.geometry("1200x720")
-root.resizable(False, True)
-
-# Detect best fonts available on this machine
-detect_fonts()
-
-# Title bar
-title_frame = tk.Frame(root)
-title_frame.pack(fill="x", pady=(10, 0))
-title_label = tk.Label(title_frame, text="Basefile QA — East Coast", font=TITLE_FONT)
-title_label.pack()
-
-# ---- Centered form (does not expand full width) ----
-form_wrapper = tk.Frame(root)
-form_wrapper.pack(pady=10)
-
-content = tk.LabelFrame(form_wrapper, text="Sign In & Target", font=(UI_FONT[0], 10, "bold"), padx=12, pady=10)
-content.pack()
-
-tk.Label(content, text="Username:", font=UI_FONT).grid(row=0, column=0, sticky="e", padx=8, pady=6)
-entry_username = tk.Entry(content, width=40, font=UI_FONT)
-entry_username.grid(row=0, column=1, padx=8, pady=6)
-
-tk.Label(content, text="Password:", font=UI_FONT).grid(row=1, column=0, sticky="e", padx=8, pady=6)
-entry_password = tk.Entry(content, show="*", width=40, font=UI_FONT)
-entry_password.grid(row=1, column=1, padx=8, pady=6)
-
-tk.Label(content, text="URL:", font=UI_FONT).grid(row=2, column=0, sticky="e", padx=8, pady=6)
-entry_url = tk.Entry(content, width=60, font=UI_FONT)
-entry_url.grid(row=2, column=1, padx=8, pady=6)
-
-# Checkbox: Check all (uncheck = QA only)
-check_all_var = tk.BooleanVar(value=False)
-check_all_cb = tk.Checkbutton(content, text="Check all? (uncheck = QA only)", variable=check_all_var, onvalue=True, offvalue=False, font=UI_FONT)
-check_all_cb.grid(row=3, column=0, columnspan=2, pady=(6, 2))
-
-# Checkbox: Clear display each run
-clear_display_var = tk.BooleanVar(value=True)
-clear_cb = tk.Checkbutton(content, text="Clear display (on each run)", variable=clear_display_var, onvalue=True, offvalue=False, font=UI_FONT)
-clear_cb.grid(row=4, column=0, columnspan=2, pady=(0, 6))
-
-# Prefill from env/credentials
-_loaded_user, _loaded_pass = read_credentials()
-entry_username.insert(0, os.getenv("FT_USERNAME", _loaded_user))
-entry_password.insert(0, os.getenv("FT_PASSWORD", _loaded_pass))
-entry_url.insert(0, os.getenv("FT_URL", ""))
-
-# centered Run button
-run_btn = tk.Button(content, text="Run", command=submit, font=(UI_FONT[0], 10, "bold"))
-run_btn.grid(row=5, column=0, columnspan=2, pady=10)
-
-# Pretty Log display (bottom)
-log_group = tk.LabelFrame(root, text="Execution Report", font=(UI_FONT[0], 10, "bold"))
-log_group.pack(fill="both", expand=True, padx=12, pady=(0, 12))
-
-# Summary label at the top of results
-summary_var = tk.StringVar(value="For QA creatives processed: 0 / 0")
-summary_frame = tk.Frame(log_group)
-summary_frame.pack(fill="x", padx=10, pady=(8, 0))
-summary_label = tk.Label(summary_frame, textvariable=summary_var, anchor="w", font=(UI_FONT[0], 10, "bold"))
-summary_label.pack(side="left")
-
-log_text = scrolledtext.ScrolledText(log_group, state="disabled", wrap="word", font=MONO_FONT)
-log_text.pack(fill="both", expand=True, padx=10, pady=10)
-gui_init_tags()
-_gui_write("✨ Results will be summarized here as each creative is processed.\n\n", "dim")
-
-root.mainloop()
\ No newline at end of file
+def build_gui():
+    """Build the Tk window (needs a display). Call root.mainloop() afterwards."""
+    global root, log_text, summary_var, check_all_var, clear_display_var, workers_var
+    global use_cache_var, delta_var, results_table
+    global entry_username, entry_password, entry_url
+    root = tk.Tk()
+    root.title("Basefile QA - East Coast")
+    root.geometry("1200x720")
+    root.resizable(False, True)
+
+    # Detect best fonts available on this machine
+    detect_fonts()
+
+    # Title bar
+    title_frame = tk.Frame(root)
+    title_frame.pack(fill="x", pady=(10, 0))
+    title_label = tk.Label(title_frame, text="Basefile QA — East Coast", font=TITLE_FONT)
+    title_label.pack()
+
+    # ---- Centered form (does not expand full width) ----
+    form_wrapper = tk.Frame(root)
+    form_wrapper.pack(pady=10)
+
+    content = tk.LabelFrame(form_wrapper, text="Sign In & Target", font=(UI_FONT[0], 10, "bold"), padx=12, pady=10)
+    content.pack()
+
+    tk.Label(content, text="Username:", font=UI_FONT).grid(row=0, column=0, sticky="e", padx=8, pady=6)
+    entry_username = tk.Entry(content, width=40, font=UI_FONT)
+    entry_username.grid(row=0, column=1, padx=8, pady=6)
+
+    tk.Label(content, text="Password:", font=UI_FONT).grid(row=1, column=0, sticky="e", padx=8, pady=6)
+    entry_password = tk.Entry(content, show="*", width=40, font=UI_FONT)
+    entry_password.grid(row=1, column=1, padx=8, pady=6)
+
+    tk.Label(content, text="URL:", font=UI_FONT).grid(row=2, column=0, sticky="e", padx=8, pady=6)
+    entry_url = tk.Entry(content, width=60, font=UI_FONT)
+    entry_url.grid(row=2, column=1, padx=8, pady=6)
+
+    # Checkbox: Check all (uncheck = QA only)
+    check_all_var = tk.BooleanVar(value=False)
+    check_all_cb = tk.Checkbutton(content, text="Check all? (uncheck = QA only)", variable=check_all_var, onvalue=True, offvalue=False, font=UI_FONT)
+    check_all_cb.grid(row=3, column=0, columnspan=2, pady=(6, 2))
+
+    # Checkbox: Clear display each run
+    clear_display_var = tk.BooleanVar(value=True)
+    clear_cb = tk.Checkbutton(content, text="Clear display (on each run)", variable=clear_display_var, onvalue=True, offvalue=False, font=UI_FONT)
+    clear_cb.grid(row=4, column=0, columnspan=2, pady=(0, 6))
+
+    # Checkbox: reuse TC10/TC11 of creatives unchanged since they last passed
+    use_cache_var = tk.BooleanVar(value=USE_VERDICT_CACHE)
+    cache_cb = tk.Checkbutton(content, text="Skip previews of unchanged creatives (verdict cache)", variable=use_cache_var, onvalue=True, offvalue=False, font=UI_FONT)
+    cache_cb.grid(row=5, column=0, columnspan=2, pady=(0, 6))
+
+    # Checkbox: delta run (rows added/changed since the last run only)
+    delta_var = tk.BooleanVar(value=False)
+    delta_cb = tk.Checkbutton(content, text="Only rows changed since last run (delta)", variable=delta_var, onvalue=True, offvalue=False, font=UI_FONT)
+    delta_cb.grid(row=6, column=0, columnspan=2, pady=(0, 6))
+
+    # Preview workers (1 = previews run one by one in the grid browser)
+    workers_frame = tk.Frame(content)
+    workers_frame.grid(row=7, column=0, columnspan=2, pady=(0, 6))
+    tk.Label(workers_frame, text="Preview workers (browsers):", font=UI_FONT).pack(side="left", padx=(0, 6))
+    workers_var = tk.IntVar(value=max(1, PREVIEW_WORKERS))
+    workers_spin = tk.Spinbox(workers_frame, from_=1, to=16, width=4, textvariable=workers_var, font=UI_FONT)
+    workers_spin.pack(side="left")
+
+    # Prefill from env/credentials
+    _loaded_user, _loaded_pass = read_credentials()
+    entry_username.insert(0, os.getenv("FT_USERNAME", _loaded_user))
+    entry_password.insert(0, os.getenv("FT_PASSWORD", _loaded_pass))
+    entry_url.insert(0, os.getenv("FT_URL", ""))
+
+    # centered Run button
+    run_btn = tk.Button(content, text="Run", command=submit, font=(UI_FONT[0], 10, "bold"))
+    run_btn.grid(row=8, column=0, columnspan=2, pady=10)
+
+    # Pretty Log display (bottom)
+    log_group = tk.LabelFrame(root, text="Execution Report", font=(UI_FONT[0], 10, "bold"))
+    log_group.pack(fill="both", expand=True, padx=12, pady=(0, 12))
+
+    # Summary label at the top of results
+    summary_var = tk.StringVar(value="For QA creatives processed: 0 / 0")
+    summary_frame = tk.Frame(log_group)
+    summary_frame.pack(fill="x", padx=10, pady=(8, 0))
+    summary_label = tk.Label(summary_frame, textvariable=summary_var, anchor="w", font=(UI_FONT[0], 10, "bold"))
+    summary_label.pack(side="left")
+
+    # Results table (one row per creative) and the detailed text report, as tabs
+    tabs = ttk.Notebook(log_group)
+    tabs.pack(fill="both", expand=True, padx=10, pady=10)
+    results_table = ResultsTable(tabs)
+    tabs.add(results_table.frame, text="Results")
+    log_text = scrolledtext.ScrolledText(tabs, state="disabled", wrap="word", font=MONO_FONT)
+    tabs.add(log_text, text="Report log")
+    gui_init_tags()
+    root.after(GUI_FLUSH_MS, _gui_drain)
+    _gui_write("✨ Results will be summarized here as each creative is processed.\n\n", "dim")
+
+# ---------- Headless CLI ----------
+def _read_url_list(paths):
+    urls = []
+    for p in paths or []:
+        with Path(p).open("r", encoding="utf-8") as f:
+            for raw in f:
+                line = raw.strip()
+                if line and not line.startswith("#"):
+                    urls.append(line)
+    return urls
+
+def _jsonl_sink(stream):
+    """Result sink that writes one JSON object per creative and flushes immediately."""
+    def _write(record):
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stream.flush()
+    return _write
+
+def _export_results(path, sink):
+    """Grid-only verdicts (TC1–TC9) for a library CSV export; no browser."""
+    batch = CreativeBatch.from_export(path)
+    verdicts = evaluate_batch(batch)
+    for i in range(len(batch)):
+        rec = batch.record(i)
+        cases, info = _grid_cases_at(verdicts, i)
+        if not PROCESS_ALL and not info["is_for_qa"]:
+            sink(_result_record(path, "skipped", rec))
+            continue
+        sink(_result_record(path, "checked", rec, cases))
+    log(f"🎉 Finished {path}: {len(batch)} rows evaluated (TC1–TC9).")
+
+def run_cli(argv=None):
+    """Headless batch runner. Returns a process exit code."""
+    import argparse
+    global PROCESS_ALL, PREVIEW_WORKERS, HEADLESS, RESULT_SINK, USE_VERDICT_CACHE, DELTA_MODE
+    global TRACE_RUNS, GRID_ONLY, RECORD_PATH, STATIC_CLICKTAG, VIRTUAL_TIME_MS
+    global _restart_attempts
+    ap = argparse.ArgumentParser(description="Basefile QA — headless batch runner (TC1–TC11).")
+    ap.add_argument("--url", action="append", default=[], help="Creative library URL (repeatable).")
+    ap.add_argument("--urls-file", action="append", default=[], help="File with one library URL per line.")
+    ap.add_argument("--export", action="append", default=[], help="Library CSV export; grid-only TC1–TC9, no browser.")
+    ap.add_argument("--all", action="store_true", help="Check all creatives (default: FOR QA only).")
+    ap.add_argument("--workers", type=int, default=PREVIEW_WORKERS, help="Preview workers (browsers) for TC10/TC11.")
+    ap.add_argument("--headed", action="store_true", help="Show the browser instead of running headless.")
+    ap.add_argument("--delta", action="store_true", help="Only rows added/changed since the last run; writes a change report.")
+    ap.add_argument("--no-cache", action="store_true", help="Re-check every creative (ignore the verdict cache).")
+    ap.add_argument("--no-trace", action="store_true", help="Do not write a per-step timing trace for each run.")
+    ap.add_argument("--grid-only", action="store_true", help="TC1–TC9 from the grid only; skip previews (TC10/TC11).")
+    ap.add_argument("--record", metavar="FILE",
+                    help="Record the grid and preview outcomes to a fixture ('{host}' / '{n}' are filled in per URL).")
+    ap.add_argument("--replay", action="append", default=[], metavar="FILE",
+                    help="Re-run the checks of a recorded fixture offline (repeatable; no browser).")
+    ap.add_argument("--static", nargs="+", metavar="BUNDLE",
+                    help="Static clickTag check of creative bundles (dirs, .zip, .html); prints JSON Lines, no browser.")
+    ap.add_argument("--no-static", action="store_true", help="Always click through for TC10 (no static pre-pass).")
+    ap.add_argument("--fast-forward", nargs="?", type=int, const=30000, default=None, metavar="MS",
+                    help="Fast-forward each preview's animation by MS of virtual time (default 30000) before TC10/TC11.")
+    ap.add_argument("--assets", nargs="+", metavar="PATH",
+                    help="Missing-asset check of creative bundles or directories of them; prints JSON Lines, no browser.")
+    ap.add_argument("--username", default=None)
+    ap.add_argument("--password", default=None)
+    ap.add_argument("--output", default=None,
+                    help="JSON Lines results file ('-' = stdout). Default: qa_results_<timestamp>.jsonl")
+    q = ap.add_argument_group("query the results store (no browser)")
+    q.add_argument("--query", metavar="TC", help="Test case to filter on, e.g. TC5 ('any' = no TC filter).")
+    q.add_argument("--verdict", default="FAIL", help="Verdict to match for --query (default FAIL).")
+    q.add_argument("--since", help="Only results newer than this (e.g. 7d, 12h, 2024-05-01).")
+    q.add_argument("--host", help="Only this platform host.")
+    q.add_argument("--creative-id", help="Only this creative ID.")
+    q.add_argument("--latest", action="store_true", help="Newest result per creative only.")
+    q.add_argument("--full", action="store_true", help="Print the full stored records.")
+    b = ap.add_argument_group("offline benchmarks (local server, no platform login)")
+    b.add_argument("--bench-grid", nargs="?", const="100,1000,10000", metavar="SIZES",
+                   help="Scan synthetic libraries of these sizes (default 100,1000,10000).")
+    b.add_argument("--seed", type=int, default=7, help="Seed for the synthetic libraries.")
+    b.add_argument("--bench-preview", nargs="?", const="", metavar="DIR",
+                   help="TC10/TC11 pipeline over a creative corpus (default: creative-preview/), with --workers browsers.")
+    b.add_argument("--repeat", type=int, default=3, help="Previews per corpus creative for --bench-preview.")
+    args = ap.parse_args(argv)
+    if args.fast_forward is not None:
+        VIRTUAL_TIME_MS = max(0, args.fast_forward)
+
+    if args.query:
+        tc = None if args.query.lower() == "any" else args.query.upper()
+        rows = query_results(tc, args.verdict, since=args.since, host=args.host,
+                             creative_id=args.creative_id, latest_only=args.latest, limit=None, full=args.full)
+        for r in rows:
+            print(json.dumps(r, ensure_ascii=False))
+        qa_common.LOG_STREAM = sys.stderr
+        log(f"🔎 {len(rows)} result(s).")
+        return 0
+
+    if args.static:
+        verdicts, files, parsed = [], 0, 0
+        for path in args.static:
+            result = analyze_clicktags(path)
+            verdicts.append(result["verdict"])
+            files, parsed = files + result["files"], parsed + result["parsed"]
+            print(json.dumps(result, ensure_ascii=False))
+        qa_common.LOG_STREAM = sys.stderr
+        log(f"🔎 {verdicts.count('pass')} pass • {verdicts.count('fail')} fail • "
+            f"{verdicts.count('ambiguous')} ambiguous ({parsed}/{files} file(s) parsed, rest cached).")
+        return 1 if "fail" in verdicts else 0
+
+    if args.assets:
+        broken, parsed = 0, 0
+        for result in scan_bundles(args.assets):
+            broken += bool(result["missing"])
+            parsed += result["parsed"]
+            print(json.dumps(result, ensure_ascii=False))
+        qa_common.LOG_STREAM = sys.stderr
+        log(f"🔎 {broken} bundle(s) with missing assets ({parsed} source file(s) parsed, rest cached).")
+        return 1 if broken else 0
+
+    if args.bench_grid or args.bench_preview is not None:
+        import qa_bench  # drives this module's flow, so only loaded for benchmark runs
+    if args.bench_grid:
+        HEADLESS = not args.headed
+        try:
+            sizes = [int(x) for x in args.bench_grid.split(",") if x.strip()]
+        except ValueError:
+            ap.error("--bench-grid takes comma-separated sizes, e.g. 100,1000")
+        try:
+            results = qa_bench.bench_grid(sizes, seed=args.seed)
+        finally:
+            _browser_pool.shutdown()
+        return 0 if all(r["found"] == r["creatives"] for r in results) else 1
+
+    if args.bench_preview is not None:
+        HEADLESS = not args.headed
+        try:
+            report = qa_bench.bench_previews(args.bench_preview or None, repeat=max(1, args.repeat),
+                                             workers=max(1, args.workers))
+        finally:
+            _browser_pool.shutdown()
+        return 1 if report["mismatches"] else 0
+
+    urls = args.url + _read_url_list(args.urls_file)
+    if not urls and not args.export and not args.replay:
+        ap.error("give at least one --url, --urls-file, --export or --replay")
+
+    username, password = args.username, args.password
+    if urls and not (username and password):
+        user, pwd = read_credentials()
+        username, password = username or user, password or pwd
+    if urls and not (username and password):
+        ap.error("no credentials (use --username/--password, FT_USERNAME/FT_PASSWORD or credentials.txt)")
+
+    PROCESS_ALL = bool(args.all)
+    PREVIEW_WORKERS = max(1, args.workers)
+    HEADLESS = not args.headed
+    DELTA_MODE = bool(args.delta)
+    if args.no_cache:
+        USE_VERDICT_CACHE = False
+    if args.no_trace:
+        TRACE_RUNS = False
+    if args.grid_only:
+        GRID_ONLY = True
+    if args.record:
+        USE_VERDICT_CACHE = False  # every preview must run to be recorded
+    if args.no_static:
+        STATIC_CLICKTAG = False
+
+    out_path = args.output or f"qa_results_{time.strftime('%Y-%m-%d_%H-%M-%S')}.jsonl"
+    if out_path == "-":
+        qa_common.LOG_STREAM = sys.stderr
+        stream = sys.stdout
+    else:
+        stream = open(out_path, "w", encoding="utf-8")
+    failed = [False]
+    write = _jsonl_sink(stream)
+
+    def _sink(record):
+        if record.get("result") == "error" or "FAIL" in (record.get("cases") or {}).values():
+            failed[0] = True
+        write(record)
+    RESULT_SINK = _sink
+    try:
+        for path in args.export:
+            _export_results(path, _sink)
+        for path in args.replay:
+            replay_fixture(path, process_all=True if args.all else None)
+        for n, url in enumerate(urls, 1):
+            _restart_attempts = 0
+            if args.record:
+                RECORD_PATH = args.record.format(host=(urlparse(url).hostname or "default"), n=n)
+            try:
+                selenium_login(username, password, url)
+            except Exception as e:  # restart budget exhausted
+                log(f"❌ {url}: {e}")
+                _sink(_result_record(url, "error", note=str(e)))
+    finally:
+        RESULT_SINK = None
+        RECORD_PATH = None
+        _browser_pool.shutdown()
+        if stream is not sys.stdout:
+            stream.close()
+            log(f"📝 Results written to {out_path}")
+    return 1 if failed[0] else 0
+
+def main():
+    if len(sys.argv) > 1:
+        sys.exit(run_cli())
+    build_gui()
+    root.mainloop()
+
+if __name__ == "__main__":
+    sys.modules.setdefault("script_v4", sys.modules[__name__])  # qa_bench imports the running module
+    main()
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "final-codes"))
+
+import qa_analysis  # noqa: E402
+import qa_rules  # noqa: E402
+import qa_store  # noqa: E402
+import script_v4  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Throwaway FT_DATA_DIR."""
+    path = tmp_path / "data"
+    monkeypatch.setenv("FT_DATA_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def m(data_dir, monkeypatch):
+    """script_v4 with a throwaway data dir and GUI logging silenced."""
+    monkeypatch.setattr(script_v4, "_gui_write", lambda *a, **k: None, raising=False)
+    return script_v4
+
+
+@pytest.fixture
+def rules():
+    return qa_rules
+
+
+@pytest.fixture
+def store(data_dir):
+    """qa_store with a throwaway data dir."""
+    return qa_store
+
+
+@pytest.fixture
+def analysis(data_dir):
+    """qa_analysis with a throwaway data dir (and so a cold analysis cache on disk)."""
+    return qa_analysis
+
+
+def make_record(i, **overrides):
+    """Normalized grid row for a FOR QA alt image creative."""
+    name = f"C{i}_300x250.png"
+    raw = {"id": str(1000 + i), "name": name, "href": f"http://lib.example.com/c/{i}", "status": "For QA",
+           "type": "Alt Image", "placement_size": "300x250", "base_file_size": "10 KB", "file_name": name,
+           "modified": "", "top": i * 30}
+    raw.update(overrides)
+    return qa_rules._normalize_snapshot_row(raw)
+
+
+def make_batch(n, **overrides):
+    return qa_rules.CreativeBatch.from_records([make_record(i, **overrides) for i in range(n)])
@@ -0,0 +1,46 @@
+from conftest import ROOT
+
+BUNDLE = ROOT / "creative-preview" / "Ozempic_300x50"
+
+
+def test_shared_files_are_parsed_once(analysis):
+    corpus = ROOT / "creative-preview"
+    assert analysis.analyze_clicktags(corpus / "Mike-and-Tom-Banner_160x600")["parsed"] == 2  # index.html + wFunction
+    for size in ("300x250", "300x600", "728x90"):  # same wFunction-2.5.0.js bytes: only index.html is new
+        assert analysis.analyze_clicktags(corpus / f"Mike-and-Tom-Banner_{size}")["parsed"] == 1
+
+
+def test_hits_survive_a_new_process_cache(analysis, monkeypatch):
+    assert analysis.analyze_clicktags(BUNDLE)["parsed"] == 2
+    assert analysis.analyze_clicktags(BUNDLE)["parsed"] == 0
+    monkeypatch.setattr(analysis, "_analysis_caches", {})  # fresh process: only the disk copy is left
+    result = analysis.analyze_clicktags(BUNDLE)
+    assert result["parsed"] == 0 and result["verdict"] == "pass"
+
+
+def test_changed_content_is_reparsed(analysis, tmp_path):
+    cache = analysis.AnalysisCache(tmp_path / "analysis")
+    calls = []
+
+    def compute(name, text):
+        calls.append(text)
+        return {"len": len(text)}
+    stats = {}
+    assert cache.get("k", "a.js", "var a;", compute, stats) == {"len": 6}
+    assert cache.get("k", "b.js", "var a;", compute, stats) == {"len": 6}  # same bytes, other file
+    assert cache.get("k", "a.js", "var ab;", compute, stats) == {"len": 7}
+    assert calls == ["var a;", "var ab;"] and stats == {"files": 3, "parsed": 2}
+    assert analysis.AnalysisCache(tmp_path / "analysis").get("k", "a.js", "var a;", compute) == {"len": 6}
+    assert len(calls) == 2
+
+
+def test_version_bump_invalidates(analysis, monkeypatch):
+    assert analysis.analyze_clicktags(BUNDLE)["parsed"] == 2
+    monkeypatch.setattr(analysis, "_ANALYSIS_VERSION", analysis._ANALYSIS_VERSION + 1)
+    assert analysis.analyze_clicktags(BUNDLE)["parsed"] == 2
+
+
+def test_disabled_cache_always_parses(analysis, monkeypatch):
+    monkeypatch.setattr(analysis, "USE_ANALYSIS_CACHE", False)
+    assert analysis.analyze_clicktags(BUNDLE)["parsed"] == 2
+    assert analysis.analyze_clicktags(BUNDLE)["parsed"] == 2
@@ -0,0 +1,37 @@
+import zipfile
+
+from conftest import ROOT
+
+CORPUS = ROOT / "creative-preview"
+POOLOUT_404S = {"hearticon.png", "circle.png", "image1.jpg", "image2.jpg", "image3.jpg", "isiBtnM.png", "isiBtnP.png",
+                "ctaBg.png", "scaleicon.png", "novaLogo.png", "person.png", "person2.png", "bg.png", "dropicon.png"}
+
+
+def test_poolout_revision1_reports_the_logged_404s(analysis):
+    result = analysis.find_missing_assets(CORPUS / "Poolout_Revision1")
+    assert {x["resolved"] for x in result["missing"]} == {f"img/{f}" for f in POOLOUT_404S}
+    assert all(x["from"] == "index.html" for x in result["missing"])
+
+
+def test_complete_bundle_and_commented_guides(analysis):
+    assert analysis.find_missing_assets(CORPUS / "Poolout_SkyDiver_300x250")["missing"] == []
+    assert analysis.find_missing_assets(CORPUS / "Mike-and-Tom-Banner_728x90")["missing"] == []  # guide/ only in comments
+
+
+def test_zip_case_mismatch_and_outside_refs(analysis, tmp_path):
+    path = tmp_path / "ad.zip"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("ad/index.html", '<link href="css/style.css" rel="stylesheet"><img src="img/Logo.PNG">'
+                                    '<img src="../up.png"><img src="https://cdn.example.com/x.png">'
+                                    '<!-- <img src="guide/guide.jpg"> -->')
+        z.writestr("ad/css/style.css", "#a { background: url('../img/bg.png'); } /* url(old.png) */")
+        z.writestr("ad/img/logo.png", b"")
+        z.writestr("ad/img/bg.png", b"")
+    missing = {x["ref"]: x.get("note") for x in analysis.find_missing_assets(path)["missing"]}
+    assert missing == {"img/Logo.PNG": "case differs: ad/img/logo.png", "../up.png": None}
+
+
+def test_scan_bundles_expands_directories(analysis):
+    results = analysis.scan_bundles([CORPUS], workers=2)
+    broken = {r["path"].rsplit("/", 1)[-1] for r in results if r["missing"]}
+    assert broken == {"Poolout_Revision1", "HighPollenCount.html"}  # the latter's local jQuery fallback
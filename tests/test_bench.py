@@ -0,0 +1,20 @@
+import os
+from pathlib import Path
+
+import qa_bench
+import qa_common
+
+
+def test_bench_run_uses_its_own_data_dir_and_restores_flags(m):
+    env = os.environ["FT_DATA_DIR"]
+    with qa_bench._bench_run(None, GRID_ONLY=True, RESULT_SINK=print) as run_dir:
+        assert m.GRID_ONLY and m.RESULT_SINK is print
+        assert m._data_dir() == run_dir and os.environ["FT_DATA_DIR"] == env
+    assert not m.GRID_ONLY and m.RESULT_SINK is None and qa_common.DATA_DIR is None
+    assert not run_dir.exists() and m._data_dir() == Path(env)
+
+
+def test_given_data_dir_is_kept(m, tmp_path):
+    with qa_bench._bench_run(tmp_path / "bench") as run_dir:
+        (run_dir / "marker").write_text("x")
+    assert (tmp_path / "bench" / "marker").is_file()
@@ -0,0 +1,39 @@
+import time
+
+
+class FakeDriver:
+    window_handles = ["main"]
+
+    def __init__(self):
+        self.quit_called = False
+        self.switch_to = self
+
+    def window(self, handle):
+        pass
+
+    def execute_script(self, js):
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_idle_browser_is_quit_without_another_run(m, monkeypatch):
+    monkeypatch.setattr(m, "BROWSER_IDLE_SECONDS", 0.2)
+    monkeypatch.setattr(m, "KEEP_BROWSERS", True)
+    pool = m._BrowserPool()
+    drv = FakeDriver()
+    pool.release(drv)
+    assert not drv.quit_called and pool._timer is not None
+    deadline = time.time() + 5
+    while not drv.quit_called and time.time() < deadline:
+        time.sleep(0.05)
+    assert drv.quit_called
+    assert pool._idle == [] and pool._timer is None
+    pool.shutdown()
@@ -0,0 +1,80 @@
+def _capture(m):
+    capture = m.ConsoleCapture(None)
+    capture.ws = None  # events are fed directly; nothing is sent
+    capture._send = lambda *a, **k: 0
+    capture._on_event("Target.attachedToTarget",
+                      {"sessionId": "s1", "targetInfo": {"type": "page", "targetId": "P"}}, None)
+    capture._on_event("Target.attachedToTarget",
+                      {"sessionId": "s2", "targetInfo": {"type": "iframe", "targetId": "F"}}, "s1")
+    return capture
+
+
+def test_settled_requests_are_forgotten(m):
+    capture = _capture(m)
+    for i in range(500):
+        capture._on_event("Network.requestWillBeSent", {"requestId": str(i), "frameId": "P", "request": {"url": "u"}}, "s1")
+        capture._on_event("Network.loadingFinished", {"requestId": str(i)}, "s1")
+    assert capture._req_frame == {} and capture._req_errors == {}
+
+
+def test_404_keeps_its_frame_until_the_log_entry(m):
+    capture = _capture(m)
+    capture._on_event("Page.frameAttached", {"frameId": "AD", "parentFrameId": "P"}, "s1")
+    capture._on_event("Network.requestWillBeSent", {"requestId": "r", "frameId": "AD", "request": {"url": "img/a.png"}}, "s1")
+    capture._on_event("Network.responseReceived", {"requestId": "r", "response": {"status": 404}}, "s1")
+    capture._on_event("Network.loadingFinished", {"requestId": "r"}, "s1")
+    capture._on_event("Log.entryAdded", {"entry": {"level": "error", "networkRequestId": "r", "url": "img/a.png",
+                                                  "text": "Failed to load resource: 404"}}, "s1")
+    assert [e["frame"] for e in capture.errors_for("P", "AD")] == ["AD"]
+    assert capture._req_errors == {}
+
+
+def test_detach_drops_session_state(m):
+    capture = _capture(m)
+    capture._on_event("Runtime.executionContextCreated", {"context": {"id": 1, "auxData": {"frameId": "F"}}}, "s2")
+    capture._on_event("Page.frameAttached", {"frameId": "SUB", "parentFrameId": "F"}, "s2")
+    capture._on_event("Network.requestWillBeSent", {"requestId": "r", "frameId": "F", "request": {"url": "u"}}, "s2")
+    capture._on_event("Target.detachedFromTarget", {"sessionId": "s2"}, "s1")
+    assert capture._ctx_frame == {} and capture._req_frame == {} and capture._frame_parent == {}
+
+
+def test_clear_drops_grid_tab_events(m):
+    capture = _capture(m)
+    capture._on_event("Runtime.exceptionThrown", {"exceptionDetails": {"text": "grid error"}}, "s1")
+    assert capture.errors_for("P")
+    capture.clear()
+    assert capture.events == []
+
+
+def test_tc11_reads_the_ad_frame_pinned_at_open(m, monkeypatch):
+    capture = _capture(m)
+    capture._on_event("Page.frameAttached", {"frameId": "AD", "parentFrameId": "P"}, "s1")
+    capture._on_event("Runtime.executionContextCreated", {"context": {"id": 1, "auxData": {"frameId": "AD"}}}, "s1")
+    capture._on_event("Runtime.exceptionThrown", {"exceptionDetails": {"text": "ad error", "executionContextId": 1}}, "s1")
+    capture._on_event("Runtime.exceptionThrown", {"exceptionDetails": {"text": "landing page error"}}, "s1")
+    # The click-through navigated the tab: there is no iframe#ad any more
+    monkeypatch.setattr(m, "_current_driver", lambda: None)
+    monkeypatch.setattr(m, "_current_page_target", lambda drv: "P")
+    monkeypatch.setattr(m, "_ad_frame_id", lambda drv: None)
+    assert m._check_preview_console_errors(capture, ("P", "AD")) == (True, ["[SEVERE] ad error"])
+    assert len(m._check_preview_console_errors(capture)[1]) == 2
+
+
+class DeadSocket:
+    closed = False
+
+    def recv(self):
+        raise ConnectionResetError("socket closed")
+
+    def close(self):
+        self.closed = True
+
+
+def test_lost_connection_drops_the_capture(m):
+    drv = type("Driver", (), {"session_id": "lost"})()
+    capture = m.ConsoleCapture(drv)
+    ws = capture.ws = DeadSocket()
+    m._console_captures["lost"] = capture
+    capture._reader()
+    assert "lost" not in m._console_captures
+    assert ws.closed and capture.ws is None
@@ -0,0 +1,44 @@
+from test_preview_workers import _fake_flow
+
+from conftest import make_batch, make_record
+
+
+def test_diff_snapshots_added_changed_removed(rules, store):
+    previous = [make_record(i) for i in range(4)]
+    current = [make_record(0), make_record(1, base_file_size="12 KB"), make_record(2, status="Approved"),
+               make_record(9)]
+    delta = store.diff_snapshots(previous, rules.CreativeBatch.from_records(current))
+    assert delta["added"] == {"1009"}
+    assert delta["changed"] == {"1001": [("base_file_size", "10 KB", "12 KB")],
+                                "1002": [("status", "For QA", "Approved")]}
+    assert [r["id"] for r in delta["removed"]] == ["1003"]
+
+
+def test_snapshot_round_trip_is_unchanged(store):
+    url = "https://lib.example.com/library/1"
+    batch = make_batch(5)
+    store._save_grid_snapshot(url, batch)
+    stored, _ = store._load_grid_snapshot(url)
+    delta = store.diff_snapshots(stored, batch)
+    assert delta == {"added": set(), "changed": {}, "removed": []}
+
+
+def test_errored_rows_are_retried_next_delta(store):
+    url = "https://lib.example.com/library/1"
+    batch = make_batch(3)
+    store._save_grid_snapshot(url, batch, skip_ids={"1001"})
+    stored, _ = store._load_grid_snapshot(url)
+    assert store.diff_snapshots(stored, batch)["added"] == {"1001"}
+
+
+def test_failed_previews_are_retried_next_delta(m, store, monkeypatch):
+    url = "https://lib.example.com/library/1"
+    batch = make_batch(3)
+    _fake_flow(m, monkeypatch, batch, [])
+    monkeypatch.setattr(m, "_run_preview_checks", lambda rec, cmap: ("-", "-") if rec["id"] == "1001" else
+                        ("PASSED", "PASSED"))
+    monkeypatch.setattr(m, "PREVIEW_WORKERS", 0)
+    monkeypatch.setattr(m, "USE_VERDICT_CACHE", False)
+    m.selenium_login("u", "p", url)
+    stored, _ = store._load_grid_snapshot(url)
+    assert [r["id"] for r in stored] == ["1000", "1002"]
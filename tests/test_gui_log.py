@@ -0,0 +1,16 @@
+import threading
+from unittest import mock
+
+
+def test_link_hrefs_are_recorded_on_the_ui_thread(m, monkeypatch):
+    monkeypatch.setattr(m, "root", mock.Mock())
+    monkeypatch.setattr(m, "log_text", mock.Mock(**{"index.return_value": "3.0"}))
+    monkeypatch.setattr(m, "_link_hrefs", {})
+    monkeypatch.setattr(m, "_gui_queue", m.queue.Queue())
+    worker = threading.Thread(target=m._gui_write_link, args=("Preview 1000", "https://lib.example.com/p/1000"))
+    worker.start()
+    worker.join()
+    assert m._link_hrefs == {}
+    m._gui_drain()
+    assert m._link_hrefs == {"Preview 1000": "https://lib.example.com/p/1000"}
+    m.log_text.insert.assert_called_once_with("end", "Preview 1000", ("link", "url"))
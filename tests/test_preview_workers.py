@@ -0,0 +1,45 @@
+import threading
+
+from conftest import make_batch
+
+
+class FakeDriver:
+    session_id = "grid"
+    window_handles = ["grid"]
+
+    def execute_script(self, js, *args):
+        return ["", "Creative Name", "ID", "Status", "Type", "Placement Size", "Base File Size", "File Name"]
+
+
+def _fake_flow(m, monkeypatch, batch, previews):
+    monkeypatch.setattr(m, "start_driver", lambda fresh=False: setattr(m, "driver", FakeDriver()))
+    monkeypatch.setattr(m, "_login_and_load_grid", lambda *a, **k: None)
+    monkeypatch.setattr(m, "_harvest_grid", lambda cmap, *a, **k: batch)
+    monkeypatch.setattr(m, "reset_zoom", lambda: None)
+    monkeypatch.setattr(m, "close_browser", lambda: None)
+    monkeypatch.setattr(m._browser_pool, "acquire", lambda: FakeDriver())
+    monkeypatch.setattr(m._browser_pool, "release", lambda drv: None)
+    monkeypatch.setattr(m._browser_pool, "discard", lambda drv: None)
+
+    def preview(rec, cmap):
+        previews.append((threading.current_thread().name, rec["id"]))
+        m._thread_state.preview_details = {"console_errors": [f"err {rec['id']}"], "spans": {"preview": 0.1}}
+        return "PASSED", "FAIL"
+    monkeypatch.setattr(m, "_run_preview_checks", preview)
+
+
+def test_worker_results_are_merged_in_grid_order(m, monkeypatch):
+    batch, previews, out = make_batch(12), [], []
+    _fake_flow(m, monkeypatch, batch, previews)
+    monkeypatch.setattr(m, "PREVIEW_WORKERS", 2)
+    monkeypatch.setattr(m, "USE_VERDICT_CACHE", False)
+    monkeypatch.setattr(m, "RESULT_SINK", out.append)
+
+    m.selenium_login("u", "p", "https://lib.example.com/library/1")
+
+    checked = [r for r in out if r["result"] == "checked"]
+    assert [r["id"] for r in checked] == batch.ids
+    assert all(r["cases"]["TC10"] == "PASSED" and r["cases"]["TC11"] == "FAIL" for r in checked)
+    assert all(r["console_errors"] == [f"err {r['id']}"] and r["spans"] == {"preview": 0.1} for r in checked)
+    assert {name for name, _ in previews} <= {"preview-worker-1", "preview-worker-2"}
+    assert not [r for r in out if r["result"] == "error"]
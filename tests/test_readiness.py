@@ -0,0 +1,23 @@
+def _timings(m, monkeypatch, tmp_path):
+    timings = m._StepTimings(tmp_path / "timings.json")
+    monkeypatch.setattr(m, "_step_timings", timings)
+    monkeypatch.setattr(m, "READY_MIN_SAMPLES", 5)
+    return timings
+
+
+def test_timeouts_widen_the_budget_of_ordinary_steps(m, monkeypatch, tmp_path):
+    timings = _timings(m, monkeypatch, tmp_path)
+    for _ in range(10):
+        m._timed_wait("preview_load", 0.01, lambda t: None, floor=0)
+    assert timings.samples["preview_load"][:5] == [0.01] * 5
+    assert timings.timeout("preview_load", 0.01, floor=0) == 0.02  # ratchets up to default × 2
+
+
+def test_click_through_failures_do_not_ratchet_its_timeout(m, monkeypatch, tmp_path):
+    timings = _timings(m, monkeypatch, tmp_path)
+    for _ in range(10):
+        m._timed_wait("click_through", 12, lambda t: True, ceiling=12, record_timeouts=False)
+    for _ in range(10):  # creatives with no exit: a real TC10 FAIL
+        m._timed_wait("click_through", 12, lambda t: None, ceiling=12, record_timeouts=False)
+    assert len(timings.samples["click_through"]) == 10
+    assert timings.timeout("click_through", 12, ceiling=12) < 12
@@ -0,0 +1,64 @@
+from test_preview_workers import _fake_flow
+
+from conftest import make_batch, make_record
+
+URL = "https://lib.example.com/library/1"
+ERROR = "[SEVERE] https://lcrp.example.com/lcrp/1/img/bg.png - Failed to load resource: 404"
+NOISE = "[SEVERE] https://lib.example.com/crm/v1/user - Failed to load resource: 401"
+
+
+def _record_run(m, monkeypatch, tmp_path):
+    batch = m.CreativeBatch.from_records([make_record(i) for i in range(5)] +
+                                         [make_record(5, status="Approved")])
+    _fake_flow(m, monkeypatch, batch, [])
+
+    def preview(rec, cmap):
+        n = int(rec["id"]) - 1000
+        raw = [ERROR] if n % 2 else [NOISE]
+        m._thread_state.preview_details = {"console_errors": [], "console_raw": raw, "clicktag": n != 3,
+                                           "preview_s": 1.0, "spans": {}}
+        has_errors, _ = m._console_verdict(raw)
+        return ("PASSED" if n != 3 else "FAIL"), ("FAIL" if has_errors else "PASSED")
+    monkeypatch.setattr(m, "_run_preview_checks", preview)
+    monkeypatch.setattr(m, "PREVIEW_WORKERS", 0)
+    monkeypatch.setattr(m, "USE_VERDICT_CACHE", False)
+    path = tmp_path / "run.fx.gz"
+    monkeypatch.setattr(m, "RECORD_PATH", str(path))
+    live = []
+    monkeypatch.setattr(m, "RESULT_SINK", live.append)
+    m.selenium_login("u", "p", URL)
+    monkeypatch.setattr(m, "RECORD_PATH", None)
+    return path, live
+
+
+def _by_id(records):
+    return {r["id"]: (r["result"], r["cases"]) for r in records}
+
+
+def test_replay_reproduces_the_recorded_run(m, monkeypatch, tmp_path):
+    path, live = _record_run(m, monkeypatch, tmp_path)
+    monkeypatch.setattr(m, "_run_preview_checks", lambda *a: (_ for _ in ()).throw(AssertionError("browser used")))
+    monkeypatch.setattr(m, "_login_and_load_grid", lambda *a, **k: (_ for _ in ()).throw(AssertionError("login")))
+    replayed = []
+    monkeypatch.setattr(m, "RESULT_SINK", replayed.append)
+    m.replay_fixture(path)
+    assert _by_id(replayed) == _by_id(live)
+    assert _by_id(replayed)["1003"][1]["TC10"] == "FAIL"
+    assert _by_id(replayed)["1001"][1]["TC11"] == "FAIL"
+    assert _by_id(replayed)["1005"][0] == "skipped"
+
+
+def test_replay_applies_the_current_console_filter(m, monkeypatch, tmp_path):
+    path, _ = _record_run(m, monkeypatch, tmp_path)
+    monkeypatch.setattr(m, "_CONSOLE_IGNORE_SUBSTRINGS", m._CONSOLE_IGNORE_SUBSTRINGS + ["img/bg.png"])
+    replayed = []
+    monkeypatch.setattr(m, "RESULT_SINK", replayed.append)
+    m.replay_fixture(path)
+    assert all(cases.get("TC11") in ("PASSED", None) for _, cases in _by_id(replayed).values())
+
+
+def test_fixture_keeps_the_grid(m, monkeypatch, tmp_path):
+    path, _ = _record_run(m, monkeypatch, tmp_path)
+    fixture, batch = m.load_fixture(path)
+    assert batch.ids == make_batch(6).ids
+    assert set(fixture["previews"]) == {"1", "2", "3", "4", "5"}
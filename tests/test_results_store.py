@@ -0,0 +1,53 @@
+import time
+
+from conftest import make_record
+
+
+def _run(m, store, url, records):
+    results = store.ResultsStore()
+    results.begin_run(url, "qa")
+    for rec, cases in records:
+        results.add(m._result_record(url, "checked", rec, cases, details={"console_errors": ["x"] if
+                                                                         cases.get("TC11") == "FAIL" else []}))
+    results.end_run(total=len(records), processed=len(records))
+    results.db.close()
+    return results.run_id
+
+
+def _cases(**overrides):
+    cases = {f"TC{i}": "PASSED" for i in range(1, 12)}
+    cases.update(overrides)
+    return cases
+
+
+def test_query_by_test_case_and_verdict(m, store):
+    url = "https://lib.example.com/library/1"
+    _run(m, store, url, [(make_record(0), _cases(TC5="FAIL")), (make_record(1), _cases()),
+                  (make_record(2), _cases(TC5="FAIL", TC11="FAIL"))])
+    rows = store.query_results("TC5")
+    assert sorted(r["creative_id"] for r in rows) == ["1000", "1002"]
+    assert {r["host"] for r in rows} == {"lib.example.com"}
+    assert [r["creative_id"] for r in store.query_results("TC11")] == ["1002"]
+    full = store.query_results("TC11", full=True)
+    assert full[0]["console_errors"] == ["x"] and full[0]["cases"]["TC11"] == "FAIL"
+
+
+def test_latest_only_and_since(m, store):
+    url = "https://lib.example.com/library/1"
+    _run(m, store, url, [(make_record(0), _cases(TC5="FAIL"))])
+    time.sleep(0.01)
+    second = _run(m, store, url, [(make_record(0), _cases())])
+    latest = store.query_results(None, verdict=None, latest_only=True)
+    assert [(r["creative_id"], r["run_id"], r["tc5"]) for r in latest] == [("1000", second, "PASSED")]
+    assert store.query_results("TC5", latest_only=True) == []  # failed before, passes now
+    assert store.query_results("TC5", since="1h") and not store.query_results("TC5", until="2000-01-01")
+    assert store.query_results("TC5", host="other.example.com") == []
+
+
+def test_run_totals(m, store):
+    url = "https://lib.example.com/library/1"
+    run_id = _run(m, store, url, [(make_record(0), _cases(TC2="FAIL")), (make_record(1), _cases())])
+    results = store.ResultsStore()
+    total, failed = results.db.execute("SELECT total, failed FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    results.db.close()
+    assert (total, failed) == (2, 1)
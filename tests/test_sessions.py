@@ -0,0 +1,16 @@
+import stat
+
+
+class CookieDriver:
+    def execute_cdp_cmd(self, cmd, params):
+        return {"cookies": [{"name": "sid", "value": "s3cret", "domain": "lib.example.com", "path": "/", "expires": -1}]}
+
+
+def test_saved_session_is_owner_only(m):
+    url = "https://lib.example.com/library/1"
+    m._save_session(CookieDriver(), url, "qa@example.com")
+    path = m._session_path(url, "qa@example.com")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+    assert stat.S_IMODE(m._data_dir().stat().st_mode) == 0o700
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
@@ -0,0 +1,50 @@
+from conftest import ROOT
+
+CORPUS = ROOT / "creative-preview"
+
+
+def test_wired_clicktag_passes(analysis):
+    html = ('<script>var clickTag = "https://example.com";</script>'
+            '<a href="javascript:window.open(window.clickTag)">ad</a>')
+    result = analysis.analyze_clicktag_sources({"index.html": html})
+    assert result["verdict"] == "pass"
+    assert result["clicktags"] == {"clickTag": "https://example.com"}
+
+
+def test_exit_function_in_separate_script_passes(analysis):
+    sources = {"index.html": '<script src="js/exit.js"></script><script>var clickTag1 = "https://x";</script>'
+                             '<div onclick="goExit(clickTag1)"></div>',
+               "js/exit.js": "function goExit(url) { window.open(url); }"}
+    result = analysis.analyze_clicktag_sources(sources)
+    assert result["verdict"] == "pass"
+    assert result["exit_functions"] == ["goExit"]
+
+
+def test_no_clicktag_anywhere_fails(analysis):
+    sources = {"index.html": '<script src="js/main.js"></script><div id="stage"></div>', "js/main.js": "var a = 1;"}
+    result = analysis.analyze_clicktag_sources(sources)
+    assert result["verdict"] == "fail"
+    assert result["unread_scripts"] == []
+
+
+def test_cross_origin_scripts_are_never_a_fail(analysis):
+    html = ('<script src="https://s0.2mdn.net/ads/studio/Enabler.js"></script>'
+            '<script src="https://cdn.example.com/main.js"></script><div id="stage"></div>')
+    result = analysis.analyze_clicktag_sources({"index.html": html})
+    assert result["verdict"] == "ambiguous"
+    assert len(result["unread_scripts"]) == 2
+
+
+def test_browser_sources_match_relative_script_srcs(analysis):
+    sources = {"index.html": '<script src="js/main.js?v=2"></script>',
+               "https://lcrp.example.com/lcrp/1/js/main.js?v=2": "var a = 1;"}
+    assert analysis.analyze_clicktag_sources(sources)["verdict"] == "fail"
+
+
+def test_timed_out_fetch_is_ambiguous(analysis):
+    assert analysis.analyze_clicktag_sources({"index.html": "<div></div>"}, complete=False)["verdict"] == "ambiguous"
+
+
+def test_corpus_verdicts(analysis):
+    assert analysis.analyze_clicktags(CORPUS / "Ozempic_300x50")["verdict"] == "pass"
+    assert analysis.analyze_clicktags(ROOT / "web-console-error-test.html")["verdict"] == "fail"
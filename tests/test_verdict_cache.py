@@ -0,0 +1,51 @@
+import time
+
+from conftest import make_record
+
+PASSED = {"TC10": "PASSED", "TC11": "PASSED"}
+HOST = "lib.example.com"
+
+
+def test_unchanged_passing_creative_is_reused(store, tmp_path):
+    cache = store.VerdictCache(tmp_path / "v.sqlite", ttl=3600, max_rows=100)
+    rec = make_record(0)
+    cache.put(HOST, rec, PASSED)
+    cache.flush()
+    assert cache.get(HOST, rec)[0] == PASSED
+    assert cache.get(HOST, make_record(0, base_file_size="11 KB")) is None  # fingerprint changed
+    cache.close()
+
+
+def test_failed_previews_are_never_reused(store, tmp_path):
+    cache = store.VerdictCache(tmp_path / "v.sqlite", ttl=3600, max_rows=100)
+    rec = make_record(0)
+    cache.put(HOST, rec, {"TC10": "PASSED", "TC11": "FAIL"})
+    cache.flush()
+    assert cache.get(HOST, rec) is None
+    cache.close()
+
+
+def test_entries_expire_after_the_ttl(store, tmp_path):
+    cache = store.VerdictCache(tmp_path / "v.sqlite", ttl=0.2, max_rows=100)
+    rec = make_record(0)
+    cache.put(HOST, rec, PASSED)
+    cache.flush()
+    assert cache.get(HOST, rec) is not None
+    time.sleep(0.3)
+    assert cache.get(HOST, rec) is None
+    cache.evict()
+    assert cache.db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0] == 0
+    cache.close()
+
+
+def test_row_cap_keeps_the_newest(store, tmp_path):
+    cache = store.VerdictCache(tmp_path / "v.sqlite", ttl=3600, max_rows=3)
+    recs = [make_record(i) for i in range(5)]
+    for rec in recs:
+        cache.put(HOST, rec, PASSED)
+        time.sleep(0.01)
+    cache.flush()
+    cache.evict()
+    ids = {r[0] for r in cache.db.execute("SELECT creative_id FROM verdicts")}
+    assert ids == {"1002", "1003", "1004"}
+    cache.close()